@@ -144,6 +144,16 @@ class ControlButtons(QFrame):
         self.stream_twitch_button.setCursor(Qt.PointingHandCursor)
         layout.addWidget(self.stream_twitch_button)
         
+        # Direct low-latency output (SRT / UDP / local HLS) for preview rooms and ingest servers
+        self.stream_local_button = QPushButton("⚡  LOW-LATENCY OUTPUT")
+        self.stream_local_button.setFont(QFont(FONTS['family_primary'], 12, QFont.Bold))
+        self.stream_local_button.setFixedHeight(50)
+        self.stream_local_button.setStyleSheet(get_button_primary())
+        self.stream_local_button.setToolTip("Stream over SRT or UDP, or as HLS segments into a local folder")
+        self.stream_local_button.clicked.connect(lambda: self.stream_clicked.emit("local"))
+        self.stream_local_button.setCursor(Qt.PointingHandCursor)
+        layout.addWidget(self.stream_local_button)
+        
         # Stop stream button
         self.stop_stream_button = QPushButton("⏹  STOP LIVE STREAM")
         self.stop_stream_button.setFont(QFont(FONTS['family_primary'], 13, QFont.Bold))
@@ -184,4 +194,5 @@ class ControlButtons(QFrame):
         self.stream_youtube_button.setEnabled(not is_streaming)
         self.stream_facebook_button.setEnabled(not is_streaming)
         self.stream_twitch_button.setEnabled(not is_streaming)
+        self.stream_local_button.setEnabled(not is_streaming)
         self.stop_stream_button.setEnabled(is_streaming)
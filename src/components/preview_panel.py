@@ -108,6 +108,13 @@ class PreviewPanel(QFrame):
         except Exception as e:
             pass
     
+    def set_image(self, image):
+        """Show a QImage already scaled and converted off the GUI thread"""
+        try:
+            self.preview_label.setPixmap(QPixmap.fromImage(image))
+        except Exception as e:
+            pass
+    
     def clear_preview(self):
         """Clear preview and show placeholder text"""
         self.preview_label.clear()
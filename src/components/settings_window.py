@@ -8,21 +8,40 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, pyqtSignal
+import threading
 from styles.modern_styles import (
     get_card_style, get_combobox_style, get_spinbox_style,
     get_checkbox_style, get_button_primary, get_button_danger,
     COLORS, SPACING, FONTS, RADIUS
 )
+from core.blur_engine import BLUR_MODE_LABELS
+from core.capture_backend import BACKEND_MSS, BACKEND_LABELS, available_backends
+from core.ffmpeg_writer import DEFAULT_CRF, OVERFLOW_LABELS, OVERFLOW_DROP, OVERFLOW_BLOCK
+from core.encoder_profiles import (
+    DEFAULT_PROFILES, PROFILE_LOW_LATENCY, PROFILE_BALANCED, benchmark_encoders, profiles_from_benchmark
+)
+from core.capture_target import (
+    CaptureTarget, TARGET_MONITOR, TARGET_REGION, TARGET_WINDOW, TARGET_ALL_MONITORS,
+    WINDOW_CAPTURE_AVAILABLE, list_window_titles
+)
+
+INTENSITY_NAMES = {1: "Very Low", 2: "Low", 3: "Medium", 4: "High", 5: "Very High"}
 
 
 class SettingsWindow(QDialog):
     settings_saved = pyqtSignal()
+    benchmark_progress = pyqtSignal(str)
+    benchmark_finished = pyqtSignal(object)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("⚙️ Settings")
         self.setModal(True)
         self.setMinimumSize(700, 600)
+        self.benchmark_results = None  # benchmark_encoders() results from this session
+        self.benchmark_thread = None
+        self.benchmark_progress.connect(self._on_benchmark_progress)
+        self.benchmark_finished.connect(self._on_benchmark_finished)
         self.init_ui()
     
     def init_ui(self):
@@ -203,6 +222,80 @@ class SettingsWindow(QDialog):
         fps_group.setLayout(fps_layout)
         layout.addWidget(fps_group)
         
+        # Capture area group
+        area_group = QGroupBox("Capture Area")
+        area_group.setFont(QFont(FONTS['family_primary'], 14, QFont.Bold))
+        area_group.setStyleSheet(fps_group.styleSheet())
+        area_layout = QVBoxLayout()
+        area_layout.setSpacing(12)
+        
+        self.capture_kind_combo = QComboBox()
+        self.capture_kind_combo.addItem("Full screen", TARGET_MONITOR)
+        self.capture_kind_combo.addItem("Screen region", TARGET_REGION)
+        self.capture_kind_combo.addItem("Window", TARGET_WINDOW)
+        self.capture_kind_combo.addItem("All monitors", TARGET_ALL_MONITORS)
+        if not WINDOW_CAPTURE_AVAILABLE:
+            # Window capture needs pygetwindow
+            self.capture_kind_combo.model().item(2).setEnabled(False)
+        self.capture_kind_combo.setStyleSheet(get_combobox_style())
+        self.capture_kind_combo.setFont(QFont(FONTS['family_primary'], 13))
+        self.capture_kind_combo.setMinimumHeight(48)
+        self.capture_kind_combo.currentIndexChanged.connect(self._update_capture_fields)
+        
+        self.monitor_spinbox = QSpinBox()
+        self.monitor_spinbox.setRange(1, 8)
+        self.monitor_spinbox.setPrefix("Monitor ")
+        self.monitor_spinbox.setStyleSheet(get_spinbox_style())
+        self.monitor_spinbox.setFont(QFont(FONTS['family_primary'], 13))
+        self.monitor_spinbox.setMinimumHeight(44)
+        
+        # Region: left, top, width, height in desktop pixels
+        self.region_widget = QWidget()
+        region_layout = QHBoxLayout()
+        region_layout.setContentsMargins(0, 0, 0, 0)
+        region_layout.setSpacing(8)
+        self.region_spinboxes = []
+        for prefix, default in (("X ", 0), ("Y ", 0), ("W ", 1280), ("H ", 720)):
+            spin = QSpinBox()
+            spin.setRange(0, 16384)
+            spin.setValue(default)
+            spin.setPrefix(prefix)
+            spin.setStyleSheet(get_spinbox_style())
+            spin.setFont(QFont(FONTS['family_primary'], 12))
+            spin.setMinimumHeight(44)
+            region_layout.addWidget(spin)
+            self.region_spinboxes.append(spin)
+        self.region_widget.setLayout(region_layout)
+        
+        self.window_combo = QComboBox()
+        self.window_combo.setStyleSheet(get_combobox_style())
+        self.window_combo.setFont(QFont(FONTS['family_primary'], 13))
+        self.window_combo.setMinimumHeight(44)
+        
+        self.capture_backend_combo = QComboBox()
+        for name, label in BACKEND_LABELS.items():
+            self.capture_backend_combo.addItem(f"Grabber: {label}", name)
+            if name not in available_backends():
+                self.capture_backend_combo.model().item(self.capture_backend_combo.count() - 1).setEnabled(False)
+        self.capture_backend_combo.setStyleSheet(get_combobox_style())
+        self.capture_backend_combo.setFont(QFont(FONTS['family_primary'], 13))
+        self.capture_backend_combo.setMinimumHeight(44)
+        
+        area_desc = QLabel("Capturing a region or window only processes and encodes those pixels")
+        area_desc.setFont(QFont(FONTS['family_primary'], 11))
+        area_desc.setStyleSheet(f"color: {COLORS['text_muted']}; border: none;")
+        area_desc.setWordWrap(True)
+        
+        area_layout.addWidget(self.capture_kind_combo)
+        area_layout.addWidget(self.monitor_spinbox)
+        area_layout.addWidget(self.region_widget)
+        area_layout.addWidget(self.window_combo)
+        area_layout.addWidget(self.capture_backend_combo)
+        area_layout.addWidget(area_desc)
+        area_group.setLayout(area_layout)
+        layout.addWidget(area_group)
+        self._update_capture_fields()
+        
         layout.addStretch()
         widget.setLayout(layout)
         return widget
@@ -244,9 +337,9 @@ class SettingsWindow(QDialog):
         blur_desc.setWordWrap(True)
         
         # Blur intensity slider
-        intensity_label = QLabel("Blur Intensity: Medium")
-        intensity_label.setFont(QFont(FONTS['family_primary'], 12))
-        intensity_label.setStyleSheet(f"color: {COLORS['text_secondary']}; border: none;")
+        self.intensity_label = QLabel("Blur Intensity: Medium")
+        self.intensity_label.setFont(QFont(FONTS['family_primary'], 12))
+        self.intensity_label.setStyleSheet(f"color: {COLORS['text_secondary']}; border: none;")
         
         self.blur_slider = QSlider(Qt.Horizontal)
         self.blur_slider.setRange(1, 5)
@@ -267,11 +360,33 @@ class SettingsWindow(QDialog):
                 background: {COLORS['primary_light']};
             }}
         """)
+        self.blur_slider.valueChanged.connect(
+            lambda v: self.intensity_label.setText(f"Blur Intensity: {INTENSITY_NAMES.get(v, v)}")
+        )
+        
+        # Blur style (shared by face and sensitive content blur)
+        mode_label = QLabel("Blur Style")
+        mode_label.setFont(QFont(FONTS['family_primary'], 12))
+        mode_label.setStyleSheet(f"color: {COLORS['text_secondary']}; border: none;")
+        
+        self.blur_mode_combo = QComboBox()
+        for mode, label in BLUR_MODE_LABELS.items():
+            self.blur_mode_combo.addItem(label, mode)
+        self.blur_mode_combo.setStyleSheet(get_combobox_style())
+        self.blur_mode_combo.setFont(QFont(FONTS['family_primary'], 13))
+        self.blur_mode_combo.setMinimumHeight(44)
+        
+        mode_desc = QLabel("Faster styles leave more CPU for capture and streaming")
+        mode_desc.setFont(QFont(FONTS['family_primary'], 11))
+        mode_desc.setStyleSheet(f"color: {COLORS['text_muted']}; border: none;")
         
         blur_layout.addWidget(self.blur_checkbox)
         blur_layout.addWidget(blur_desc)
-        blur_layout.addWidget(intensity_label)
+        blur_layout.addWidget(self.intensity_label)
         blur_layout.addWidget(self.blur_slider)
+        blur_layout.addWidget(mode_label)
+        blur_layout.addWidget(self.blur_mode_combo)
+        blur_layout.addWidget(mode_desc)
         blur_group.setLayout(blur_layout)
         layout.addWidget(blur_group)
         
@@ -374,17 +489,94 @@ class SettingsWindow(QDialog):
         perf_layout = QVBoxLayout()
         perf_layout.setSpacing(12)
         
-        self.hardware_checkbox = QCheckBox("Use hardware acceleration (Recommended)")
+        self.hardware_checkbox = QCheckBox("Use hardware encoder when available")
         self.hardware_checkbox.setFont(QFont(FONTS['family_primary'], 13))
         self.hardware_checkbox.setStyleSheet(get_checkbox_style())
-        self.hardware_checkbox.setChecked(True)
+        self.hardware_checkbox.setChecked(False)
         
-        perf_desc = QLabel("Use GPU for better performance and lower CPU usage")
+        perf_desc = QLabel("Encode on the GPU (NVENC, Quick Sync, AMF, VideoToolbox) to leave the CPU "
+                           "to capture and redaction; falls back to x264 when none works")
         perf_desc.setFont(QFont(FONTS['family_primary'], 11))
         perf_desc.setStyleSheet(f"color: {COLORS['text_muted']}; border: none;")
+        perf_desc.setWordWrap(True)
+        
+        # Encoder profiles: low latency / balanced / quality, for the stream and for recordings
+        self.stream_profile_combo = QComboBox()
+        self.recording_profile_combo = QComboBox()
+        for combo, prefix in ((self.stream_profile_combo, "Live stream encoder"),
+                              (self.recording_profile_combo, "Recording encoder")):
+            for name, profile in DEFAULT_PROFILES.items():
+                combo.addItem(f"{prefix}: {profile.label}", name)
+            combo.setStyleSheet(get_combobox_style())
+            combo.setFont(QFont(FONTS['family_primary'], 13))
+            combo.setMinimumHeight(44)
+        self.set_stream_profile(PROFILE_LOW_LATENCY)
+        self.set_recording_profile(PROFILE_BALANCED)
+        
+        self.intra_refresh_checkbox = QCheckBox("Intra refresh on the live stream (no keyframe bursts)")
+        self.intra_refresh_checkbox.setFont(QFont(FONTS['family_primary'], 13))
+        self.intra_refresh_checkbox.setStyleSheet(get_checkbox_style())
+        self.intra_refresh_checkbox.setToolTip("Lowest latency for x264 streams. Some platforms expect regular "
+                                               "keyframes; not used while recording locally.")
+        
+        self.benchmark_button = QPushButton("Benchmark encoder on this computer")
+        self.benchmark_button.setFont(QFont(FONTS['family_primary'], 13))
+        self.benchmark_button.setStyleSheet(get_button_primary())
+        self.benchmark_button.setCursor(Qt.PointingHandCursor)
+        self.benchmark_button.clicked.connect(self.run_encoder_benchmark)
+        
+        self.benchmark_label = QLabel("Profiles use default x264 settings until the encoder is benchmarked")
+        self.benchmark_label.setFont(QFont(FONTS['family_primary'], 11))
+        self.benchmark_label.setStyleSheet(f"color: {COLORS['text_muted']}; border: none;")
+        self.benchmark_label.setWordWrap(True)
+        
+        self.crf_spinbox = QSpinBox()
+        self.crf_spinbox.setRange(15, 35)
+        self.crf_spinbox.setValue(DEFAULT_CRF)
+        self.crf_spinbox.setPrefix("Quality (CRF) ")
+        self.crf_spinbox.setStyleSheet(get_spinbox_style())
+        self.crf_spinbox.setFont(QFont(FONTS['family_primary'], 13))
+        self.crf_spinbox.setMinimumHeight(44)
+        
+        # Live stream: what to do when the encoder or network can't keep up
+        self.overflow_combo = QComboBox()
+        for policy, label in OVERFLOW_LABELS.items():
+            if policy != OVERFLOW_BLOCK:  # Blocking stalls the live pipeline; recordings only
+                self.overflow_combo.addItem(f"Stream falling behind: {label}", policy)
+        self.overflow_combo.setStyleSheet(get_combobox_style())
+        self.overflow_combo.setFont(QFont(FONTS['family_primary'], 13))
+        self.overflow_combo.setMinimumHeight(44)
+        
+        self.adaptive_bitrate_checkbox = QCheckBox("Adapt live stream resolution and bitrate to the connection")
+        self.adaptive_bitrate_checkbox.setFont(QFont(FONTS['family_primary'], 13))
+        self.adaptive_bitrate_checkbox.setStyleSheet(get_checkbox_style())
+        self.adaptive_bitrate_checkbox.setChecked(True)
+        
+        self.roi_encoding_checkbox = QCheckBox("Spend fewer encoder bits on redacted areas")
+        self.roi_encoding_checkbox.setFont(QFont(FONTS['family_primary'], 13))
+        self.roi_encoding_checkbox.setStyleSheet(get_checkbox_style())
+        self.roi_encoding_checkbox.setChecked(True)
+        self.roi_encoding_checkbox.setToolTip("Aligns blur boxes to 16 px encoder blocks and codes areas that "
+                                              "stay redacted at lower quality (x264)")
+        
+        encoder_desc = QLabel("Low latency streams with x264's zerolatency tune; quality spends more CPU "
+                              "for smaller files. Lower CRF means better quality and bigger files")
+        encoder_desc.setFont(QFont(FONTS['family_primary'], 11))
+        encoder_desc.setStyleSheet(f"color: {COLORS['text_muted']}; border: none;")
+        encoder_desc.setWordWrap(True)
         
         perf_layout.addWidget(self.hardware_checkbox)
         perf_layout.addWidget(perf_desc)
+        perf_layout.addWidget(self.stream_profile_combo)
+        perf_layout.addWidget(self.recording_profile_combo)
+        perf_layout.addWidget(self.intra_refresh_checkbox)
+        perf_layout.addWidget(self.benchmark_button)
+        perf_layout.addWidget(self.benchmark_label)
+        perf_layout.addWidget(self.crf_spinbox)
+        perf_layout.addWidget(self.overflow_combo)
+        perf_layout.addWidget(self.adaptive_bitrate_checkbox)
+        perf_layout.addWidget(self.roi_encoding_checkbox)
+        perf_layout.addWidget(encoder_desc)
         perf_group.setLayout(perf_layout)
         layout.addWidget(perf_group)
         
@@ -415,3 +607,139 @@ class SettingsWindow(QDialog):
     def is_sensitive_content_blur_enabled(self):
         """Check if sensitive content blur is enabled"""
         return self.sensitive_blur_checkbox.isChecked()
+    
+    def get_blur_mode(self):
+        """Get selected blur engine mode"""
+        return self.blur_mode_combo.currentData()
+    
+    def set_blur_mode(self, mode):
+        """Select a blur engine mode in the combo box"""
+        index = self.blur_mode_combo.findData(mode)
+        if index >= 0:
+            self.blur_mode_combo.setCurrentIndex(index)
+    
+    def _update_capture_fields(self):
+        """Show only the inputs for the selected capture area kind"""
+        kind = self.capture_kind_combo.currentData()
+        self.monitor_spinbox.setVisible(kind == TARGET_MONITOR)
+        self.region_widget.setVisible(kind == TARGET_REGION)
+        self.window_combo.setVisible(kind == TARGET_WINDOW)
+        if kind == TARGET_WINDOW:
+            current = self.window_combo.currentText()
+            self.window_combo.clear()
+            self.window_combo.addItems(list_window_titles())
+            if current:
+                self.window_combo.setCurrentText(current)
+    
+    def get_capture_target(self):
+        """Get selected capture area as a CaptureTarget"""
+        kind = self.capture_kind_combo.currentData()
+        if kind == TARGET_REGION:
+            return CaptureTarget.from_region(*(spin.value() for spin in self.region_spinboxes))
+        if kind == TARGET_ALL_MONITORS:
+            return CaptureTarget.all_monitors()
+        if kind == TARGET_WINDOW and self.window_combo.currentText():
+            return CaptureTarget.window(self.window_combo.currentText())
+        return CaptureTarget.monitor(self.monitor_spinbox.value())
+    
+    def set_capture_target(self, target):
+        """Show an existing CaptureTarget in the capture area inputs"""
+        if target.kind == TARGET_REGION and target.region:
+            for spin, value in zip(self.region_spinboxes, target.region):
+                spin.setValue(int(value))
+        elif target.kind == TARGET_WINDOW and target.window_title:
+            self.window_combo.addItem(target.window_title)
+            self.window_combo.setCurrentText(target.window_title)
+        else:
+            self.monitor_spinbox.setValue(target.monitor_index)
+        index = self.capture_kind_combo.findData(target.kind)
+        if index >= 0:
+            self.capture_kind_combo.setCurrentIndex(index)
+    
+    def get_capture_backend(self):
+        """Get selected capture backend name"""
+        return self.capture_backend_combo.currentData() or BACKEND_MSS
+    
+    def set_capture_backend(self, name):
+        """Select a capture backend by name"""
+        index = self.capture_backend_combo.findData(name)
+        if index >= 0:
+            self.capture_backend_combo.setCurrentIndex(index)
+    
+    def get_stream_profile(self):
+        """Get the live stream encoder profile name"""
+        return self.stream_profile_combo.currentData() or PROFILE_LOW_LATENCY
+    
+    def set_stream_profile(self, name):
+        """Select the live stream encoder profile by name"""
+        index = self.stream_profile_combo.findData(name)
+        if index >= 0:
+            self.stream_profile_combo.setCurrentIndex(index)
+    
+    def get_recording_profile(self):
+        """Get the recording encoder profile name"""
+        return self.recording_profile_combo.currentData() or PROFILE_BALANCED
+    
+    def set_recording_profile(self, name):
+        """Select the recording encoder profile by name"""
+        index = self.recording_profile_combo.findData(name)
+        if index >= 0:
+            self.recording_profile_combo.setCurrentIndex(index)
+    
+    def run_encoder_benchmark(self):
+        """Benchmark x264 presets/tunes/threads at the selected resolution in the background"""
+        if self.benchmark_thread is not None and self.benchmark_thread.is_alive():
+            return
+        self.benchmark_button.setEnabled(False)
+        size = self.get_resolution()
+        fps = self.get_fps()
+        
+        def run():
+            try:
+                results = benchmark_encoders(
+                    size, fps,
+                    progress=lambda done, total: self.benchmark_progress.emit(f"⏱️ Benchmarking... {done}/{total}")
+                )
+            except Exception as e:
+                self.benchmark_progress.emit(f"❌ Benchmark failed: {e}")
+                results = None
+            self.benchmark_finished.emit(results)
+        
+        self.benchmark_label.setText(f"⏱️ Benchmarking at {size[0]}x{size[1]} @ {fps} fps...")
+        self.benchmark_thread = threading.Thread(target=run, daemon=True)
+        self.benchmark_thread.start()
+    
+    def _on_benchmark_progress(self, text):
+        self.benchmark_label.setText(text)
+    
+    def _on_benchmark_finished(self, results):
+        self.benchmark_button.setEnabled(True)
+        if not results:
+            return
+        self.benchmark_results = results
+        profiles = profiles_from_benchmark(results)
+        if any(r['cpu_pct'] is None for r in results):
+            self.benchmark_label.setText("⚠️ CPU use can't be measured here (install psutil) - "
+                                         "profiles keep their defaults")
+            return
+        self.benchmark_label.setText("✅ " + " | ".join(
+            f"{profile.label}: {profile.describe()}" for profile in profiles.values()
+        ))
+    
+    def get_overflow_policy(self):
+        """Get the live stream overflow policy"""
+        return self.overflow_combo.currentData() or OVERFLOW_DROP
+    
+    def set_overflow_policy(self, policy):
+        """Select the live stream overflow policy"""
+        index = self.overflow_combo.findData(policy)
+        if index >= 0:
+            self.overflow_combo.setCurrentIndex(index)
+    
+    def get_crf(self):
+        """Get recording quality (libx264 CRF)"""
+        return self.crf_spinbox.value()
+    
+    def get_blur_intensity(self):
+        """Get blur intensity (1-5)"""
+        return self.blur_slider.value()
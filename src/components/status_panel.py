@@ -65,7 +65,7 @@ class StatusPanel(QFrame):
         stats_layout.addWidget(self.frame_label)
         
         # File size
-        self.size_label = QLabel("Estimated Size: 0 MB")
+        self.size_label = QLabel("File Size: 0.0 MB")
         self.size_label.setFont(QFont(FONTS['family_primary'], 12, QFont.Bold))
         self.size_label.setStyleSheet(f"color: {COLORS['text_primary']}; border: none;")
         stats_layout.addWidget(self.size_label)
@@ -90,5 +90,5 @@ class StatusPanel(QFrame):
         self.frame_label.setText(f"Frames Captured: {frame_count:,}")
     
     def update_size(self, size_mb):
-        """Update file size"""
-        self.size_label.setText(f"Estimated Size: {size_mb:.1f} MB")
+        """Update file size (bytes written by the encoder so far)"""
+        self.size_label.setText(f"File Size: {size_mb:.1f} MB")
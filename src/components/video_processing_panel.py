@@ -32,6 +32,7 @@ class VideoProcessingPanel(QFrame):
         
         self.video_processor = None
         self.processing_thread = None
+        self.encoder_profile = None  # Callable returning the EncoderProfile for processed videos
         self.selected_video = None
         
         # Signals
@@ -355,7 +356,8 @@ class VideoProcessingPanel(QFrame):
         
         # Import video processor
         from core.video_processor import VideoProcessor
-        self.video_processor = VideoProcessor()
+        profile = self.encoder_profile() if self.encoder_profile else None
+        self.video_processor = VideoProcessor(encoder_profile=profile)
         self.video_processor.set_callbacks(
             progress_callback=lambda p: self.signals.progress_updated.emit(p),
             status_callback=lambda s: self.signals.status_updated.emit(s)
@@ -0,0 +1,197 @@
+"""
+Adaptive Bitrate - Steps a live stream through a resolution/bitrate ladder
+Watches the encoder queue, dropped frames and FFmpeg's encode rate; switches only after sustained trouble
+"""
+import time
+from typing import List, Optional, Tuple
+
+from .resolution_space import fit_size
+
+# Output height -> kbit/s for 30 fps H.264 screen content, best first
+DEFAULT_LADDER = [(1080, 6000), (720, 4500), (720, 3000), (540, 2000), (432, 1200), (360, 800)]
+
+
+class Rung:
+    """One ladder step: output size and video bitrate"""
+
+    def __init__(self, size: Tuple[int, int], kbps: int):
+        self.size = (int(size[0]), int(size[1]))
+        self.kbps = int(kbps)
+
+    def describe(self) -> str:
+        return f"{self.size[0]}x{self.size[1]} @ {self.kbps}k"
+
+
+def build_ladder(top_size: Tuple[int, int], top_kbps: int, ladder=DEFAULT_LADDER) -> List[Rung]:
+    """Rungs from the configured stream size/bitrate downwards, keeping the aspect ratio"""
+    rungs = [Rung(top_size, top_kbps)]
+    for height, kbps in ladder:
+        if kbps >= top_kbps or height > top_size[1]:
+            continue
+        size = fit_size(top_size, (top_size[0], height))
+        rungs.append(Rung(size, kbps))
+    return rungs
+
+
+class AdaptiveBitrateController:
+    """Decides when to move down or up the ladder from FFmpegWriter telemetry
+
+    Congested: the queue is (nearly) full, frames were dropped since the last update, or the
+    encoder produced fewer frames than real time needs. Congestion for down_after seconds
+    steps down one rung; a clean run of up_after seconds steps back up one. No two switches
+    happen within hold seconds, so a restart's own hiccup can't trigger the next one.
+    """
+
+    def __init__(self, rungs: List[Rung], fps: float, queue_size: int, down_after: float = 2.0,
+                 up_after: float = 15.0, hold: float = 8.0, min_speed: float = 0.9):
+        self.rungs = rungs
+        self.fps = fps
+        self.queue_size = queue_size
+        self.down_after = down_after
+        self.up_after = up_after
+        self.hold = hold
+        self.min_speed = min_speed
+
+        self.index = 0
+        self.last_switch = time.monotonic()
+        self.congested_since = None
+        self.healthy_since = None
+        self.last_dropped = 0
+        self.last_encoded = None
+        self.last_update = None
+        self.speed = 0.0  # Encoded frames per real-time frame over the last update
+        self.switches = 0
+
+    @property
+    def rung(self) -> Rung:
+        return self.rungs[self.index]
+
+    def reset_counters(self):
+        """Forget per-encoder counters (call after the encoder was restarted)"""
+        self.last_dropped = 0
+        self.last_encoded = None
+        self.last_update = None
+        self.congested_since = None
+        self.healthy_since = None
+
+    def update(self, telemetry: dict, now: float = None) -> Optional[Rung]:
+        """Feed a telemetry snapshot; returns the new rung when the stream should switch"""
+        now = time.monotonic() if now is None else now
+
+        # Instantaneous encode rate from FFmpeg's frame counter (its own 'speed' is a run average)
+        encoded = telemetry.get('encoded_frames', 0)
+        if self.last_encoded is not None and self.last_update is not None and now > self.last_update:
+            self.speed = (encoded - self.last_encoded) / ((now - self.last_update) * self.fps)
+        self.last_encoded, self.last_update = encoded, now
+
+        new_drops = telemetry.get('frames_dropped', 0) > self.last_dropped
+        self.last_dropped = telemetry.get('frames_dropped', 0)
+        depth = telemetry.get('queue_depth', 0)
+        lagging = 0 < self.speed < self.min_speed
+
+        if depth >= self.queue_size - 1 or new_drops or lagging:
+            self.healthy_since = None
+            if self.congested_since is None:
+                self.congested_since = now
+        else:
+            self.congested_since = None
+            if self.healthy_since is None:
+                self.healthy_since = now
+
+        if now - self.last_switch < self.hold:
+            return None
+
+        if (self.congested_since is not None and now - self.congested_since >= self.down_after
+                and self.index < len(self.rungs) - 1):
+            return self._switch(self.index + 1, now)
+        if (self.healthy_since is not None and now - self.healthy_since >= self.up_after
+                and self.index > 0):
+            return self._switch(self.index - 1, now)
+        return None
+
+    def _switch(self, index: int, now: float) -> Rung:
+        direction = "down" if index > self.index else "up"
+        self.index = index
+        self.last_switch = now
+        self.switches += 1
+        self.reset_counters()
+        print(f"📶 [Adaptive Bitrate] Stepping {direction} to {self.rung.describe()}")
+        return self.rung
+
+
+def check_throttled_sink(size=(1280, 720), fps: int = 30, top_kbps: int = 4500,
+                         congested_kbps: int = 1500, phase_seconds: float = 25.0) -> bool:
+    """Manual check: stream through a throttled local RTMP sink and watch the ladder react
+
+    Not part of any automated test run; takes phase_seconds * 3 and needs FFmpeg.
+    Phases: open link -> upload throttled below the top bitrate -> link restored. Passes when
+    the controller stepped down during congestion and back up afterwards. Rung switches go
+    through ReconnectingWriter.restart() like the stream loop's.
+    """
+    import numpy as np
+    from .ffmpeg_writer import FFmpegWriter, EncoderOutput, OVERFLOW_DROP
+    from .frame_pacer import DeadlineClock
+    from .local_rtmp import RtmpListener, ThrottledProxy
+    from .stream_reconnect import ReconnectingWriter
+
+    listener = RtmpListener(port=19350)
+    proxy = ThrottledProxy(19351, 19350, kbps=top_kbps * 4)
+    listener.start()
+    proxy.start()
+    url = listener.url.replace(':19350/', ':19351/')
+
+    controller = AdaptiveBitrateController(build_ladder(size, top_kbps), fps, queue_size=4,
+                                           down_after=2.0, up_after=8.0, hold=5.0)
+
+    def open_writer() -> FFmpegWriter:
+        rung = controller.rung
+        writer = FFmpegWriter(EncoderOutput.rtmp(url), rung.size, fps, 'bgr', crf=None, preset='veryfast',
+                              bitrate=rung.kbps, gop=fps * 2, audio=True, overflow_policy=OVERFLOW_DROP)
+        writer.start()
+        return writer
+
+    writer = ReconnectingWriter(open_writer, fps)
+    writer.start()
+    rng = np.random.default_rng(0)
+    clock = DeadlineClock(fps)
+    lowest = 0
+    stepped_up = False
+    start = time.monotonic()
+    last_check = start
+    try:
+        while time.monotonic() - start < phase_seconds * 3:
+            elapsed = time.monotonic() - start
+            if phase_seconds <= elapsed < phase_seconds * 2 and proxy.kbps != congested_kbps:
+                proxy.set_rate(congested_kbps)
+            elif elapsed >= phase_seconds * 2 and proxy.kbps == congested_kbps:
+                proxy.set_rate(top_kbps * 4)
+
+            clock.wait()
+            # Fresh noise every frame so the encoder needs its full bitrate
+            width, height = controller.rung.size
+            frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            writer.write(frame, owned=True)
+
+            if writer.connected and time.monotonic() - last_check >= 1.0:
+                last_check = time.monotonic()
+                rung = controller.update(writer.telemetry())
+                print(f"   t={elapsed:5.1f}s {controller.rung.describe():>20} | {writer.stats()}")
+                if rung is not None:
+                    if controller.index < lowest:
+                        stepped_up = True
+                    lowest = max(lowest, controller.index)
+                    writer.restart()
+    finally:
+        writer.close(timeout=5.0)
+        proxy.stop()
+        listener.stop()
+
+    passed = lowest > 0 and stepped_up
+    print(f"{'✅ PASS' if passed else '❌ FAIL'}: lowest rung {controller.rungs[lowest].describe()}, "
+          f"{controller.switches} switches, stepped back up: {stepped_up}")
+    return passed
+
+
+if __name__ == "__main__":
+    # python -m core.adaptive_bitrate   (from src/, FFmpeg on PATH)
+    raise SystemExit(0 if check_throttled_sink() else 1)
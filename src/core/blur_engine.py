@@ -0,0 +1,313 @@
+"""
+Blur Engine - Shared redaction blur with selectable speed/quality modes
+Used by live capture, confidential-data blur and offline video processing
+"""
+import time
+import zlib
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Available modes, fastest last. Costs are ms per megapixel of redacted area at the default
+# (51, 51) kernel, single core, measured with benchmark_modes() on a 1920x1080 frame:
+#   gaussian  ~59 ms/MP   full-resolution Gaussian (original behaviour, best looking)
+#   box       ~14 ms/MP   stack blur (separable, cost independent of kernel size)
+#   downscale ~3.9 ms/MP  blur at 1/6 scale then upsample (near-identical look)
+#   pixelate  ~3.6 ms/MP  mosaic blocks
+#   fill      ~0.25 ms/MP solid colour
+BLUR_MODES = ('gaussian', 'box', 'downscale', 'pixelate', 'fill')
+
+BLUR_MODE_LABELS = {
+    'downscale': 'Fast blur (recommended)',
+    'gaussian': 'Gaussian blur (best quality)',
+    'box': 'Stack blur',
+    'pixelate': 'Pixelate',
+    'fill': 'Solid fill (fastest)',
+}
+
+# Blur intensity slider (1-5) -> kernel size multiplier
+INTENSITY_SCALE = {1: 0.5, 2: 0.75, 3: 1.0, 4: 1.4, 5: 2.0}
+
+# Fixed cost of blurring one more area, in pixels of blur work (about 0.2 ms in downscale
+# mode and 2 ms in gaussian mode on one core, so the same for both); redact() only splits a
+# group of tiles into several rectangles when that saves more than this per rectangle
+AREA_OVERHEAD_PIXELS = 40_000
+
+
+class BlurEngine:
+    """Blurs rectangular regions of a frame in place with the configured mode"""
+
+    def __init__(self, mode: str = 'downscale', intensity: int = 3, fill_color=(0, 0, 0),
+                 cache_max_bytes: int = 64 * 1024 * 1024):
+        self.mode = mode if mode in BLUR_MODES else 'downscale'
+        self.intensity = intensity
+        self.fill_color = fill_color
+
+        # Blurred pixels of the previous redact() call, keyed by blur area and settings.
+        # Only areas used in the latest call survive, so moved or changed regions drop out.
+        self.cache_max_bytes = cache_max_bytes  # 0 disables the cache
+        self._cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def set_mode(self, mode: str):
+        """Switch blur mode (ignores unknown modes)"""
+        if mode in BLUR_MODES:
+            self.mode = mode
+
+    def set_intensity(self, intensity: int):
+        """Set blur intensity from the 1-5 settings slider"""
+        self.intensity = int(min(5, max(1, intensity)))
+
+    def clear_cache(self):
+        """Forget cached blur results (e.g. when a new recording starts)"""
+        self._cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _content_hash(area: np.ndarray) -> int:
+        """CRC32 of an ROI, chained row by row so strided views need no copy (~1.4 ms/MP)"""
+        crc = 0
+        for row in area:
+            crc = zlib.crc32(row, crc)
+        return crc
+
+    def _blur_area_cached(self, area: np.ndarray, key: tuple, ksize, sigma: float, mode: str):
+        """Blur area, reusing the previous frame's result when its pixels are unchanged
+
+        Returns (content_hash, blurred); content_hash is None when caching does not apply.
+        """
+        if self.cache_max_bytes <= 0 or mode == 'fill':
+            return None, self.blur_roi(area, ksize, sigma, mode)
+
+        content = self._content_hash(area)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == content:
+            self.cache_hits += 1
+            return content, cached[1]
+
+        self.cache_misses += 1
+        return content, self.blur_roi(area, ksize, sigma, mode)
+
+    def _kernel(self, ksize) -> int:
+        """Odd kernel size after applying the intensity slider"""
+        k = ksize[0] if isinstance(ksize, (tuple, list)) else int(ksize)
+        k = int(k * INTENSITY_SCALE.get(self.intensity, 1.0))
+        return max(3, k | 1)
+
+    def _shrink(self, roi: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+        """Anti-aliased downscale: one cheap 2x bilinear step, then area resampling"""
+        w, h = roi.shape[1], roi.shape[0]
+        if w // 2 >= size[0] * 2 and h // 2 >= size[1] * 2:
+            roi = cv2.resize(roi, (w // 2, h // 2), interpolation=cv2.INTER_LINEAR)
+        return cv2.resize(roi, size, interpolation=cv2.INTER_AREA)
+
+    def blur_roi(self, roi: np.ndarray, ksize=(51, 51), sigma: float = 30, mode: str = None,
+                 dst: np.ndarray = None) -> np.ndarray:
+        """Return a blurred copy of roi (written into dst when given, which may be roi itself)"""
+        mode = mode or self.mode
+        k = self._kernel(ksize)
+        sigma = sigma * k / max(ksize[0] if isinstance(ksize, (tuple, list)) else ksize, 1)
+        h, w = roi.shape[:2]
+
+        if mode == 'gaussian':
+            return cv2.GaussianBlur(roi, (k, k), sigma, dst=dst)
+
+        if mode == 'box':
+            if hasattr(cv2, 'stackBlur'):
+                return cv2.stackBlur(roi, (k, k), dst=dst)
+            return cv2.blur(roi, (k, k), dst=dst)
+
+        if mode == 'downscale':
+            factor = max(1, k // 8)
+            small = self._shrink(roi, (max(1, w // factor), max(1, h // factor)))
+            small_k = max(3, (k // factor) | 1)
+            small = cv2.GaussianBlur(small, (small_k, small_k), max(sigma / factor, 0.8))
+            return cv2.resize(small, (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+        if mode == 'pixelate':
+            block = max(4, k // 4)
+            small = self._shrink(roi, (max(1, w // block), max(1, h // block)))
+            return cv2.resize(small, (w, h), dst=dst, interpolation=cv2.INTER_NEAREST)
+
+        # fill
+        out = dst if dst is not None else np.empty_like(roi)
+        cv2.rectangle(out, (0, 0), (w - 1, h - 1), self._fill_value(roi), -1)
+        return out
+
+    def _fill_value(self, image: np.ndarray) -> tuple:
+        """Fill colour matching the image's channel count (BGR, BGRA or gray)"""
+        channels = image.shape[2] if image.ndim == 3 else 1
+        color = tuple(int(c) for c in self.fill_color) + (255,) * max(0, channels - len(self.fill_color))
+        return color[:channels]
+
+    def apply(self, frame: np.ndarray, regions, ksize=(51, 51), sigma: float = 30, mode: str = None) -> np.ndarray:
+        """Blur every (x, y, w, h) region of frame in place and return frame"""
+        mode = mode or self.mode
+        frame_h, frame_w = frame.shape[:2]
+
+        for (x, y, w, h) in regions:
+            x1, y1 = max(0, int(x)), max(0, int(y))
+            x2, y2 = min(frame_w, int(x + w)), min(frame_h, int(y + h))
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            view = frame[y1:y2, x1:x2]
+            out = self.blur_roi(view, ksize, sigma, mode, dst=view)
+            if out is not view and not np.shares_memory(out, view):
+                view[...] = out
+
+        return frame
+
+    @staticmethod
+    def _tile_rects(occupied: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Cover occupied tiles with non-overlapping (col1, row1, col2, row2) rectangles
+
+        Each row is split into runs of occupied tiles; a run continues the rectangle above it
+        when it spans exactly the same columns.
+        """
+        rects = []
+        open_runs = {}  # (col1, col2) -> first row
+        for row in range(occupied.shape[0]):
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], occupied[row].astype(np.int8), [0]))))
+            runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+            for run in list(open_runs):
+                if run not in runs:
+                    rects.append((run[0], open_runs.pop(run), run[1], row))
+            for run in runs:
+                open_runs.setdefault(run, row)
+        rects += [(c1, r1, c2, occupied.shape[0]) for (c1, c2), r1 in open_runs.items()]
+        return rects
+
+    def redact(self, frame: np.ndarray, regions, ksize=(51, 51), sigma: float = 30, mode: str = None,
+               feather: int = 0, tile: int = 32) -> np.ndarray:
+        """Blur the union of all (x, y, w, h) regions in one pass, in place
+
+        Boxes are rasterised into a tile grid and each connected group of tiles is split into
+        rectangles of tile row runs. Each rectangle is blurred with a margin of surrounding
+        pixels (so the blur has no seams between rectangles) and composited back through a
+        per-pixel mask; a group whose rectangles would cost more than its bounding rectangle
+        (AREA_OVERHEAD_PIXELS per extra area included) is blurred over that instead. Overlapping boxes are therefore blurred once, the
+        result does not depend on box order, and the cost follows the redacted area rather
+        than the number of boxes or the shape they make. On static screens each blur area is
+        hashed and the previous frame's blurred pixels are reused.
+
+        feather > 0 grows the mask by that many pixels and blends through a soft alpha edge;
+        the original boxes stay fully covered.
+        """
+        mode = mode or self.mode
+        frame_h, frame_w = frame.shape[:2]
+        feather = max(0, int(feather))
+
+        boxes = []
+        for (x, y, w, h) in regions:
+            x1, y1 = max(0, int(x) - feather), max(0, int(y) - feather)
+            x2, y2 = min(frame_w, int(x + w) + feather), min(frame_h, int(y + h) + feather)
+            if x2 > x1 and y2 > y1:
+                boxes.append((x1, y1, x2, y2))
+        if not boxes:
+            self._cache = {}
+            return frame
+
+        # Rasterise boxes into tiles and merge touching tiles into blur areas
+        grid = np.zeros((-(-frame_h // tile), -(-frame_w // tile)), dtype=np.uint8)
+        for (x1, y1, x2, y2) in boxes:
+            grid[y1 // tile:(y2 - 1) // tile + 1, x1 // tile:(x2 - 1) // tile + 1] = 1
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(grid, connectivity=8)
+
+        members = [[] for _ in range(count)]
+        for box in boxes:
+            members[labels[box[1] // tile, box[0] // tile]].append(box)
+
+        # Blur context around each rectangle; fill looks at no neighbours
+        margin = 0 if mode == 'fill' else self._kernel(ksize) // 2 + feather
+
+        settings = (mode, self._kernel(ksize), sigma, self.fill_color, frame.shape[2] if frame.ndim == 3 else 1)
+        new_cache = {}
+        cached_bytes = 0
+        for i in range(1, count):
+            tx, ty, tw, th = stats[i, :4]
+            bounds = (tx * tile, ty * tile, min(frame_w, (tx + tw) * tile), min(frame_h, (ty + th) * tile))
+
+            # (rectangle, padded blur area) pairs in pixels; a full rectangle of tiles stays whole
+            areas = [(bounds, bounds)]
+            if stats[i, cv2.CC_STAT_AREA] < tw * th:
+                split = []
+                for (c1, r1, c2, r2) in self._tile_rects(labels[ty:ty + th, tx:tx + tw] == i):
+                    rx1, ry1 = (tx + c1) * tile, (ty + r1) * tile
+                    rx2, ry2 = min(frame_w, (tx + c2) * tile), min(frame_h, (ty + r2) * tile)
+                    split.append(((rx1, ry1, rx2, ry2),
+                                  (max(0, rx1 - margin), max(0, ry1 - margin),
+                                   min(frame_w, rx2 + margin), min(frame_h, ry2 + margin))))
+                cost = sum((px2 - px1) * (py2 - py1) + AREA_OVERHEAD_PIXELS
+                           for _, (px1, py1, px2, py2) in split)
+                if cost < (bounds[2] - bounds[0]) * (bounds[3] - bounds[1]) + AREA_OVERHEAD_PIXELS:
+                    areas = split
+
+            # Blur every area before compositing any, so margins see the original pixels
+            blurred_areas = []
+            for rect, (px1, py1, px2, py2) in areas:
+                area = frame[py1:py2, px1:px2]
+                key = (px1, py1, px2, py2) + settings
+                content, blurred = self._blur_area_cached(area, key, ksize, sigma, mode)
+                if content is not None and cached_bytes + blurred.nbytes <= self.cache_max_bytes:
+                    new_cache[key] = (content, blurred)
+                    cached_bytes += blurred.nbytes
+                blurred_areas.append(blurred)
+
+            for (rect, padded), blurred in zip(areas, blurred_areas):
+                px1, py1, px2, py2 = padded
+                mask = np.zeros((py2 - py1, px2 - px1), dtype=np.uint8)
+                for (x1, y1, x2, y2) in members[i]:
+                    if x1 < px2 and x2 > px1 and y1 < py2 and y2 > py1:
+                        mask[max(0, y1 - py1):y2 - py1, max(0, x1 - px1):x2 - px1] = 1
+
+                # Only the rectangle itself is written; its margin belongs to the neighbours
+                inner = (slice(rect[1] - py1, rect[3] - py1), slice(rect[0] - px1, rect[2] - px1))
+                area = frame[rect[1]:rect[3], rect[0]:rect[2]]
+                if feather:
+                    k = 2 * feather + 1
+                    alpha = cv2.GaussianBlur(mask.astype(np.float32), (k, k), 0)[inner]
+                    area[...] = cv2.blendLinear(blurred[inner], area, alpha, 1.0 - alpha)
+                else:
+                    cv2.copyTo(blurred[inner], mask[inner], area)  # Masked copy in place (much faster than np.copyto(where=))
+
+        self._cache = new_cache
+        return frame
+
+
+def benchmark_modes(frame_size: Tuple[int, int] = (1920, 1080), roi_size: Tuple[int, int] = (800, 600),
+                    ksize=(51, 51), sigma: float = 30, repeats: int = 20) -> Dict[str, float]:
+    """Measure each mode's cost in ms per megapixel of redacted area
+
+    Uses a synthetic screen-like frame (noise plus text) so resize and blur paths see
+    realistic content. Returns {mode: ms_per_megapixel}.
+    """
+    width, height = frame_size
+    rng = np.random.default_rng(0)
+    frame = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    for i in range(0, height, 40):
+        cv2.putText(frame, "api_key = sk_live_0123456789abcdef", (20, i + 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
+
+    roi_w, roi_h = roi_size
+    region = [((width - roi_w) // 2, (height - roi_h) // 2, roi_w, roi_h)]
+    megapixels = roi_w * roi_h / 1e6
+
+    engine = BlurEngine()
+    results = {}
+    for mode in BLUR_MODES:
+        work = frame.copy()
+        engine.apply(work, region, ksize, sigma, mode)  # Warm-up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            engine.apply(work, region, ksize, sigma, mode)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+        results[mode] = elapsed_ms / megapixels
+    return results
+
+
+if __name__ == "__main__":
+    for mode, cost in benchmark_modes().items():
+        print(f"{mode:>10}: {cost:8.2f} ms/MP  ({BLUR_MODE_LABELS[mode]})")
@@ -0,0 +1,250 @@
+"""
+Capture - Dedicated screen capture thread feeding a preallocated frame ring
+Capture keeps its own timing; slow processing/encoding only drops frames, never delays grabs
+"""
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .capture_backend import CaptureBackend, MssBackend
+from .frame_pacer import DeadlineClock
+
+# Ring overflow policies
+DROP_OLDEST = 'drop_oldest'  # Overwrite the oldest unread frame (lowest latency, for streaming)
+DROP_NEWEST = 'drop_newest'  # Discard the incoming frame (keeps a contiguous run of queued frames)
+
+# Slot states
+_FREE, _WRITING, _READY, _IN_USE = range(4)
+
+
+class FrameSlot:
+    """A ring frame handed to the consumer by reference - call FrameRing.release() when done"""
+
+    __slots__ = ('index', 'frame', 'timestamp', 'seq')
+
+    def __init__(self, index: int, frame: np.ndarray, timestamp: float, seq: int):
+        self.index = index
+        self.frame = frame
+        self.timestamp = timestamp  # time.monotonic() of the grab
+        self.seq = seq  # Capture sequence number (gaps mean dropped frames)
+
+
+class FrameRing:
+    """Fixed ring of preallocated frames shared by one producer and one consumer
+
+    The producer writes straight into a free slot (acquire_write/commit), the consumer reads
+    slots in capture order without copying (get/release). When every slot is taken the
+    overflow policy decides which frame is lost; both cases are counted.
+    """
+
+    def __init__(self, capacity: int = 3, policy: str = DROP_OLDEST):
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown ring policy: {policy}")
+        self.capacity = max(2, capacity)
+        self.policy = policy
+
+        self.frames = [None] * self.capacity  # Preallocated (or adopted) frame per slot
+        self.state = [_FREE] * self.capacity
+        self.ready = deque()  # (index, timestamp, seq) in capture order
+        self.cond = threading.Condition()
+        self.closed = False
+
+        # Counters
+        self.written = 0
+        self.consumed = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.dropped_oldest + self.dropped_newest
+
+    @property
+    def depth(self) -> int:
+        """Frames captured but not yet taken by the consumer"""
+        return len(self.ready)
+
+    def _reserve(self) -> Optional[int]:
+        """Pick a slot to write (caller holds the lock)"""
+        for index, state in enumerate(self.state):
+            if state == _FREE:
+                return index
+
+        if self.policy == DROP_OLDEST and self.ready:
+            index, _, _ = self.ready.popleft()
+            self.dropped_oldest += 1
+            return index
+
+        self.dropped_newest += 1
+        return None
+
+    def acquire_write(self, shape: Tuple[int, ...] = None, dtype=np.uint8) -> Optional[int]:
+        """Reserve a slot for the next frame; returns its index or None if the frame is dropped
+
+        With shape, the slot's preallocated frame is (re)allocated to match and can be filled
+        through slot(). Without it the producer hands its own array to commit().
+        """
+        with self.cond:
+            if self.closed:
+                return None
+            index = self._reserve()
+            if index is None:
+                return None
+
+            self.state[index] = _WRITING
+            frame = self.frames[index]
+            if shape is not None and (frame is None or frame.shape != tuple(shape) or frame.dtype != dtype):
+                self.frames[index] = np.empty(shape, dtype=dtype)
+            return index
+
+    def slot(self, index: int) -> np.ndarray:
+        """Writable preallocated frame of a slot reserved with acquire_write(shape)"""
+        return self.frames[index]
+
+    def commit(self, index: int, timestamp: float, frame: np.ndarray = None) -> None:
+        """Publish a written slot to the consumer
+
+        frame adopts an existing array (e.g. a capture library's buffer) instead of the
+        preallocated one, so the pixels are never copied.
+        """
+        with self.cond:
+            if frame is not None:
+                self.frames[index] = frame
+            self.state[index] = _READY
+            self.ready.append((index, timestamp, self.written))
+            self.written += 1
+            self.cond.notify()
+
+    def abort(self, index: int) -> None:
+        """Give back a reserved slot without publishing it (e.g. the grab failed)"""
+        with self.cond:
+            self.state[index] = _FREE
+
+    def get(self, timeout: float = 0.5) -> Optional[FrameSlot]:
+        """Oldest ready frame by reference, or None on timeout/close"""
+        with self.cond:
+            if not self.ready and not self.closed:
+                self.cond.wait(timeout)
+            if not self.ready:
+                return None
+            index, timestamp, seq = self.ready.popleft()
+            self.state[index] = _IN_USE
+            self.consumed += 1
+            return FrameSlot(index, self.frames[index], timestamp, seq)
+
+    def release(self, slot: FrameSlot) -> None:
+        """Return a consumed frame's slot to the ring"""
+        with self.cond:
+            self.state[slot.index] = _FREE
+
+    def close(self) -> None:
+        """Wake the consumer and refuse further frames"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def stats(self) -> str:
+        """Short counter summary for logs"""
+        return (f"captured {self.written} | dropped {self.dropped} "
+                f"(oldest {self.dropped_oldest}, newest {self.dropped_newest}) | queued {self.depth}")
+
+
+class CaptureThread(threading.Thread):
+    """Grabs a monitor with a capture backend (mss by default) at a fixed rate into a FrameRing
+
+    pixel_format 'bgr' converts each grab into a preallocated BGR slot (one pass);
+    'bgra' adopts the backend's frame as the slot, so no pixel is copied on the capture side.
+    Grabber handles are per-thread, so the backend is opened inside run(). With a target that
+    follows a window, the grab box is re-resolved every refresh_interval seconds.
+    """
+
+    redacts = False  # Frames still need redaction by the consumer
+
+    def __init__(self, monitor: dict, fps: float, ring: FrameRing = None, pixel_format: str = 'bgr',
+                 target=None, refresh_interval: float = 0.5, backend: CaptureBackend = None):
+        super().__init__(daemon=True)
+        self.monitor = monitor
+        self.fps = fps
+        self.ring = ring or FrameRing()
+        self.pixel_format = pixel_format
+        self.target = target
+        self.refresh_interval = refresh_interval
+        self.backend = backend or MssBackend()
+        self.running = False
+        self.error = None  # Last exception that stopped the thread
+
+        self.grab_time_total = 0.0
+        self.grab_count = 0
+
+    @property
+    def avg_grab_ms(self) -> float:
+        return self.grab_time_total * 1000 / max(self.grab_count, 1)
+
+    def start(self):
+        self.running = True
+        super().start()
+
+    def stop(self, timeout: float = 2.0):
+        self.running = False
+        self.ring.close()
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+    def run(self):
+        print(f"✅ [Capture Thread] Started successfully ({self.backend.name})")
+        clock = DeadlineClock(self.fps)
+        consecutive_errors = 0
+        follow = self.target is not None and self.target.follows_geometry
+        last_refresh = time.monotonic()
+
+        try:
+            self.backend.open(self.monitor, self.fps)
+            try:
+                while self.running:
+                    now = time.monotonic()
+                    if follow and now - last_refresh >= self.refresh_interval:
+                        last_refresh = now
+                        monitor = self.target.resolve(self.backend.monitors())
+                        if monitor is not None:  # Keep the last box while minimized/hidden
+                            self.monitor = monitor
+
+                    # Missed deadlines are skipped, not caught up on
+                    grab_start = clock.wait()
+                    try:
+                        bgra = self.backend.grab(self.monitor)
+                        consecutive_errors = 0
+                    except Exception as e:
+                        consecutive_errors += 1
+                        print(f"Frame capture error {consecutive_errors}: {e}")
+                        if consecutive_errors > 10:
+                            raise
+                        time.sleep(0.1)
+                        continue
+
+                    if self.pixel_format == 'bgra':
+                        index = self.ring.acquire_write()
+                        if index is None:
+                            continue
+                        self.ring.commit(index, grab_start, bgra)
+                    else:
+                        index = self.ring.acquire_write((bgra.shape[0], bgra.shape[1], 3))
+                        if index is None:
+                            continue
+                        # Convert straight from the grabbed buffer into the ring slot (no intermediate array)
+                        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self.ring.slot(index))
+                        self.ring.commit(index, grab_start)
+
+                    self.grab_time_total += time.monotonic() - grab_start
+                    self.grab_count += 1
+            finally:
+                self.backend.close()
+        except Exception as e:
+            self.error = e
+            print(f"❌ [Capture Thread Error] {e}")
+        finally:
+            self.ring.close()
+            print("🛑 [Capture Thread] Stopped")
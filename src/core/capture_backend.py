@@ -0,0 +1,284 @@
+"""
+Capture Backend - Interchangeable screen grabbers behind one interface
+mss (all platforms) and FFmpeg x11grab (Linux/X11, XShm grabbing in native code, raw frames over a pipe)
+"""
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .frame_pipe import wrap_screenshot
+
+BACKEND_MSS = 'mss'
+BACKEND_X11GRAB = 'x11grab'
+
+# x11grab needs an X display and an ffmpeg binary; it uses XShm by default on a local display
+X11GRAB_AVAILABLE = (sys.platform.startswith('linux') and bool(os.environ.get('DISPLAY'))
+                     and shutil.which('ffmpeg') is not None)
+
+
+class CaptureBackend(ABC):
+    """Grabs boxes of the desktop as (h, w, 4) BGRA frames
+
+    open() is called on the thread that will grab (some grabbers hold per-thread handles).
+    grab() returns a frame the caller owns - it is never reused by the backend, so it can be
+    adopted by a FrameRing slot without copying.
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def open(self, monitor: dict, fps: float) -> None:
+        """Prepare to grab monitor at about fps"""
+
+    @abstractmethod
+    def grab(self, monitor: dict) -> np.ndarray:
+        """The current contents of monitor"""
+
+    def monitors(self) -> List[dict]:
+        """Desktop layout in mss form (index 0 is the whole virtual desktop)"""
+        import mss
+        with mss.mss() as sct:
+            return [dict(m) for m in sct.monitors]
+
+    def close(self) -> None:
+        pass
+
+    def cpu_seconds(self) -> float:
+        """CPU time spent outside this process (helper processes), for benchmarks"""
+        return 0.0
+
+
+class MssBackend(CaptureBackend):
+    """mss grabber: one GetImage/XShm/BitBlt per call, returned as a view of mss' buffer"""
+
+    name = BACKEND_MSS
+
+    def __init__(self):
+        self.sct = None
+
+    def open(self, monitor: dict, fps: float) -> None:
+        import mss
+        self.sct = mss.mss()
+
+    def grab(self, monitor: dict) -> np.ndarray:
+        return wrap_screenshot(self.sct.grab(monitor))
+
+    def monitors(self) -> List[dict]:
+        return [dict(m) for m in self.sct.monitors]
+
+    def close(self) -> None:
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+
+
+class X11GrabBackend(CaptureBackend):
+    """FFmpeg x11grab reading raw BGRA frames from a pipe
+
+    FFmpeg grabs at the requested rate; a reader thread pulls each frame straight into a new
+    array (readinto, no intermediate bytes) and keeps only the latest, so a slow consumer
+    never sees a backlog of stale frames. A change of grab box (window targets) restarts FFmpeg.
+    """
+
+    name = BACKEND_X11GRAB
+
+    def __init__(self, display: str = None, draw_mouse: bool = False, timeout: float = 2.0):
+        self.display = display or os.environ.get('DISPLAY', ':0')
+        self.draw_mouse = draw_mouse
+        self.timeout = timeout
+        self.fps = 30.0
+        self.monitor = None
+        self.process = None
+        self.reader = None
+        self.cond = threading.Condition()
+        self.latest = None
+        self.latest_seq = 0
+        self.returned_seq = 0
+        self.reader_error = None
+
+    def _command(self, monitor: dict) -> List[str]:
+        return [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin',
+            '-f', 'x11grab',
+            '-draw_mouse', '1' if self.draw_mouse else '0',
+            '-framerate', str(self.fps),
+            '-video_size', f"{monitor['width']}x{monitor['height']}",
+            '-fflags', 'nobuffer',
+            '-i', f"{self.display}+{monitor['left']},{monitor['top']}",
+            '-f', 'rawvideo', '-pix_fmt', 'bgra', 'pipe:1'
+        ]
+
+    def open(self, monitor: dict, fps: float) -> None:
+        self.fps = fps
+        self._start(monitor)
+
+    def _start(self, monitor: dict) -> None:
+        self.monitor = dict(monitor)
+        self.reader_error = None
+        self.process = subprocess.Popen(self._command(self.monitor), stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, bufsize=0)
+        self.reader = threading.Thread(target=self._read_frames, args=(self.process, self.monitor), daemon=True)
+        self.reader.start()
+
+    def _stop(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+        if self.reader is not None:
+            self.reader.join(timeout=self.timeout)
+            self.reader = None
+
+    def _read_frames(self, process, monitor: dict) -> None:
+        shape = (monitor['height'], monitor['width'], 4)
+        size = shape[0] * shape[1] * 4
+        try:
+            while True:
+                frame = np.empty(shape, dtype=np.uint8)
+                view = memoryview(frame).cast('B')
+                filled = 0
+                while filled < size:
+                    n = process.stdout.readinto(view[filled:])
+                    if not n:
+                        raise EOFError("x11grab stream ended")
+                    filled += n
+                with self.cond:
+                    self.latest = frame
+                    self.latest_seq += 1
+                    self.cond.notify_all()
+        except Exception as e:
+            with self.cond:
+                self.reader_error = e
+                self.cond.notify_all()
+
+    def grab(self, monitor: dict) -> np.ndarray:
+        if monitor != self.monitor:
+            self._stop()
+            self._start(monitor)
+
+        with self.cond:
+            deadline = time.monotonic() + self.timeout
+            while self.latest_seq == self.returned_seq and self.reader_error is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("x11grab produced no frame")
+                self.cond.wait(remaining)
+            if self.reader_error is not None and self.latest_seq == self.returned_seq:
+                raise RuntimeError(f"x11grab failed: {self.reader_error}")
+            self.returned_seq = self.latest_seq
+            frame, self.latest = self.latest, None
+        return frame
+
+    def close(self) -> None:
+        self._stop()
+
+    def cpu_seconds(self) -> float:
+        """utime + stime of the FFmpeg process from /proc"""
+        if self.process is None:
+            return 0.0
+        try:
+            with open(f"/proc/{self.process.pid}/stat") as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        except (OSError, IndexError, ValueError):
+            return 0.0
+
+
+CAPTURE_BACKENDS = {
+    BACKEND_MSS: MssBackend,
+    BACKEND_X11GRAB: X11GrabBackend,
+}
+
+BACKEND_LABELS = {
+    BACKEND_MSS: "mss (all platforms)",
+    BACKEND_X11GRAB: "FFmpeg x11grab (Linux/X11)",
+}
+
+
+def available_backends() -> List[str]:
+    """Backend names usable on this machine"""
+    return [name for name in CAPTURE_BACKENDS if name != BACKEND_X11GRAB or X11GRAB_AVAILABLE]
+
+
+def create_backend(name: str = BACKEND_MSS) -> CaptureBackend:
+    """Backend instance by name, falling back to mss when the requested one is unavailable"""
+    if name not in available_backends():
+        if name != BACKEND_MSS:
+            print(f"⚠️  [Capture] Backend '{name}' not available, using mss")
+        name = BACKEND_MSS
+    return CAPTURE_BACKENDS[name]()
+
+
+def benchmark_backends(sizes=((1280, 720), (1920, 1080), (2560, 1440)), fps: float = 30.0,
+                       frames: int = 90) -> Dict[str, Dict[str, float]]:
+    """Grab latency and CPU use per backend and capture size on the current display
+
+    'grab_ms' is the wait inside grab() (for x11grab: until the next frame is on hand),
+    'cpu_pct' covers this process plus helper processes, as a percentage of one core.
+    Returns {'backend WxH': {'grab_ms', 'p95_ms', 'fps', 'cpu_pct'}}.
+    """
+    results = {}
+    for name in available_backends():
+        for width, height in sizes:
+            monitor = {'left': 0, 'top': 0, 'width': width, 'height': height}
+            backend = CAPTURE_BACKENDS[name]()
+            backend.open(monitor, fps)
+            try:
+                backend.grab(monitor)  # Warm-up (process start, first frame)
+                period = 1.0 / fps
+                times = []
+                wall_start, cpu_start, helper_start = time.monotonic(), time.process_time(), backend.cpu_seconds()
+                next_deadline = wall_start
+                for _ in range(frames):
+                    now = time.monotonic()
+                    if now < next_deadline:
+                        time.sleep(next_deadline - now)
+                    next_deadline += period
+                    start = time.perf_counter()
+                    backend.grab(monitor)
+                    times.append((time.perf_counter() - start) * 1000)
+                wall = time.monotonic() - wall_start
+                cpu = time.process_time() - cpu_start + backend.cpu_seconds() - helper_start
+            finally:
+                backend.close()
+            times.sort()
+            results[f"{name} {width}x{height}"] = {
+                'grab_ms': sum(times) / len(times),
+                'p95_ms': times[int(len(times) * 0.95) - 1],
+                'fps': frames / wall,
+                'cpu_pct': cpu * 100 / wall,
+            }
+    return results
+
+
+def _start_xvfb(size=(2560, 1440), display: str = ':99') -> Optional[subprocess.Popen]:
+    """Start a virtual X server for the benchmark and point DISPLAY at it"""
+    if shutil.which('Xvfb') is None:
+        print("⚠️  Xvfb not found, benchmarking the current display")
+        return None
+    process = subprocess.Popen(['Xvfb', display, '-screen', '0', f"{size[0]}x{size[1]}x24", '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    os.environ['DISPLAY'] = display
+    global X11GRAB_AVAILABLE
+    X11GRAB_AVAILABLE = shutil.which('ffmpeg') is not None
+    return process
+
+
+if __name__ == "__main__":
+    # python -m core.capture_backend [--xvfb]   (from src/)
+    xvfb = _start_xvfb() if '--xvfb' in sys.argv else None
+    try:
+        for key, r in benchmark_backends().items():
+            print(f"{key:>22}: grab {r['grab_ms']:6.2f} ms (p95 {r['p95_ms']:6.2f}) | "
+                  f"{r['fps']:5.1f} fps | CPU {r['cpu_pct']:5.1f}%")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
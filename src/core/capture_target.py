@@ -0,0 +1,108 @@
+"""
+Capture Target - Which part of the desktop to grab: a monitor, a fixed region or a window
+Resolves to an mss monitor dict; window targets follow the window as it moves
+"""
+from typing import List, Optional
+
+try:
+    import pygetwindow as gw
+    WINDOW_CAPTURE_AVAILABLE = True
+except Exception:  # ImportError, or NotImplementedError on platforms pygetwindow doesn't support
+    gw = None
+    WINDOW_CAPTURE_AVAILABLE = False
+
+TARGET_MONITOR = 'monitor'
+TARGET_REGION = 'region'
+TARGET_WINDOW = 'window'
+TARGET_ALL_MONITORS = 'all_monitors'  # Every monitor, one pipeline process each
+
+
+def _clip_to_desktop(left: int, top: int, width: int, height: int, desktop: dict) -> Optional[dict]:
+    """Clip a rectangle to the virtual desktop; sizes are made even for yuv420p encoding"""
+    x1 = max(left, desktop['left'])
+    y1 = max(top, desktop['top'])
+    x2 = min(left + width, desktop['left'] + desktop['width'])
+    y2 = min(top + height, desktop['top'] + desktop['height'])
+    w, h = (x2 - x1) & ~1, (y2 - y1) & ~1
+    if w < 16 or h < 16:
+        return None
+    return {'left': int(x1), 'top': int(y1), 'width': int(w), 'height': int(h)}
+
+
+class CaptureTarget:
+    """A capture area description; resolve() turns it into the box mss should grab"""
+
+    def __init__(self, kind: str = TARGET_MONITOR, monitor_index: int = 1, region=None,
+                 window_title: str = None):
+        self.kind = kind
+        self.monitor_index = monitor_index
+        self.region = tuple(region) if region else None  # (left, top, width, height) in desktop pixels
+        self.window_title = window_title
+
+    @classmethod
+    def monitor(cls, index: int = 1) -> 'CaptureTarget':
+        return cls(TARGET_MONITOR, monitor_index=index)
+
+    @classmethod
+    def from_region(cls, left: int, top: int, width: int, height: int) -> 'CaptureTarget':
+        return cls(TARGET_REGION, region=(left, top, width, height))
+
+    @classmethod
+    def window(cls, title: str) -> 'CaptureTarget':
+        return cls(TARGET_WINDOW, window_title=title)
+
+    @classmethod
+    def all_monitors(cls) -> 'CaptureTarget':
+        return cls(TARGET_ALL_MONITORS)
+
+    @property
+    def follows_geometry(self) -> bool:
+        """True when the grab box has to be re-resolved while capturing"""
+        return self.kind == TARGET_WINDOW
+
+    def resolve(self, monitors) -> Optional[dict]:
+        """mss monitor dict for this target given sct.monitors, or None if it can't be grabbed
+
+        monitors[0] is the whole virtual desktop, monitors[1:] the individual screens.
+        """
+        desktop = monitors[0]
+
+        if self.kind == TARGET_REGION and self.region:
+            return _clip_to_desktop(*self.region, desktop)
+
+        if self.kind == TARGET_ALL_MONITORS:
+            return dict(desktop)
+
+        if self.kind == TARGET_WINDOW:
+            if not WINDOW_CAPTURE_AVAILABLE or not self.window_title:
+                return None
+            for win in gw.getWindowsWithTitle(self.window_title):
+                if getattr(win, 'isMinimized', False) or win.width <= 0 or win.height <= 0:
+                    continue
+                return _clip_to_desktop(win.left, win.top, win.width, win.height, desktop)
+            return None
+
+        index = self.monitor_index if 0 < self.monitor_index < len(monitors) else 1
+        return dict(monitors[index])
+
+    def describe(self) -> str:
+        if self.kind == TARGET_REGION and self.region:
+            x, y, w, h = self.region
+            return f"region {w}x{h} at ({x}, {y})"
+        if self.kind == TARGET_WINDOW:
+            return f"window '{self.window_title}'"
+        if self.kind == TARGET_ALL_MONITORS:
+            return "all monitors"
+        return f"monitor {self.monitor_index}"
+
+
+def list_window_titles() -> List[str]:
+    """Titles of visible top-level windows (empty when window capture is unavailable)"""
+    if not WINDOW_CAPTURE_AVAILABLE:
+        return []
+    titles = []
+    for title in gw.getAllTitles():
+        title = title.strip()
+        if title and title not in titles:
+            titles.append(title)
+    return titles
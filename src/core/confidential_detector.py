@@ -11,15 +11,20 @@ from typing import List, Tuple, Set
 from presidio_analyzer import AnalyzerEngine
 from presidio_analyzer.nlp_engine import NlpEngineProvider
 
+from .detector_router import crop_to_regions
+from .blur_engine import BlurEngine
+
 
 class ConfidentialDataDetector:
     """Detects confidential information using OCR, Presidio, and pattern matching"""
     
     def __init__(self, padding_px=20):
         self.padding_px = padding_px
+        self.frame_count = 0
         self.blur_regions_cache = []
         self.last_detect_time = 0.0
         self.cache_ttl_sec = 1.2  # Keep last boxes briefly to prevent flicker
+        self.blur_engine = BlurEngine()  # Replaced by the app's shared engine when available
         
         # Initialize Presidio
         try:
@@ -64,12 +69,18 @@ class ConfidentialDataDetector:
             re.IGNORECASE
         )
     
-    def detect_confidential_data(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    def detect_confidential_data(self, frame: np.ndarray, text_regions=None) -> List[Tuple[int, int, int, int]]:
         """
         Detect confidential data using OCR + Presidio
         Returns list of (x, y, width, height) tuples for regions to blur
         
         PERFORMANCE OPTIMIZATION: Downscales frame for OCR, then scales coordinates back
+        
+        Args:
+            frame: Full resolution frame
+            text_regions: Optional (x, y, w, h) non-empty regions from the detector router.
+                OCR then only reads those regions; None or an empty list reads the full
+                frame (routing must never be the reason text goes unredacted).
         """
         self.frame_count += 1
         
@@ -77,13 +88,19 @@ class ConfidentialDataDetector:
             # ===== DOWNSCALE FOR PERFORMANCE =====
             # OCR on full 1920x1080 is VERY slow (~300ms)
             # Downscaling to 640x360 makes it 10x faster (~30ms)
-            orig_height, orig_width = frame.shape[:2]
+            orig_width = frame.shape[1]
             target_width = 640
             scale_factor = target_width / orig_width
-            target_height = int(orig_height * scale_factor)
             
-            # Downscale frame for OCR
-            small_frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_LINEAR)
+            # ===== ROUTE: only OCR the text tiles =====
+            offset_x, offset_y = 0, 0
+            if text_regions:
+                frame, (offset_x, offset_y) = crop_to_regions(frame, text_regions)
+            
+            # Downscale frame for OCR (same scale as a full frame so text size is unchanged)
+            crop_height, crop_width = frame.shape[:2]
+            small_size = (max(1, int(crop_width * scale_factor)), max(1, int(crop_height * scale_factor)))
+            small_frame = cv2.resize(frame, small_size, interpolation=cv2.INTER_LINEAR)
             
             # Convert to grayscale for OCR
             gray = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
@@ -186,9 +203,9 @@ class ConfidentialDataDetector:
             # This ensures blur is applied at the CORRECT LOCATION on the full-res frame
             scaled_regions = []
             for (x, y, w, h) in all_regions:
-                # Scale coordinates back to original frame size
-                scaled_x = int(x / scale_factor)
-                scaled_y = int(y / scale_factor)
+                # Scale coordinates back to original frame size (plus crop offset)
+                scaled_x = int(x / scale_factor) + offset_x
+                scaled_y = int(y / scale_factor) + offset_y
                 scaled_w = int(w / scale_factor)
                 scaled_h = int(h / scale_factor)
                 scaled_regions.append((scaled_x, scaled_y, scaled_w, scaled_h))
@@ -210,31 +227,18 @@ class ConfidentialDataDetector:
     
     def apply_blur_to_frame(self, frame: np.ndarray, blur_regions: List[Tuple[int, int, int, int]], 
                            blur_ksize=(35, 35), blur_sigma=25) -> np.ndarray:
-        """Apply Gaussian blur to specified regions
+        """Apply blur to specified regions with the shared blur engine (single mask pass)
         
         Args:
             frame: Full resolution frame (e.g., 1920x1080)
             blur_regions: List of (x, y, width, height) tuples in FULL RESOLUTION coordinates
-            blur_ksize: Gaussian blur kernel size
+            blur_ksize: Blur kernel size (scaled by the engine's intensity)
             blur_sigma: Gaussian blur sigma
         
         Returns:
             Frame with blur applied at correct locations
         """
-        frame_h, frame_w = frame.shape[:2]
-        
-        for (x, y, w, h) in blur_regions:
-            # Clamp coordinates to frame boundaries
-            x1, y1 = max(0, x), max(0, y)
-            x2, y2 = min(frame_w, x + w), min(frame_h, y + h)
-            
-            # Apply blur if region is valid
-            if x2 > x1 and y2 > y1:
-                roi = frame[y1:y2, x1:x2]
-                if roi.size > 0:
-                    frame[y1:y2, x1:x2] = cv2.GaussianBlur(roi, blur_ksize, blur_sigma)
-        
-        return frame
+        return self.blur_engine.redact(frame, blur_regions, blur_ksize, blur_sigma)
     
     @staticmethod
     def _iou(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
@@ -0,0 +1,109 @@
+"""
+Detector Router - Content-aware dispatch of detectors per screen region
+Classifies tiles once per frame, then sends OCR/patterns to every non-empty tile, faces to
+photographic and moving tiles, and nothing to empty tiles
+"""
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+from .region_classifier import RegionClassifier, TILE_EMPTY, TILE_TEXT, TILE_PHOTO
+
+
+class RoutingPlan:
+    """Per-detector regions for one frame
+
+    text_regions cover every tile that isn't blank: large or dense text and text drawn over
+    images look photographic to the classifier, so routing may only narrow OCR down to
+    the non-empty part of the screen, never drop content from it. An empty list means the
+    whole frame is blank and OCR falls back to the full frame.
+
+    Regions are stored in downscaled-frame coordinates (where classification and face
+    detection run); frame_regions() converts them to full-frame coordinates for OCR.
+    """
+
+    def __init__(self, text_regions, face_regions, tile_counts, scale: float):
+        self.text_regions = text_regions
+        self.face_regions = face_regions
+        self.tile_counts = tile_counts  # {TILE_EMPTY: n, TILE_TEXT: n, TILE_PHOTO: n}
+        self.scale = scale
+
+    def frame_regions(self, regions) -> List[Tuple[int, int, int, int]]:
+        """Scale downscaled-frame regions back to full-frame coordinates"""
+        s = self.scale
+        return [(int(x / s), int(y / s), int(w / s), int(h / s)) for (x, y, w, h) in regions]
+
+    def summary(self) -> str:
+        """Short tile breakdown for logs"""
+        total = max(sum(self.tile_counts.values()), 1)
+        return (f"text {self.tile_counts[TILE_TEXT] / total:.0%} | "
+                f"photo {self.tile_counts[TILE_PHOTO] / total:.0%} | "
+                f"empty {self.tile_counts[TILE_EMPTY] / total:.0%}")
+
+
+class DetectorRouter:
+    """Builds a RoutingPlan from the downscaled frame and the classifier's motion history"""
+
+    def __init__(self, classifier: RegionClassifier = None, scale: float = 0.5):
+        self.classifier = classifier or RegionClassifier()
+        self.scale = scale  # Downscale factor of the frames passed to plan()
+
+    def plan(self, small_bgr: np.ndarray, gray: np.ndarray, motion_history=None,
+             tracked_boxes=None) -> RoutingPlan:
+        """Classify tiles and return the regions each detector should scan
+
+        tracked_boxes (downscaled coordinates) are always routed to face detection so
+        existing tracks get confirmed or dropped.
+        """
+        labels = self.classifier.classify_tiles(small_bgr, gray)
+        moving = self.classifier.moving_tiles(labels, motion_history)
+
+        text_tiles = labels != TILE_EMPTY
+        face_tiles = (labels == TILE_PHOTO) | moving
+
+        # Classifier labels only (OCR also scans photo tiles), so the shares add up to 100%
+        tile_counts = {
+            TILE_EMPTY: int(np.count_nonzero(labels == TILE_EMPTY)),
+            TILE_TEXT: int(np.count_nonzero(labels == TILE_TEXT)),
+            TILE_PHOTO: int(np.count_nonzero(labels == TILE_PHOTO)),
+        }
+        return RoutingPlan(
+            text_regions=self.classifier.tiles_to_regions(text_tiles, gray.shape),
+            face_regions=self.classifier.tiles_to_regions(face_tiles, gray.shape, tracked_boxes),
+            tile_counts=tile_counts,
+            scale=self.scale,
+        )
+
+    def plan_for_frame(self, frame: np.ndarray, motion_history=None, tracked_boxes=None) -> RoutingPlan:
+        """Convenience for workers that only hold the full-resolution frame"""
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return self.plan(small, gray, motion_history, tracked_boxes)
+
+
+def crop_to_regions(image: np.ndarray, regions) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Crop image to the bounding box of regions and blank everything outside them
+
+    Non-region pixels are filled with the crop's median colour so no artificial edges are
+    introduced for OCR. Returns (crop, (offset_x, offset_y)).
+    """
+    img_h, img_w = image.shape[:2]
+    x1 = max(0, min(x for x, _, _, _ in regions))
+    y1 = max(0, min(y for _, y, _, _ in regions))
+    x2 = min(img_w, max(x + w for x, _, w, _ in regions))
+    y2 = min(img_h, max(y + h for _, y, _, h in regions))
+
+    crop = image[y1:y2, x1:x2]
+    if len(regions) == 1:
+        return crop.copy(), (x1, y1)
+
+    channels = crop.shape[2] if crop.ndim == 3 else 1
+    fill = np.median(crop[::8, ::8].reshape(-1, channels), axis=0).astype(image.dtype)
+    canvas = np.empty_like(crop)
+    canvas[...] = fill if crop.ndim == 3 else fill[0]
+    for (x, y, w, h) in regions:
+        rx1, ry1 = max(x, x1), max(y, y1)
+        rx2, ry2 = min(x + w, x2), min(y + h, y2)
+        if rx2 > rx1 and ry2 > ry1:
+            canvas[ry1 - y1:ry2 - y1, rx1 - x1:rx2 - x1] = image[ry1:ry2, rx1:rx2]
+    return canvas, (x1, y1)
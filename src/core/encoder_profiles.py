@@ -0,0 +1,392 @@
+"""
+Encoder Profiles - Named H.264 encoder configurations, hardware encoder probing and a machine benchmark
+Low latency / balanced / quality map to x264 preset, tune, threads and intra refresh (or a GPU encoder's equivalents)
+"""
+import copy
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import psutil  # Process CPU times on Windows and macOS (Linux reads /proc)
+except ImportError:
+    psutil = None
+
+PROFILE_LOW_LATENCY = 'low_latency'
+PROFILE_BALANCED = 'balanced'
+PROFILE_QUALITY = 'quality'
+PROFILE_CUSTOM = 'custom'
+
+# GPU encoders that take system-memory frames directly, in order of preference
+HARDWARE_ENCODERS = {
+    'h264_nvenc': "NVIDIA NVENC",
+    'h264_qsv': "Intel Quick Sync",
+    'h264_amf': "AMD AMF",
+    'h264_videotoolbox': "Apple VideoToolbox",
+}
+
+# Speed/latency options per hardware encoder and profile (custom profiles use balanced)
+_HARDWARE_SPEED_ARGS = {
+    'h264_nvenc': {
+        PROFILE_LOW_LATENCY: ['-preset', 'p1', '-tune', 'ull', '-bf', '0'],
+        PROFILE_BALANCED: ['-preset', 'p4'],
+        PROFILE_QUALITY: ['-preset', 'p6'],
+    },
+    'h264_qsv': {
+        PROFILE_LOW_LATENCY: ['-preset', 'veryfast', '-async_depth', '1', '-bf', '0'],
+        PROFILE_BALANCED: ['-preset', 'medium'],
+        PROFILE_QUALITY: ['-preset', 'slower'],
+    },
+    'h264_amf': {
+        PROFILE_LOW_LATENCY: ['-usage', 'ultralowlatency', '-quality', 'speed'],
+        PROFILE_BALANCED: ['-quality', 'balanced'],
+        PROFILE_QUALITY: ['-quality', 'quality'],
+    },
+    'h264_videotoolbox': {
+        PROFILE_LOW_LATENCY: ['-realtime', '1', '-bf', '0'],
+        PROFILE_BALANCED: [],
+        PROFILE_QUALITY: [],
+    },
+}
+
+# Presets and tunes the benchmark tries (slower presets rarely run in real time next to capture)
+BENCHMARK_PRESETS = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium']
+BENCHMARK_TUNES = [None, 'zerolatency']
+
+# Share of the whole machine's CPU a profile may use for encoding (the rest is for capture
+# and redaction); the benchmark picks the slowest preset that stays within it in real time
+CPU_BUDGETS = {
+    PROFILE_LOW_LATENCY: 0.25,
+    PROFILE_BALANCED: 0.25,
+    PROFILE_QUALITY: 0.5,
+}
+
+
+class EncoderProfile:
+    """One encoder configuration: x264 preset/tune/threads/intra refresh, or a GPU encoder
+
+    tune='zerolatency' turns off B-frames, lookahead and frame threading, so every frame
+    leaves the encoder as soon as it is encoded. intra_refresh replaces IDR frames by a
+    column of intra blocks sweeping across each GOP: no keyframe bitrate spikes, but no
+    clean seek points either, so it is only meant for live viewers that join mid-stream.
+    """
+
+    def __init__(self, name: str, label: str, preset: str, tune: Optional[str] = None, threads: int = 0,
+                 intra_refresh: bool = False, hardware: Optional[str] = None):
+        self.name = name
+        self.label = label
+        self.preset = preset
+        self.tune = tune
+        self.threads = threads  # 0 = x264 decides
+        self.intra_refresh = intra_refresh
+        self.hardware = hardware  # FFmpeg encoder name from HARDWARE_ENCODERS, or None for libx264
+
+    def replace(self, **changes) -> 'EncoderProfile':
+        """Copy with some fields changed"""
+        profile = copy.copy(self)
+        for key, value in changes.items():
+            setattr(profile, key, value)
+        return profile
+
+    @property
+    def codec(self) -> str:
+        return self.hardware or 'libx264'
+
+    def video_args(self, crf: Optional[int], bitrate: Optional[int]) -> List[str]:
+        """-c:v and everything up to rate control; bitrate in kbit/s caps (or with crf=None sets) the rate"""
+        if self.hardware:
+            speed = _HARDWARE_SPEED_ARGS[self.hardware]
+            args = ['-c:v', self.hardware] + speed.get(self.name, speed[PROFILE_BALANCED])
+            args += ['-pix_fmt', 'nv12' if self.hardware == 'h264_qsv' else 'yuv420p']
+        else:
+            args = ['-c:v', 'libx264', '-preset', self.preset, '-pix_fmt', 'yuv420p']
+            if self.tune:
+                args += ['-tune', self.tune]
+            if self.threads:
+                args += ['-threads', str(self.threads)]
+            if self.intra_refresh:
+                args += ['-x264-params', 'intra-refresh=1']
+
+        if crf is not None:
+            args += self._quality_args(crf, capped=bool(bitrate))
+        if bitrate:
+            if crf is None:
+                args += ['-b:v', f"{bitrate}k"]
+            args += ['-maxrate', f"{bitrate}k", '-bufsize', f"{bitrate * 2}k"]
+        return args
+
+    def _quality_args(self, crf: int, capped: bool) -> List[str]:
+        """Constant-quality mode at roughly x264's CRF scale"""
+        if self.hardware == 'h264_nvenc':
+            return ['-rc', 'vbr', '-cq', str(crf)] + ([] if capped else ['-b:v', '0'])
+        if self.hardware == 'h264_qsv':
+            return ['-global_quality', str(crf)]
+        if self.hardware == 'h264_amf':
+            return ['-rc', 'cqp', '-qp_i', str(crf), '-qp_p', str(crf)]
+        if self.hardware == 'h264_videotoolbox':
+            return ['-q:v', str(max(1, min(100, 100 - 2 * crf)))]
+        return ['-crf', str(crf)]
+
+    def describe(self) -> str:
+        if self.hardware:
+            return f"{HARDWARE_ENCODERS[self.hardware]} ({self.label})"
+        parts = [f"libx264 {self.preset}"]
+        if self.tune:
+            parts.append(f"tune {self.tune}")
+        if self.threads:
+            parts.append(f"{self.threads} threads")
+        if self.intra_refresh:
+            parts.append("intra refresh")
+        return " ".join(parts)
+
+
+DEFAULT_PROFILES = {
+    PROFILE_LOW_LATENCY: EncoderProfile(PROFILE_LOW_LATENCY, "Low latency", 'veryfast', tune='zerolatency'),
+    PROFILE_BALANCED: EncoderProfile(PROFILE_BALANCED, "Balanced", 'veryfast'),
+    PROFILE_QUALITY: EncoderProfile(PROFILE_QUALITY, "Quality", 'medium'),
+}
+
+
+_hardware_lock = threading.Lock()
+_hardware_encoders = None
+
+
+def probe_hardware_encoders(ffmpeg: str = 'ffmpeg') -> List[str]:
+    """GPU encoders that actually work here (cached)
+
+    Being listed by 'ffmpeg -encoders' only means FFmpeg was built with it, so each one
+    encodes a few frames to prove the device and driver are there.
+    """
+    global _hardware_encoders
+    with _hardware_lock:
+        if _hardware_encoders is not None:
+            return list(_hardware_encoders)
+        usable = []
+        try:
+            listing = subprocess.run([ffmpeg, '-hide_banner', '-encoders'], capture_output=True,
+                                     text=True, timeout=10).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            listing = ''
+        for encoder in HARDWARE_ENCODERS:
+            if f" {encoder} " not in listing:
+                continue
+            try:
+                result = subprocess.run(
+                    [ffmpeg, '-hide_banner', '-loglevel', 'error', '-f', 'lavfi',
+                     '-i', 'testsrc2=size=640x360:rate=30', '-frames:v', '5', '-c:v', encoder,
+                     '-pix_fmt', 'nv12' if encoder == 'h264_qsv' else 'yuv420p', '-f', 'null', '-'],
+                    capture_output=True, timeout=15)
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+            if result.returncode == 0:
+                usable.append(encoder)
+        _hardware_encoders = usable
+        if usable:
+            print(f"✅ [Encoder] Hardware encoders: {', '.join(HARDWARE_ENCODERS[e] for e in usable)}")
+        else:
+            print("ℹ️  [Encoder] No working hardware encoder, using libx264")
+        return list(usable)
+
+
+def best_hardware_encoder(ffmpeg: str = 'ffmpeg') -> Optional[str]:
+    """Preferred working GPU encoder, or None"""
+    usable = probe_hardware_encoders(ffmpeg)
+    return usable[0] if usable else None
+
+
+def synthetic_screen_frames(size, count: int = 60, seed: int = 0) -> List[np.ndarray]:
+    """BGR frames that behave like desktop content for the encoder
+
+    A static desktop with a text window, a scrolling text area, a moving window and a small
+    video playing in a corner: mostly unchanged pixels, sharp edges and some real motion.
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    desktop = np.empty((height, width, 3), dtype=np.uint8)
+    desktop[:] = (64, 48, 40)
+    desktop[:height // 24] = (30, 30, 30)  # Taskbar
+
+    # Text: rows of dark "words" of random length on a light window
+    def text_block(w, h):
+        block = np.full((h, w, 3), 245, dtype=np.uint8)
+        for y in range(8, h - 14, 18):
+            x = 10
+            while x < w - 20:
+                word = int(rng.integers(12, 70))
+                block[y:y + 10, x:min(x + word, w - 10)] = 30
+                x += word + int(rng.integers(6, 12))
+        return block
+
+    win_w, win_h = width // 2, height * 2 // 3
+    desktop[height // 8:height // 8 + win_h, width // 16:width // 16 + win_w] = text_block(win_w, win_h)
+    scroll = text_block(width // 3, height * 2)
+    mover = text_block(width // 4, height // 4)
+    video_w, video_h = width // 5, height // 5
+
+    frames = []
+    for i in range(count):
+        frame = desktop.copy()
+        # Scrolling document on the right
+        top = (i * 6) % (scroll.shape[0] - height // 2)
+        frame[height // 6:height // 6 + height // 2, width - width // 3 - 20:width - 20] = scroll[top:top + height // 2]
+        # Window being dragged across the screen
+        x = int((width - mover.shape[1]) * (0.5 + 0.4 * np.sin(i / count * 2 * np.pi)))
+        y = height - mover.shape[0] - 40
+        frame[y:y + mover.shape[0], x:x + mover.shape[1]] = mover
+        # Video: smooth gradient with moving noise
+        noise = rng.integers(0, 60, (video_h, video_w, 1), dtype=np.int16)
+        gradient = np.linspace(0, 180, video_w).astype(np.int16)[None, :, None]
+        frame[40:40 + video_h, 40:40 + video_w] = (gradient + noise + (i * 3) % 60).clip(0, 255).astype(np.uint8)
+        frames.append(frame)
+    return frames
+
+
+def _process_cpu_seconds(pid: int) -> Optional[float]:
+    """User + system CPU time of a child process, None where it can't be read
+
+    psutil when installed, else /proc; without either (Windows/macOS without psutil)
+    the CPU use is unknown rather than zero.
+    """
+    if psutil is not None:
+        try:
+            times = psutil.Process(pid).cpu_times()
+            return times.user + times.system
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError, AttributeError):
+        return None
+
+
+def benchmark_profile(profile: EncoderProfile, frames: List[np.ndarray], fps: float = 30.0,
+                      seconds: float = 3.0, crf: int = 23) -> Dict[str, float]:
+    """Feed frames in real time through one profile into a null muxer
+
+    'cpu_pct' is None where the encoder's CPU time can't be read.
+    'latency_ms' is the encoder pipeline delay: frames written to FFmpeg but not yet out of
+    the encoder, sampled whenever FFmpeg reports progress, times the frame interval.
+    'realtime' is False when writes had to wait for the encoder often enough to miss frames.
+    """
+    from .ffmpeg_writer import FFmpegWriter, EncoderOutput
+    from .frame_pacer import DeadlineClock
+
+    height, width = frames[0].shape[:2]
+    writer = FFmpegWriter(EncoderOutput('-', 'null'), (width, height), fps, 'bgr', crf=crf, profile=profile)
+    writer.start()
+    pid = writer.process.pid
+    clock = DeadlineClock(fps)
+    lags = []
+    last_encoded = 0
+    total = int(seconds * fps)
+    try:
+        cpu_start = _process_cpu_seconds(pid)
+        wall_start = time.monotonic()
+        for i in range(total):
+            clock.wait()
+            writer.write(frames[i % len(frames)])
+            encoded = writer.telemetry()['encoded_frames']
+            if encoded != last_encoded:
+                lags.append(writer.frames_written - encoded)
+                last_encoded = encoded
+        wall = time.monotonic() - wall_start
+        cpu_end = _process_cpu_seconds(pid)
+        encoded = writer.telemetry()['encoded_frames']
+        kbps = writer.output_kbps
+    finally:
+        writer.close(timeout=10.0)
+
+    return {
+        'cpu_pct': (cpu_end - cpu_start) * 100 / wall if None not in (cpu_start, cpu_end) else None,
+        'latency_ms': (sum(lags) / len(lags)) * 1000 / fps if lags else float('nan'),
+        'encode_fps': encoded / wall,
+        'kbps': kbps,
+        'realtime': clock.missed <= total * 0.02,
+    }
+
+
+def benchmark_encoders(size=(1920, 1080), fps: float = 30.0, seconds: float = 3.0, presets=BENCHMARK_PRESETS,
+                       tunes=BENCHMARK_TUNES, threads=None, progress=None) -> List[Dict]:
+    """Benchmark x264 preset x tune x thread count on synthetic screen content
+
+    threads defaults to x264's own choice and half the cores. progress(done, total) is
+    called after each run. Returns one dict per configuration (see benchmark_profile) with
+    'preset', 'tune' and 'threads' added.
+    """
+    cores = os.cpu_count() or 1
+    if threads is None:
+        threads = sorted({0, max(1, cores // 2)})
+    frames = synthetic_screen_frames(size)
+    configs = [(p, t, n) for p in presets for t in tunes for n in threads]
+    results = []
+    for done, (preset, tune, count) in enumerate(configs, 1):
+        profile = EncoderProfile(PROFILE_CUSTOM, "Benchmark", preset, tune=tune, threads=count)
+        result = benchmark_profile(profile, frames, fps, seconds)
+        result.update(preset=preset, tune=tune, threads=count)
+        results.append(result)
+        if progress is not None:
+            progress(done, len(configs))
+    return results
+
+
+def profiles_from_benchmark(results: List[Dict], base: Dict[str, EncoderProfile] = None,
+                            cores: int = None) -> Dict[str, EncoderProfile]:
+    """Tune each profile to this machine from benchmark_encoders() results
+
+    Per profile: among real-time runs with the profile's tune and within its CPU budget,
+    the slowest (best compressing) preset wins; low latency then takes the thread count
+    with the lowest latency, the others the one with the lowest CPU use. A profile
+    without any qualifying run keeps its defaults, and so does every profile when the
+    CPU use couldn't be measured: the budget can't be checked.
+    """
+    from .ffmpeg_writer import X264_PRESETS
+
+    base = base or DEFAULT_PROFILES
+    cores = cores or os.cpu_count() or 1
+    profiles = {}
+    for name, profile in base.items():
+        limit = CPU_BUDGETS.get(name, 0.25) * cores * 100
+        candidates = [r for r in results
+                      if r['realtime'] and r['tune'] == profile.tune
+                      and r['cpu_pct'] is not None and r['cpu_pct'] <= limit]
+        if not candidates:
+            profiles[name] = profile
+            continue
+        slowest = max(X264_PRESETS.index(r['preset']) for r in candidates)
+        candidates = [r for r in candidates if X264_PRESETS.index(r['preset']) == slowest]
+        key = 'latency_ms' if name == PROFILE_LOW_LATENCY else 'cpu_pct'
+        best = min(candidates, key=lambda r: r[key])
+        profiles[name] = profile.replace(preset=best['preset'], threads=best['threads'])
+    return profiles
+
+
+def format_results(results: List[Dict]) -> str:
+    """Benchmark results as a printable table"""
+    lines = [f"{'preset':>10} | {'tune':>11} | {'threads':>7} | {'CPU %':>6} | {'latency':>8} | "
+             f"{'enc fps':>7} | {'kbit/s':>7} | real time"]
+    for r in results:
+        lines.append(f"{r['preset']:>10} | {r['tune'] or '-':>11} | {r['threads'] or 'auto':>7} | "
+                     f"{'?' if r['cpu_pct'] is None else format(r['cpu_pct'], '6.0f'):>6} | {r['latency_ms']:6.0f} ms | {r['encode_fps']:7.1f} | "
+                     f"{r['kbps']:7.0f} | {'yes' if r['realtime'] else 'NO'}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python -m core.encoder_profiles [WIDTHxHEIGHT]   (from src/, FFmpeg on PATH)
+    import sys
+    size = tuple(int(v) for v in sys.argv[1].split('x')) if len(sys.argv) > 1 else (1920, 1080)
+    hardware = probe_hardware_encoders()
+    results = benchmark_encoders(size, progress=lambda done, total: print(f"   {done}/{total}", end='\r'))
+    print(format_results(results))
+    if any(r['cpu_pct'] is None for r in results):
+        print("CPU use unknown (pip install psutil) - profiles keep their defaults")
+    for name, profile in profiles_from_benchmark(results).items():
+        print(f"{DEFAULT_PROFILES[name].label:>12}: {profile.describe()}")
+    if hardware:
+        print(f"Hardware: {', '.join(HARDWARE_ENCODERS[e] for e in hardware)}")
@@ -0,0 +1,153 @@
+"""
+Face Tracker - Lightweight per-face tracking between Haar detections
+Moves cached face boxes on every frame with sparse optical flow so the blur follows the face
+"""
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+
+class FaceTrack:
+    """A single tracked face: box in tracker space plus the feature points that carry it"""
+
+    def __init__(self, box: Tuple[float, float, float, float], points: np.ndarray):
+        self.box = box
+        self.points = points
+        self.seed_count = len(points)
+        self.confidence = 1.0 if self.seed_count else 0.0
+
+
+class FaceTracker:
+    """Centroid-plus-flow tracker for face boxes
+
+    All coordinates handled here live in the space of the (downscaled) grayscale frame
+    passed to update()/reset(). Boxes are scaled back to full resolution in get_boxes().
+    """
+
+    def __init__(self, detect_every: int = 2, min_confidence: float = 0.5, max_points: int = 40):
+        self.detect_every = detect_every
+        self.min_confidence = min_confidence  # Re-detect early when any track falls below this
+        self.max_points = max_points
+
+        self.tracks: List[FaceTrack] = []
+        self.prev_gray = None
+        self.frames_since_detect = detect_every  # Force a detection on the first frame
+
+        self.lk_params = dict(
+            winSize=(15, 15),
+            maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+
+    def clear(self):
+        """Drop all tracks and force a detection on the next frame"""
+        self.tracks = []
+        self.prev_gray = None
+        self.frames_since_detect = self.detect_every
+
+    def needs_detection(self) -> bool:
+        """True when the schedule is due or tracking confidence has dropped"""
+        if self.frames_since_detect >= self.detect_every:
+            return True
+        return any(t.confidence < self.min_confidence for t in self.tracks)
+
+    def _seed_points(self, gray: np.ndarray, box) -> np.ndarray:
+        """Pick good features inside the central part of a face box"""
+        x, y, w, h = [int(round(v)) for v in box]
+        frame_h, frame_w = gray.shape[:2]
+        # Shrink to the inner face so background points don't drag the box
+        x1 = max(0, x + w // 6)
+        y1 = max(0, y + h // 6)
+        x2 = min(frame_w, x + w - w // 6)
+        y2 = min(frame_h, y + h - h // 6)
+        if x2 - x1 < 4 or y2 - y1 < 4:
+            return np.empty((0, 1, 2), dtype=np.float32)
+
+        mask = np.zeros_like(gray)
+        mask[y1:y2, x1:x2] = 255
+        points = cv2.goodFeaturesToTrack(
+            gray, maxCorners=self.max_points, qualityLevel=0.01,
+            minDistance=3, mask=mask
+        )
+        if points is None:
+            return np.empty((0, 1, 2), dtype=np.float32)
+        return points.astype(np.float32)
+
+    def reset(self, gray: np.ndarray, detections) -> None:
+        """Replace tracks with fresh detections (tracker-space boxes) and re-seed points"""
+        self.tracks = []
+        for det in detections:
+            box = tuple(float(v) for v in det)
+            self.tracks.append(FaceTrack(box, self._seed_points(gray, box)))
+        self.prev_gray = gray
+        self.frames_since_detect = 0
+
+    def update(self, gray: np.ndarray) -> None:
+        """Advance every track to the new frame with pyramidal Lucas-Kanade flow"""
+        self.frames_since_detect += 1
+
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            self.prev_gray = gray
+            return
+
+        if not self.tracks:
+            self.prev_gray = gray
+            return
+
+        # Track all faces in one LK call
+        counts = [len(t.points) for t in self.tracks]
+        live = [t.points for t in self.tracks if len(t.points)]
+        if not live:
+            for t in self.tracks:
+                t.confidence = 0.0
+            self.prev_gray = gray
+            return
+
+        prev_pts = np.concatenate(live)
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, prev_pts, None, **self.lk_params)
+        # Forward-backward check rejects points that drifted onto the background
+        back_pts, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, next_pts, None, **self.lk_params)
+        fb_error = np.linalg.norm((prev_pts - back_pts).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < 1.0)
+
+        offset = 0
+        for track, count in zip(self.tracks, counts):
+            if count == 0:
+                track.confidence = 0.0
+                continue
+
+            sl = slice(offset, offset + count)
+            offset += count
+            track_good = good[sl]
+            old = prev_pts[sl][track_good].reshape(-1, 2)
+            new = next_pts[sl][track_good].reshape(-1, 2)
+
+            # Share of the originally seeded points still tracked
+            track.confidence = len(new) / max(track.seed_count, 1)
+            if len(new) < 3:
+                track.confidence = 0.0
+                track.points = new.reshape(-1, 1, 2)
+                continue
+
+            # Translation from median displacement, scale from spread about the centroid
+            dx, dy = np.median(new - old, axis=0)
+            old_spread = np.median(np.linalg.norm(old - old.mean(axis=0), axis=1))
+            new_spread = np.median(np.linalg.norm(new - new.mean(axis=0), axis=1))
+            s = new_spread / old_spread if old_spread > 1e-3 else 1.0
+            s = float(np.clip(s, 0.9, 1.1))
+
+            x, y, w, h = track.box
+            cx, cy = x + w / 2 + dx, y + h / 2 + dy
+            w, h = w * s, h * s
+            track.box = (cx - w / 2, cy - h / 2, w, h)
+            track.points = new.reshape(-1, 1, 2).astype(np.float32)
+
+        # Lost tracks keep their last box (still blurred) until the next detection replaces them
+        self.prev_gray = gray
+
+    def get_boxes(self, scale: float = 1.0) -> List[Tuple[int, int, int, int]]:
+        """Return current boxes scaled from tracker space back to frame space"""
+        return [
+            (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
+            for (x, y, w, h) in (t.box for t in self.tracks)
+        ]
@@ -0,0 +1,638 @@
+"""
+FFmpeg Writer - One H.264 encode on its own thread, muxed to a file, a live stream or both
+Frames go through a small bounded queue with a configurable overflow policy and encoder telemetry
+"""
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .encoder_profiles import EncoderProfile, PROFILE_CUSTOM
+from .frame_pipe import PIXEL_FORMATS, ffmpeg_pix_fmt, write_frame
+from .roi_encoding import ROI_QOFFSET, addroi_filter
+
+# libx264 presets, fastest first
+X264_PRESETS = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow']
+DEFAULT_PRESET = 'veryfast'
+DEFAULT_CRF = 23  # libx264 default; lower is better quality and bigger files
+
+# What write() does when the queue is full
+OVERFLOW_BLOCK = 'block'  # Wait for the encoder (recordings: never lose a frame)
+OVERFLOW_DROP = 'drop'  # Drop the oldest queued frame; its time is filled by the newest
+OVERFLOW_DECIMATE = 'decimate'  # Drop, and step down to encoding fewer distinct frames (frame rate, not quality)
+OVERFLOW_LABELS = {
+    OVERFLOW_DROP: "Drop frames",
+    OVERFLOW_DECIMATE: "Encode fewer frames",
+    OVERFLOW_BLOCK: "Wait for the encoder",
+}
+
+# Decimate mode: level n encodes every 2**n-th frame (repeated to keep the timeline)
+MAX_DECIMATION_LEVEL = 2
+DECIMATE_COOLDOWN = 1.0  # Seconds between steps down
+RECOVER_AFTER = 5.0  # Seconds without overflow before stepping back up
+
+# Live output modes: platforms over RTMP, or a direct low-latency transport
+LIVE_RTMP = 'rtmp'
+LIVE_SRT = 'srt'  # MPEG-TS over SRT (caller), for ingest servers that accept it
+LIVE_UDP = 'udp'  # MPEG-TS over UDP, for local preview rooms / LAN players
+LIVE_HLS = 'hls'  # Short fMP4 HLS segments in a local directory
+# Measured locally (python -m core.latency_probe, 720p30, encoder queue to decoded frame):
+# RTMP p50 20 ms / p95 25 ms; HLS p50 1.1 s / p95 1.7 s, bound by whole segments (no
+# partial segments, so not LL-HLS). SRT and UDP are still unmeasured.
+LIVE_OUTPUT_LABELS = {
+    LIVE_RTMP: "RTMP (platforms)",
+    LIVE_SRT: "SRT",
+    LIVE_UDP: "MPEG-TS over UDP",
+    LIVE_HLS: "HLS, 1 s segments (local folder)",
+}
+TS_PACKET_SIZE = 1316  # 7 TS packets: fits one Ethernet frame, the usual UDP/SRT payload
+SRT_LATENCY_MS = 120  # SRT's receive buffer / retransmission window
+HLS_SEGMENT_SECONDS = 1.0
+HLS_PLAYLIST = 'live.m3u8'
+# Mux each packet as soon as it is encoded: no interleaving delay, no buffered writes
+_LOW_DELAY_TS = {'max_delay': '0', 'flush_packets': '1'}
+
+_PROGRESS_KEYS = ('frame', 'fps', 'bitrate', 'total_size', 'out_time', 'speed', 'progress')
+_PROGRESS_LINE = re.compile(r'^(\w+)=\s*(\S*)$')
+_TEE_SLAVE_FAILED = re.compile(r'Slave muxer #(\d+) failed')
+
+
+class EncoderOutput:
+    """One destination of the encoded stream (muxer format + file path or URL)
+
+    An output that is not required is dropped by the tee muxer when it fails, so e.g. a
+    network error on the live stream does not end the local recording.
+    """
+
+    def __init__(self, target: str, format: str, required: bool = True, options: Dict[str, str] = None):
+        self.target = str(target)
+        self.format = format
+        self.required = required
+        self.options = dict(options or {})  # Muxer options (-key value / tee key=value)
+
+    @classmethod
+    def file(cls, path) -> 'EncoderOutput':
+        return cls(path, 'mp4')
+
+    @classmethod
+    def rtmp(cls, url: str, required: bool = True) -> 'EncoderOutput':
+        return cls(url, 'flv', required)
+
+    @classmethod
+    def srt(cls, url: str, latency_ms: int = SRT_LATENCY_MS, required: bool = True) -> 'EncoderOutput':
+        """MPEG-TS to an SRT listener (srt://host:port); latency is SRT's retransmission window"""
+        if '?' not in url:
+            url += f"?mode=caller&transtype=live&latency={latency_ms * 1000}&pkt_size={TS_PACKET_SIZE}"
+        return cls(url, 'mpegts', required, _LOW_DELAY_TS)
+
+    @classmethod
+    def udp(cls, url: str, required: bool = True) -> 'EncoderOutput':
+        """MPEG-TS datagrams to udp://host:port (unicast or multicast); no retransmission"""
+        if '?' not in url:
+            url += f"?pkt_size={TS_PACKET_SIZE}"
+        return cls(url, 'mpegts', required, _LOW_DELAY_TS)
+
+    @classmethod
+    def hls(cls, directory, segment_seconds: float = HLS_SEGMENT_SECONDS, list_size: int = 6,
+            required: bool = True) -> 'EncoderOutput':
+        """Rolling fMP4 HLS playlist in directory, for a local web server or player
+
+        Segments are cut at keyframes, so the encoder's GOP should match segment_seconds.
+        The directory is emptied of an earlier stream's playlist and segments; restarts of
+        this encode append to the playlist with a discontinuity instead of overwriting it.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in [directory / HLS_PLAYLIST, directory / 'init.mp4', *directory.glob('segment_*.m4s')]:
+            stale.unlink(missing_ok=True)
+        return cls(directory / HLS_PLAYLIST, 'hls', required, {
+            'hls_time': f"{segment_seconds:g}",
+            'hls_list_size': str(list_size),
+            'hls_segment_type': 'fmp4',
+            'hls_fmp4_init_filename': 'init.mp4',
+            'hls_segment_filename': str(directory / 'segment_%05d.m4s'),
+            'hls_flags': 'independent_segments+delete_segments+append_list+discont_start+program_date_time',
+        })
+
+    @classmethod
+    def live(cls, mode: str, target, required: bool = True) -> 'EncoderOutput':
+        """Output for one of the LIVE_* modes (URL, or directory for HLS)"""
+        if mode == LIVE_SRT:
+            return cls.srt(str(target), required=required)
+        if mode == LIVE_UDP:
+            return cls.udp(str(target), required=required)
+        if mode == LIVE_HLS:
+            return cls.hls(target, required=required)
+        return cls.rtmp(str(target), required)
+
+    @classmethod
+    def relay(cls) -> 'EncoderOutput':
+        """MPEG-TS on FFmpeg's stdout, for a SimulcastRelay to fan out"""
+        return cls('pipe:1', 'mpegts')
+
+    @property
+    def is_pipe(self) -> bool:
+        return self.target == 'pipe:1'
+
+    @property
+    def is_file(self) -> bool:
+        return self.format == 'mp4'
+
+    def muxer_args(self) -> List[str]:
+        """Arguments for a single (non-tee) output"""
+        args = ['-f', self.format]
+        if self.is_file:
+            args += ['-movflags', '+faststart']
+        for key, value in self.options.items():
+            args += [f"-{key}", value]
+        return args + [self.target]
+
+    def tee_entry(self) -> str:
+        """This output as one slave of the tee muxer"""
+        options = [f"f={self.format}"]
+        if self.is_file:
+            options.append("movflags=+faststart")
+        options += [f"{key}={_tee_escape(value)}" for key, value in self.options.items()]
+        if not self.required:
+            options.append("onfail=ignore")
+        target = self.target.replace('\\', '\\\\').replace('|', '\\|')
+        return f"[{':'.join(options)}]{target}"
+
+
+def _tee_escape(value: str) -> str:
+    """Escape a tee slave option value (':' separates options)"""
+    return value.replace('\\', '\\\\').replace(':', '\\:')
+
+
+class EncoderError(Exception):
+    """The FFmpeg process or the pipe to it failed"""
+
+
+def _kbps(bitrate) -> int:
+    """'4500k' / '6M' / 4500 -> kbit/s"""
+    if isinstance(bitrate, str):
+        text = bitrate.strip().lower()
+        if text.endswith('m'):
+            return int(float(text[:-1]) * 1000)
+        return int(float(text.rstrip('k')))
+    return int(bitrate)
+
+
+class FFmpegWriter:
+    """Encodes frames once with H.264 and muxes them to one or more outputs
+
+    Pure CRF for recordings; with a bitrate the encode is capped (CRF + VBV) or, without a
+    CRF, bitrate-driven as live platforms expect. Two or more outputs go through FFmpeg's tee
+    muxer, so recording while streaming costs one encode.
+
+    write() queues the frame and returns: frames the caller hands over (owned=True) are
+    queued as they are, others are copied into a free pool buffer first. frame_buffer()
+    lends a pool buffer to render into (e.g. a resize), which avoids both the copy and a
+    fresh allocation; written frames of the output size go back to the pool. When the encoder
+    falls behind, the queue fills and write() blocks until a frame has been written; the time
+    spent blocked is the backpressure metric.
+
+    The encoder itself comes from an EncoderProfile (x264 settings or a GPU encoder);
+    without one, libx264 runs with the given preset. roi boxes are coded with a quantizer
+    offset (addroi) for the life of the encode; only libx264 honours them.
+    """
+
+    def __init__(self, outputs: Union[str, Path, EncoderOutput, List[EncoderOutput]], size: Tuple[int, int],
+                 fps: float, pixel_format: str = 'bgr', crf: Optional[int] = DEFAULT_CRF,
+                 preset: str = DEFAULT_PRESET, bitrate=None, gop: int = None, audio: bool = False,
+                 queue_size: int = 4, ffmpeg: str = 'ffmpeg', overflow_policy: str = OVERFLOW_BLOCK,
+                 profile: EncoderProfile = None, roi=None, roi_qoffset: float = ROI_QOFFSET):
+        if isinstance(outputs, (str, Path)):
+            outputs = EncoderOutput.file(outputs)
+        if isinstance(outputs, EncoderOutput):
+            outputs = [outputs]
+        self.outputs = list(outputs)
+        self.size = (int(size[0]), int(size[1]))
+        self.fps = fps
+        self.pixel_format = pixel_format
+        self.crf = crf
+        self.profile = profile or EncoderProfile(PROFILE_CUSTOM, "Custom", preset)
+        self.preset = self.profile.preset
+        self.roi = list(roi or []) if not self.profile.hardware else []
+        self.roi_qoffset = roi_qoffset
+        self.bitrate = _kbps(bitrate) if bitrate else None
+        self.gop = gop
+        self.audio = audio  # Silent AAC track (live platforms reject video-only streams)
+        self.queue_size = queue_size
+        self.ffmpeg = ffmpeg
+
+        self.overflow_policy = overflow_policy
+
+        channels = PIXEL_FORMATS[pixel_format][1]
+        self.frame_shape = (self.size[1], self.size[0], channels)
+        self.cond = threading.Condition()
+        self.pending = deque()  # (frame, copies, pooled, enqueue_time), oldest first
+        self.in_flight = 0  # Frames taken by the writer thread and not yet written
+        self.closing = False
+        self.free = deque()  # Pool buffers for frames the caller keeps
+        self.process = None
+        self.thread = None
+        self.stderr_thread = None
+        self.stderr_tail = deque(maxlen=20)
+        self.error = None  # Exception that stopped the writer thread
+
+        # Overflow handling (decimate mode)
+        self.decimation_level = 0
+        self.last_overflow = 0.0
+        self.last_decimate = 0.0
+        self.carried_copies = 0  # Copies of frames skipped at the current decimation level
+
+        # Telemetry
+        self.frames_queued = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0
+        self.bytes_copied = 0  # Pixels copied into pool buffers for frames the caller keeps
+        self.overflows = 0
+        self.blocked_time = 0.0
+        self.max_depth = 0
+        self.latency_ms = 0.0  # Enqueue -> written to the pipe, smoothed
+        self.max_latency_ms = 0.0
+        self.write_ms = 0.0  # Time one pipe write takes, smoothed
+        self.progress = {}  # Latest FFmpeg -progress values (speed, bitrate, fps, ...)
+        self.on_frame_written = None  # Optional callback(frame) once a frame's first copy is in the pipe
+
+    def command(self) -> List[str]:
+        width, height = self.size
+        cmd = [
+            self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+            # Machine-readable speed/bitrate on stderr, parsed into telemetry
+            '-nostats', '-progress', 'pipe:2',
+            # Raw frames wait in our queue, where the overflow policy and ABR can see them,
+            # not in a demuxer thread queue behind it
+            '-thread_queue_size', str(self.queue_size),
+            '-f', 'rawvideo',
+            '-pix_fmt', ffmpeg_pix_fmt(self.pixel_format),
+            '-s', f"{width}x{height}",
+            '-r', str(self.fps),
+            '-i', 'pipe:0',
+        ]
+        if self.audio:
+            cmd += ['-thread_queue_size', '512',
+                    '-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=44100']
+
+        if self.roi:
+            cmd += ['-vf', addroi_filter(self.roi, self.roi_qoffset)]
+        cmd += self.profile.video_args(self.crf, self.bitrate)
+        if self.gop:
+            cmd += ['-g', str(self.gop), '-keyint_min', str(max(1, self.gop // 2))]
+        if self.audio:
+            # The silent track is endless: end with the video when stdin closes
+            cmd += ['-c:a', 'aac', '-ar', '44100', '-b:a', '128k', '-shortest']
+
+        if len(self.outputs) == 1:
+            return cmd + self.outputs[0].muxer_args()
+
+        # tee: one encode, several muxers; streams must be mapped explicitly
+        cmd += ['-map', '0:v']
+        if self.audio:
+            cmd += ['-map', '1:a']
+        cmd += ['-flags', '+global_header', '-f', 'tee',
+                '|'.join(output.tee_entry() for output in self.outputs)]
+        return cmd
+
+    def describe(self) -> str:
+        """Encoder and output summary for logs"""
+        rate = f"CRF {self.crf}" if self.crf is not None else ""
+        if self.bitrate:
+            rate = f"{rate} capped at {self.bitrate}k" if rate else f"{self.bitrate}k"
+        if self.roi:
+            rate += f" | {len(self.roi)} ROI at qoffset {self.roi_qoffset:g}"
+        targets = " + ".join('file' if o.is_file else o.format for o in self.outputs)
+        return f"{self.profile.describe()} {rate} | {self.size[0]}x{self.size[1]} @ {self.fps} fps -> {targets}"
+
+    def start(self):
+        """Start FFmpeg and the writer thread"""
+        try:
+            piped = any(output.is_pipe for output in self.outputs)
+            self.process = subprocess.Popen(self.command(), stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE if piped else subprocess.DEVNULL,
+                                            stderr=subprocess.PIPE, bufsize=0)
+        except FileNotFoundError:
+            raise EncoderError("FFmpeg not found - install FFmpeg and make sure it is on PATH")
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self.stderr_thread.start()
+        print(f"✅ [FFmpeg Writer] {self.describe()}")
+
+    def skip(self, copies: int = 1) -> bool:
+        """True if the next frame isn't needed at the current decimation level
+
+        Its copies are carried over to the next frame that is written, so the caller can skip
+        processing it entirely without shortening the timeline.
+        """
+        if self.decimation_level == 0:
+            return False
+        self.frames_skipped += 1
+        if self.frames_skipped % (1 << self.decimation_level) == 0:
+            return False
+        self.carried_copies += copies
+        return True
+
+    def write(self, frame: np.ndarray, copies: int = 1, owned: bool = False) -> None:
+        """Queue a frame to be encoded copies times
+
+        owned=True hands the array over: the caller must not touch it afterwards, and no
+        copy is made. Otherwise the frame is copied and the caller may reuse it at once.
+        When the queue is full the overflow policy decides between waiting and dropping.
+        """
+        if self.error is not None:
+            raise EncoderError(f"FFmpeg writer failed: {self.error}")
+
+        copies += self.carried_copies
+        self.carried_copies = 0
+        with self.cond:
+            if self._full():
+                self._overflow()
+                if self.overflow_policy == OVERFLOW_BLOCK:
+                    start = time.monotonic()
+                    while self._full():
+                        self.cond.wait(0.5)
+                        if self.error is not None:
+                            raise EncoderError(f"FFmpeg writer failed: {self.error}")
+                    self.blocked_time += time.monotonic() - start
+                else:
+                    # Newest frame wins; it covers the dropped frame's time
+                    old, old_copies, pooled, _ = self.pending.popleft()
+                    self._recycle(old, pooled)
+                    copies += old_copies
+                    self.frames_queued -= old_copies  # Counted again with the new frame
+                    self.frames_dropped += 1
+            elif self.decimation_level and time.monotonic() - self.last_overflow > RECOVER_AFTER:
+                self.decimation_level -= 1
+                self.last_overflow = time.monotonic()
+                print(f"📈 [FFmpeg Writer] Encoder caught up - decimation level {self.decimation_level}")
+
+        if owned:
+            # Handed over, so it can be reused once written (sized frames only)
+            item, pooled = frame, frame.shape == self.frame_shape and frame.flags.c_contiguous
+        else:
+            item = self.free.popleft() if self.free else np.empty(self.frame_shape, dtype=np.uint8)
+            np.copyto(item, frame)
+            self.bytes_copied += item.nbytes
+            pooled = True
+
+        with self.cond:
+            self.pending.append((item, copies, pooled, time.monotonic()))
+            self.frames_queued += copies
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.cond.notify_all()
+
+    def frame_buffer(self) -> np.ndarray:
+        """A pool buffer of the output frame shape; fill it and write() it with owned=True"""
+        with self.cond:
+            if self.free:
+                return self.free.popleft()
+        return np.empty(self.frame_shape, dtype=np.uint8)
+
+    def _recycle(self, frame: np.ndarray, pooled: bool):
+        """Return a written or dropped frame to the pool (under cond); the pool stays queue-sized"""
+        if pooled and len(self.free) < self.queue_size:
+            self.free.append(frame)
+
+    def _full(self) -> bool:
+        return len(self.pending) + self.in_flight >= self.queue_size
+
+    def _overflow(self):
+        """Count an overflow; in decimate mode step down at most once per cooldown"""
+        now = time.monotonic()
+        self.overflows += 1
+        self.last_overflow = now
+        if (self.overflow_policy == OVERFLOW_DECIMATE and self.decimation_level < MAX_DECIMATION_LEVEL
+                and now - self.last_decimate >= DECIMATE_COOLDOWN):
+            self.decimation_level += 1
+            self.last_decimate = now
+            print(f"📉 [FFmpeg Writer] Encoder behind - decimation level {self.decimation_level} "
+                  f"(1 in {1 << self.decimation_level} frames)")
+
+    def _run(self):
+        try:
+            while True:
+                with self.cond:
+                    while not self.pending and not self.closing:
+                        self.cond.wait()
+                    if not self.pending:
+                        break
+                    frame, copies, pooled, enqueued = self.pending.popleft()
+                    self.in_flight = 1
+                try:
+                    for n in range(copies):
+                        start = time.monotonic()
+                        write_frame(self.process.stdin, frame)
+                        self.write_ms += ((time.monotonic() - start) * 1000 - self.write_ms) * 0.1
+                        self.frames_written += 1
+                        if n == 0 and self.on_frame_written is not None:
+                            self.on_frame_written(frame)
+                    latency = (time.monotonic() - enqueued) * 1000
+                    self.latency_ms += (latency - self.latency_ms) * 0.1
+                    self.max_latency_ms = max(self.max_latency_ms, latency)
+                finally:
+                    with self.cond:
+                        self._recycle(frame, pooled)
+                        self.in_flight = 0
+                        self.cond.notify_all()
+        except Exception as e:
+            tail = " | ".join(self.stderr_tail)
+            self.error = Exception(f"{e} {tail}".strip())
+            print(f"❌ [FFmpeg Writer Error] {self.error}")
+            with self.cond:
+                self.cond.notify_all()
+
+    def _read_stderr(self):
+        for line in iter(self.process.stderr.readline, b''):
+            message = line.decode('utf-8', errors='ignore').strip()
+            if not message:
+                continue
+            # Every key=value line is -progress output (stream_0_0_q, out_time_us, dup_frames,
+            # ...): keep the keys telemetry uses, never let the rest reach the error tail
+            match = _PROGRESS_LINE.match(message)
+            if match:
+                if match.group(1) in _PROGRESS_KEYS:
+                    self.progress[match.group(1)] = match.group(2)
+                continue
+            self.stderr_tail.append(message)
+            # An optional tee slave that fails is dropped and FFmpeg carries on; a live
+            # output dropping this way must still fail the writer so the stage restarts
+            slave = _TEE_SLAVE_FAILED.search(message)
+            if slave and len(self.outputs) > 1:
+                index = int(slave.group(1))
+                if index < len(self.outputs) and not self.outputs[index].is_file and self.error is None:
+                    self.error = Exception(message)
+                    with self.cond:
+                        self.cond.notify_all()
+            print(f"[FFmpeg] {message}")
+
+    def close(self, timeout: float = 30.0) -> Optional[int]:
+        """Flush queued frames, finish the file and return FFmpeg's exit code"""
+        if self.process is None:
+            return None
+        with self.cond:
+            self.closing = True
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            code = self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            code = self.process.wait()
+        if self.stderr_thread:
+            self.stderr_thread.join(timeout=1.0)
+        self.process = None
+        print(f"🛑 [FFmpeg Writer] {self.stats()}")
+        return code
+
+    @property
+    def depth(self) -> int:
+        """Frames queued but not yet handed to FFmpeg"""
+        return len(self.pending)
+
+    @property
+    def speed(self) -> float:
+        """FFmpeg's encode speed relative to real time (1.0 = keeping up), 0 if unknown"""
+        try:
+            return float(self.progress.get('speed', '0').rstrip('x'))
+        except ValueError:
+            return 0.0
+
+    @property
+    def output_kbps(self) -> float:
+        """Output bitrate FFmpeg reports, 0 if unknown"""
+        try:
+            return float(self.progress.get('bitrate', '0').replace('kbits/s', ''))
+        except ValueError:
+            return 0.0
+
+    def telemetry(self) -> dict:
+        """Snapshot of queue, latency, drop and encoder counters"""
+        return {
+            'queue_depth': self.depth,
+            'max_queue_depth': self.max_depth,
+            'latency_ms': self.latency_ms,
+            'max_latency_ms': self.max_latency_ms,
+            'write_ms': self.write_ms,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'overflows': self.overflows,
+            'blocked_s': self.blocked_time,
+            'decimation_level': self.decimation_level,
+            'speed': self.speed,
+            'bitrate_kbps': self.output_kbps,
+            'encoded_frames': int(self.progress.get('frame', '0') or 0),
+        }
+
+    @property
+    def output_size(self) -> int:
+        """Bytes FFmpeg has written to the file outputs so far"""
+        total = 0
+        for output in self.outputs:
+            if output.is_file:
+                try:
+                    total += os.path.getsize(output.target)
+                except OSError:
+                    pass
+        return total
+
+    def stats(self) -> str:
+        """Short counter summary for logs"""
+        text = (f"written {self.frames_written}/{self.frames_queued} | queue {self.depth}/{self.queue_size} "
+                f"(max {self.max_depth}) | latency {self.latency_ms:.0f} ms (max {self.max_latency_ms:.0f}) | "
+                f"dropped {self.frames_dropped}")
+        if self.overflow_policy == OVERFLOW_BLOCK:
+            text += f" | blocked {self.blocked_time:.2f} s"
+        if self.decimation_level:
+            text += f" | encoding 1 in {1 << self.decimation_level} frames"
+        if self.progress:
+            text += f" | speed {self.speed:.2f}x | {self.output_kbps:.0f} kbit/s"
+        if any(output.is_file for output in self.outputs):
+            text += f" | {self.output_size / (1024 * 1024):.1f} MB"
+        return text
+
+
+class OpenCVFileWriter:
+    """cv2.VideoWriter (mp4v) fallback for file outputs on machines without FFmpeg
+
+    Covers the part of FFmpegWriter the record and offline-processing loops use. Frames are
+    encoded on the caller's thread, so there is no queue or overflow policy, and CRF and
+    encoder profiles don't apply: files are larger and MPEG-4 Part 2 rather than H.264.
+    """
+
+    def __init__(self, path: Union[str, Path], size: Tuple[int, int], fps: float):
+        self.path = Path(path)
+        self.size = (int(size[0]), int(size[1]))
+        self.fps = fps
+        self.writer = None
+        self.buffer = None  # write() is synchronous, so one frame_buffer() is enough
+        self.frames_written = 0
+
+    def start(self):
+        self.writer = cv2.VideoWriter(str(self.path), cv2.VideoWriter_fourcc(*'mp4v'), self.fps, self.size)
+        if not self.writer.isOpened():
+            raise EncoderError(f"OpenCV could not open {self.path} for writing")
+        print(f"⚠️ [Video Writer] FFmpeg not found - writing mp4v with OpenCV "
+              f"({self.size[0]}x{self.size[1]} @ {self.fps} fps, no CRF or encoder profile)")
+
+    def frame_buffer(self) -> np.ndarray:
+        if self.buffer is None:
+            self.buffer = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+        return self.buffer
+
+    def write(self, frame: np.ndarray, copies: int = 1, owned: bool = False) -> None:
+        """Encode a frame copies times before returning"""
+        for _ in range(copies):
+            self.writer.write(frame)
+        self.frames_written += copies
+
+    def close(self, timeout: float = None) -> Optional[int]:
+        """Finish the file; 0 once closed, None if it was never started"""
+        if self.writer is None:
+            return None
+        self.writer.release()
+        self.writer = None
+        print(f"🛑 [Video Writer] {self.stats()}")
+        return 0
+
+    @property
+    def output_size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def stats(self) -> str:
+        return f"written {self.frames_written} (OpenCV mp4v) | {self.output_size / (1024 * 1024):.1f} MB"
+
+
+def ffmpeg_available(ffmpeg: str = 'ffmpeg') -> bool:
+    """True if the FFmpeg executable is on PATH (or is an existing path)"""
+    return shutil.which(ffmpeg) is not None
+
+
+def open_file_writer(path: Union[str, Path], size: Tuple[int, int], fps: float, crf: Optional[int] = DEFAULT_CRF,
+                     profile: EncoderProfile = None) -> Union[FFmpegWriter, OpenCVFileWriter]:
+    """Writer for a BGR video file: FFmpegWriter, or OpenCVFileWriter when FFmpeg is missing
+
+    Only file outputs have a fallback; live outputs need FFmpeg.
+    """
+    if ffmpeg_available():
+        return FFmpegWriter(path, size, fps, crf=crf, profile=profile)
+    return OpenCVFileWriter(path, size, fps)
@@ -0,0 +1,88 @@
+"""
+Frame Pacer - Monotonic-clock timing for capture and output
+Keeps recordings on the capture timeline by duplicating or dropping frames explicitly
+"""
+import time
+
+
+class DeadlineClock:
+    """Fixed-rate ticks on the monotonic clock
+
+    wait() sleeps until the next deadline. When the caller falls more than one period behind,
+    the missed deadlines are skipped instead of being run back to back.
+    """
+
+    def __init__(self, fps: float):
+        self.period = 1.0 / fps
+        self.next_deadline = time.monotonic()
+        self.missed = 0
+
+    def wait(self) -> float:
+        """Sleep until the next tick; returns the monotonic time the tick fired"""
+        now = time.monotonic()
+        if now < self.next_deadline:
+            time.sleep(self.next_deadline - now)
+            now = time.monotonic()
+        self.next_deadline += self.period
+        if now - self.next_deadline > self.period:
+            self.missed += int((now - self.next_deadline) / self.period)
+            self.next_deadline = now + self.period
+        return now
+
+
+class FramePacer:
+    """Places captured frames on the output's fixed frame grid by capture timestamp
+
+    A frame captured at t belongs to output frame round((t - t0) * fps). place() returns how
+    many times to write it: 0 drops it (its grid slot is already filled), 1 is on time, more
+    than 1 fills the slots a slow loop skipped. The output then lasts as long as the capture
+    did, however fast the machine is. pts() gives the same timestamps for writers that mux them.
+    """
+
+    def __init__(self, fps: float):
+        self.fps = fps
+        self.start_time = None
+        self.last_time = None
+
+        self.frames_in = 0
+        self.frames_out = 0
+        self.duplicated = 0
+        self.dropped = 0
+
+    def place(self, timestamp: float) -> int:
+        """Number of output frames the frame captured at timestamp should fill"""
+        if self.start_time is None:
+            self.start_time = timestamp
+        self.last_time = timestamp
+        self.frames_in += 1
+
+        target = int(round((timestamp - self.start_time) * self.fps)) + 1
+        copies = target - self.frames_out
+        if copies <= 0:
+            self.dropped += 1
+            return 0
+        self.duplicated += copies - 1
+        self.frames_out = target
+        return copies
+
+    @property
+    def capture_duration(self) -> float:
+        """Seconds of capture timeline covered so far (including the last frame's duration)"""
+        if self.start_time is None:
+            return 0.0
+        return self.last_time - self.start_time + 1.0 / self.fps
+
+    @property
+    def drift(self) -> float:
+        """Output duration minus capture duration in seconds (stays within half a frame)"""
+        return self.frames_out / self.fps - self.capture_duration
+
+    @property
+    def uncorrected_drift(self) -> float:
+        """Drift a writer would show without duplication/dropping (negative = plays back fast)"""
+        return self.frames_in / self.fps - self.capture_duration
+
+    def summary(self) -> str:
+        """Short counter summary for logs"""
+        return (f"in {self.frames_in} | out {self.frames_out} | dup {self.duplicated} | drop {self.dropped} | "
+                f"drift {self.drift * 1000:+.0f} ms (uncorrected {self.uncorrected_drift:+.2f} s)")
@@ -0,0 +1,185 @@
+"""
+Frame Pipe - Zero-copy BGRA hand-off from mss to FFmpeg
+Wraps capture buffers as NumPy views and writes frames to a pipe through memoryviews
+"""
+import os
+import time
+from typing import Dict
+
+import cv2
+import numpy as np
+
+# Pixel format name -> (FFmpeg -pix_fmt, channels)
+PIXEL_FORMATS = {
+    'bgr': ('bgr24', 3),
+    'bgra': ('bgra', 4),
+}
+
+
+def ffmpeg_pix_fmt(pixel_format: str) -> str:
+    """FFmpeg rawvideo -pix_fmt for a pipeline pixel format"""
+    return PIXEL_FORMATS[pixel_format][0]
+
+
+def wrap_screenshot(screenshot) -> np.ndarray:
+    """Writable (h, w, 4) BGRA view of an mss ScreenShot's own buffer - no copy"""
+    return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+
+
+def to_bgr(frame: np.ndarray) -> np.ndarray:
+    """BGR version of a BGR or BGRA frame (new array for BGRA, the frame itself for BGR)"""
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame
+
+
+def write_frame(pipe, frame: np.ndarray) -> int:
+    """Write a frame's pixels to pipe without building a bytes object
+
+    For an unbuffered pipe (bufsize=0) the data goes straight from the array to the kernel.
+    Partial writes are retried. Returns the number of bytes written.
+    """
+    view = memoryview(np.ascontiguousarray(frame)).cast('B')
+    total = len(view)
+    while view:
+        written = pipe.write(view)
+        if written is None:  # Non-blocking pipe not ready
+            time.sleep(0.001)
+            continue
+        view = view[written:]
+    return total
+
+
+# Stands in for FFmpeg in the benchmark: reads the pipe and discards it, so only our side is timed
+_DRAIN = "import sys\nwhile sys.stdin.buffer.read(1 << 20):\n    pass\n"
+
+
+def _copied(out, *sources) -> int:
+    """Bytes a stage wrote to new memory: 0 if out is a view of one of its sources"""
+    if any(np.may_share_memory(out, source) for source in sources):
+        return 0
+    return out.nbytes if isinstance(out, np.ndarray) else len(out)
+
+
+def benchmark_paths(frame_size=(1920, 1080), output_size=None, repeats: int = 30) -> Dict[str, Dict[str, float]]:
+    """Compare pixel bytes copied, bytes allocated and time per frame through the streaming path
+
+    legacy: np.array(screenshot) -> cvtColor(BGRA2BGR) -> resize -> frame.tobytes() -> pipe
+    bgra:   wrap_screenshot() -> FrameRing slot -> ResolutionSpace.resize() into a
+            writer.frame_buffer() -> FFmpegWriter.write(owned) -> writer thread -> pipe
+
+    The bgra path runs the real ring, resize and writer thread; only the screen (a bytearray
+    standing in for the mss buffer) and FFmpeg (a process that drains the pipe) are
+    replaced. bytes_copied adds up what each stage wrote to new memory (resize output
+    included) plus the writer's own pool copies; bytes_allocated is the tracemalloc peak
+    per frame. Returns {path: {'bytes_copied': n, 'bytes_allocated': n, 'ms': t}}.
+    """
+    import subprocess
+    import sys
+    import tracemalloc
+
+    from .capture import FrameRing
+    from .ffmpeg_writer import FFmpegWriter
+    from .resolution_space import CAPTURE, OUTPUT, ResolutionSpace
+
+    width, height = frame_size
+    output_size = tuple(output_size or frame_size)
+    space = ResolutionSpace(capture=frame_size, output=output_size)
+    raw = bytearray(os.urandom(width * height * 4))
+
+    class _Shot:
+        def __init__(self, data):
+            self.raw, self.width, self.height = data, width, height
+
+        def __array__(self, dtype=None, copy=None):
+            # Mirrors mss ScreenShot.__array_interface__ + np.array(): a full copy
+            return np.frombuffer(self.raw, dtype=np.uint8).reshape(height, width, 4).copy()
+
+    class _DrainWriter(FFmpegWriter):
+        def command(self):
+            return [sys.executable, '-c', _DRAIN]
+
+    shot = _Shot(raw)
+    screen = np.frombuffer(raw, dtype=np.uint8)
+
+    def legacy(sink) -> int:
+        frame = np.array(shot)
+        copied = _copied(frame, screen)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        copied += frame.nbytes
+        if space.needs_resize(CAPTURE, OUTPUT):
+            frame = space.resize(frame, OUTPUT)
+            copied += frame.nbytes
+        data = frame.tobytes()
+        copied += len(data)
+        write_frame(sink, np.frombuffer(data, dtype=np.uint8))
+        return copied
+
+    def bgra(ring, writer) -> int:
+        grabbed = wrap_screenshot(shot)
+        copied = _copied(grabbed, screen)
+        index = ring.acquire_write()
+        ring.commit(index, time.monotonic(), grabbed)
+        slot = ring.get()
+        try:
+            buffer = writer.frame_buffer() if space.needs_resize(CAPTURE, OUTPUT) else None
+            frame = space.resize(slot.frame, OUTPUT, out=buffer)
+            copied += _copied(frame, slot.frame)
+            before = writer.bytes_copied
+            writer.write(frame, owned=buffer is not None)
+            return copied + writer.bytes_copied - before
+        finally:
+            ring.release(slot)
+
+    def measure(run, finish) -> Dict[str, float]:
+        copied = 0
+        start = time.perf_counter()
+        for _ in range(repeats):
+            copied += run()
+        finish()
+        ms = (time.perf_counter() - start) * 1000 / repeats
+
+        # Separate pass so tracing doesn't skew the timing
+        allocated = 0
+        tracemalloc.start()
+        for _ in range(min(repeats, 5)):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            run()
+            allocated += tracemalloc.get_traced_memory()[1] - baseline
+        finish()
+        tracemalloc.stop()
+        return {'bytes_copied': copied / repeats, 'bytes_allocated': allocated / min(repeats, 5), 'ms': ms}
+
+    results = {}
+    drain = subprocess.Popen([sys.executable, '-c', _DRAIN], stdin=subprocess.PIPE, bufsize=0)
+    try:
+        results['legacy_bgr'] = measure(lambda: legacy(drain.stdin), lambda: None)
+    finally:
+        drain.stdin.close()
+        drain.wait()
+
+    ring = FrameRing()
+    writer = _DrainWriter(os.devnull, output_size, 30, pixel_format='bgra')
+    writer.start()
+
+    def flushed():
+        # Time until the writer thread has put every queued frame into the pipe
+        while writer.frames_written < writer.frames_queued and writer.error is None:
+            time.sleep(0.0005)
+
+    try:
+        results['zero_copy_bgra'] = measure(lambda: bgra(ring, writer), flushed)
+    finally:
+        writer.close()
+    return results
+
+
+if __name__ == "__main__":
+    for capture, output in (((1280, 720), None), ((1920, 1080), None),
+                            ((2560, 1440), None), ((2560, 1440), (1920, 1080))):
+        label = f"{capture[0]}x{capture[1]}" + (f"->{output[0]}x{output[1]}" if output else "")
+        for path, r in benchmark_paths(capture, output).items():
+            print(f"{label:>20} {path:>15}: {r['bytes_copied'] / 1e6:6.1f} MB copied/frame "
+                  f"({r['bytes_copied'] * 30 / 1e6:6.0f} MB/s at 30 fps) | "
+                  f"{r['bytes_allocated'] / 1e6:6.1f} MB allocated/frame | {r['ms']:6.2f} ms/frame")
@@ -0,0 +1,336 @@
+"""
+Latency Probe - Glass-to-glass timing with on-screen timestamp barcodes
+Barcodes carry the paint time through capture, processing, encoding and RTMP; each stage stamps the frames it sees
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .encoder_profiles import DEFAULT_PROFILES, PROFILE_LOW_LATENCY
+from .ffmpeg_writer import EncoderError, EncoderOutput, FFmpegWriter, LIVE_OUTPUT_LABELS, LIVE_RTMP, OVERFLOW_DROP
+from .frame_pacer import DeadlineClock
+from .local_rtmp import local_receiver
+
+# Barcode band across the top of the screen: BARCODE_CELLS square cells, scaled with the frame
+# width so it survives the stream's resize. Cell 0 is white and cell 1 black (threshold
+# references), then 32 bits of the paint time and an 8-bit check, most significant first.
+BARCODE_CELLS = 48
+_VALUE_BITS = 32
+_CHECK_BITS = 8
+_FIRST_DATA_CELL = 2
+
+# Stages in pipeline order; each is timed from the previous mark
+STAGES = [
+    ('captured', "screen -> capture"),
+    ('queued', "capture -> encoder queue"),
+    ('piped', "encoder queue -> FFmpeg pipe"),
+    ('received', "encode + transport -> viewer"),
+]
+
+
+def now_ms() -> int:
+    """Monotonic clock in ms, wrapped to the barcode's 32 bits (shared by every process on the host)"""
+    return int(time.monotonic() * 1000) & 0xFFFFFFFF
+
+
+def to_ms(timestamp: float) -> int:
+    """A time.monotonic() value on the barcode clock"""
+    return int(timestamp * 1000) & 0xFFFFFFFF
+
+
+def elapsed_ms(since: int, until: int) -> int:
+    """Difference of two barcode-clock values, across the 32-bit wrap"""
+    return (until - since) & 0xFFFFFFFF
+
+
+def _check(value: int) -> int:
+    return ((value >> 24) ^ (value >> 16) ^ (value >> 8) ^ value ^ 0x5A) & 0xFF
+
+
+def barcode_bits(value: int) -> List[int]:
+    """Cell colours (1 = white) for a paint time"""
+    value &= 0xFFFFFFFF
+    word = (value << _CHECK_BITS) | _check(value)
+    total = _VALUE_BITS + _CHECK_BITS
+    return [1, 0] + [(word >> (total - 1 - i)) & 1 for i in range(total)]
+
+
+def barcode_cells(width: int) -> List[Tuple[int, int, int, int]]:
+    """(x, y, w, h) of every cell on a frame/screen width pixels wide"""
+    cells = []
+    height = max(1, int(round(width / BARCODE_CELLS)))
+    count = _FIRST_DATA_CELL + _VALUE_BITS + _CHECK_BITS
+    for i in range(count):
+        x0 = int(round(i * width / BARCODE_CELLS))
+        x1 = int(round((i + 1) * width / BARCODE_CELLS))
+        cells.append((x0, 0, x1 - x0, height))
+    return cells
+
+
+def draw_barcode(frame: np.ndarray, value: int) -> None:
+    """Paint a barcode for value into the top of a BGR/BGRA/grey frame in place"""
+    for (x, y, w, h), bit in zip(barcode_cells(frame.shape[1]), barcode_bits(value)):
+        frame[y:y + h, x:x + w] = 255 if bit else 0
+
+
+def read_barcode(frame: np.ndarray) -> Optional[int]:
+    """Paint time encoded at the top of a frame, or None when no valid barcode is there
+
+    Samples the middle half of each cell, so scaling and compression blur at the cell
+    edges don't matter.
+    """
+    cells = barcode_cells(frame.shape[1])
+    levels = []
+    for x, y, w, h in cells:
+        patch = frame[y + h // 4:y + h - h // 4, x + w // 4:x + w - w // 4]
+        if patch.ndim == 3:
+            patch = patch[..., :3]
+        levels.append(float(patch.mean()) if patch.size else 0.0)
+
+    white, black = levels[0], levels[1]
+    if white - black < 64:
+        return None
+    threshold = (white + black) / 2
+    word = 0
+    for level in levels[_FIRST_DATA_CELL:]:
+        word = (word << 1) | (1 if level > threshold else 0)
+    value = word >> _CHECK_BITS
+    if word & 0xFF != _check(value):
+        return None
+    return value
+
+
+def _distribution(samples: List[int]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'mean': sum(ordered) / count,
+        'p50': ordered[count // 2],
+        'p95': ordered[min(count - 1, int(count * 0.95))],
+        'p99': ordered[min(count - 1, int(count * 0.99))],
+        'max': ordered[-1],
+    }
+
+
+class LatencyProbe:
+    """Collects per-frame stage marks keyed by the frame's barcode
+
+    The stream loop calls frame_queued(), the encoder thread frame_written() and the viewer
+    frame_received(). Only the first sighting per stage counts, so duplicated frames don't
+    skew the numbers. Frames dropped on the way simply never reach the later stages.
+    """
+
+    def __init__(self, keep: int = 4096):
+        self.lock = threading.Lock()
+        self.keep = keep
+        self.marks = {}  # paint time -> {stage: barcode-clock ms}
+        self.undecoded = {'queued': 0, 'piped': 0, 'received': 0}
+
+    def reset(self):
+        """Forget everything collected so far (end of warm-up)"""
+        with self.lock:
+            self.marks.clear()
+            self.undecoded = dict.fromkeys(self.undecoded, 0)
+
+    def _mark(self, frame: np.ndarray, stage: str, at: int, **extra) -> Optional[int]:
+        value = read_barcode(frame)
+        with self.lock:
+            if value is None:
+                self.undecoded[stage] += 1
+                return None
+            marks = self.marks.get(value)
+            if marks is None:
+                if len(self.marks) >= self.keep:
+                    self.marks.pop(next(iter(self.marks)))
+                marks = self.marks[value] = {}
+            for name, ms in extra.items():
+                marks.setdefault(name, ms)
+            marks.setdefault(stage, at)
+        return value
+
+    def frame_queued(self, frame: np.ndarray, capture_timestamp: Optional[float]) -> None:
+        """Processed frame handed to the writer (capture_timestamp: time.monotonic() of the grab)
+
+        Without a capture timestamp (frames painted in memory) the queued stage is timed
+        from the paint time.
+        """
+        if capture_timestamp is None:
+            self._mark(frame, 'queued', now_ms())
+        else:
+            self._mark(frame, 'queued', now_ms(), captured=to_ms(capture_timestamp))
+
+    def frame_written(self, frame: np.ndarray) -> None:
+        """Frame fully written to FFmpeg's stdin"""
+        self._mark(frame, 'piped', now_ms())
+
+    def frame_received(self, frame: np.ndarray) -> None:
+        """Decoded frame arrived at the viewer"""
+        self._mark(frame, 'received', now_ms())
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Distributions (ms) for 'end_to_end' and every stage that has samples"""
+        with self.lock:
+            records = [(painted, dict(marks)) for painted, marks in self.marks.items()]
+
+        report = {}
+        complete = [(painted, marks) for painted, marks in records if 'received' in marks]
+        if complete:
+            report['end_to_end'] = _distribution([elapsed_ms(p, m['received']) for p, m in complete])
+        for stage, _ in STAGES:
+            samples = []
+            for painted, marks in complete:
+                previous = painted
+                for name, _ in STAGES:
+                    if name == stage:
+                        break
+                    previous = marks.get(name, previous)
+                if stage in marks:
+                    samples.append(elapsed_ms(previous, marks[stage]))
+            if samples:
+                report[stage] = _distribution(samples)
+        return report
+
+    def summary(self) -> str:
+        """Report as a printable table"""
+        report = self.report()
+        if 'end_to_end' not in report:
+            return "no frame made it to the viewer with a readable barcode"
+        rows = [('end_to_end', "glass to glass")] + STAGES
+        lines = [f"{'stage':>30} | {'n':>5} | {'mean':>7} | {'p50':>5} | {'p95':>5} | {'p99':>5} | {'max':>5}"]
+        for key, label in rows:
+            if key not in report:
+                continue
+            d = report[key]
+            lines.append(f"{label:>30} | {d['count']:>5} | {d['mean']:>7.1f} | {d['p50']:>5} | "
+                         f"{d['p95']:>5} | {d['p99']:>5} | {d['max']:>5}")
+        with self.lock:
+            undecoded = dict(self.undecoded)
+        lines.append(f"{'unreadable barcodes':>30} | " + ", ".join(f"{k} {v}" for k, v in undecoded.items()))
+        return "\n".join(lines)
+
+
+class BarcodeViewer:
+    """Local viewer: receives the stream, decodes it to grey frames and feeds the probe
+
+    mode picks the stand-in receiver (RTMP, SRT or UDP on port, or an HLS playlist in
+    directory); url is the target to stream to. Decoding runs with FFmpeg's low-delay
+    flags so the viewer adds as little buffering as a real player on a fast connection would.
+    """
+
+    def __init__(self, probe: LatencyProbe, size: Tuple[int, int], port: int = None, ffmpeg: str = 'ffmpeg',
+                 mode: str = LIVE_RTMP, directory=None):
+        self.probe = probe
+        self.size = (int(size[0]), int(size[1]))
+        self.frames = 0
+        self.mode = mode
+        self.listener = local_receiver(
+            mode, port=port, directory=directory,
+            input_args=['-fflags', 'nobuffer', '-flags', 'low_delay', '-probesize', '32768',
+                        '-analyzeduration', '0'],
+            output_args=['-an', '-vf', f"scale={self.size[0]}:{self.size[1]}", '-f', 'rawvideo',
+                         '-pix_fmt', 'gray', 'pipe:1'],
+            stdout=True, on_process=self._on_process, ffmpeg=ffmpeg,
+        )
+
+    @property
+    def url(self) -> str:
+        return self.listener.url
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        self.listener.stop()
+
+    def _on_process(self, process):
+        threading.Thread(target=self._read, args=(process,), daemon=True).start()
+
+    def _read(self, process):
+        width, height = self.size
+        size = width * height
+        while True:
+            frame = np.empty((height, width), dtype=np.uint8)
+            view = memoryview(frame).cast('B')
+            filled = 0
+            while filled < size:
+                n = process.stdout.readinto(view[filled:])
+                if not n:
+                    return
+                filled += n
+            self.frames += 1
+            self.probe.frame_received(frame)
+
+
+def measure_encoder_path(mode: str = LIVE_RTMP, size=(1280, 720), fps: int = 30, seconds: float = 20.0,
+                         warmup: float = 3.0, kbps: int = 4500, port: int = 19360, ffmpeg: str = 'ffmpeg',
+                         directory=None) -> Tuple[LatencyProbe, int]:
+    """Headless variant of latency_harness.py: barcodes painted into frames, not onto a screen
+
+    Frames go through FFmpegWriter with the stream loop's live settings (low-latency profile,
+    bitrate-driven, 1 s GOP, drop-oldest overflow) to the mode's stand-in receiver. There is
+    no screen, capture or redaction, so 'captured' is never marked: the first stage covers
+    painting and queueing only. Returns (probe, frames viewed) like the harness' measure().
+    """
+    import tempfile
+
+    probe = LatencyProbe()
+    viewer = BarcodeViewer(probe, size, port=port, ffmpeg=ffmpeg, mode=mode,
+                           directory=directory or tempfile.mkdtemp(prefix='hls_'))
+    viewer.start()
+    writer = FFmpegWriter(EncoderOutput.live(mode, viewer.url), size, fps, 'bgra', crf=None,
+                          profile=DEFAULT_PROFILES[PROFILE_LOW_LATENCY], bitrate=kbps, gop=fps,
+                          ffmpeg=ffmpeg, overflow_policy=OVERFLOW_DROP)
+    writer.on_frame_written = probe.frame_written
+    background = np.full((size[1], size[0], 4), 48, dtype=np.uint8)
+    clock = DeadlineClock(fps)
+    try:
+        writer.start()
+        start = time.monotonic()
+        measuring = False
+        while time.monotonic() - start < warmup + seconds:
+            clock.wait()
+            if not measuring and time.monotonic() - start >= warmup:
+                probe.reset()
+                measuring = True
+            frame = writer.frame_buffer()
+            np.copyto(frame, background)
+            draw_barcode(frame, now_ms())
+            probe.frame_queued(frame, None)
+            writer.write(frame, owned=True)
+    finally:
+        writer.close(timeout=10.0)
+        time.sleep(1.0)  # Let the viewer decode what is still in flight
+        viewer.stop()
+    return probe, viewer.frames
+
+
+if __name__ == "__main__":
+    # python -m core.latency_probe [--modes rtmp,srt,udp,hls] [--seconds 20] [--size 1280x720]   (from src/)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Encoder + transport latency per output mode, without a display")
+    parser.add_argument('--modes', default=','.join(LIVE_OUTPUT_LABELS))
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--size', default='1280x720')
+    parser.add_argument('--fps', type=int, default=30)
+    args = parser.parse_args()
+    frame_size = tuple(int(v) for v in args.size.lower().split('x'))
+
+    results = []
+    for output_mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+        try:
+            results.append((output_mode, *measure_encoder_path(output_mode, frame_size, args.fps,
+                                                               args.seconds, args.warmup)))
+        except EncoderError as e:
+            results.append((output_mode, e, 0))
+    for output_mode, mode_probe, viewed in results:
+        if isinstance(mode_probe, Exception):
+            print(f"\n❌ {LIVE_OUTPUT_LABELS[output_mode]}: stream failed ({mode_probe})")
+            continue
+        print(f"\n📊 {LIVE_OUTPUT_LABELS[output_mode]}, {frame_size[0]}x{frame_size[1]} @ {args.fps} fps, "
+              f"{viewed} frames viewed (no capture stage)")
+        print(mode_probe.summary())
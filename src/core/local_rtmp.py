@@ -0,0 +1,218 @@
+"""
+Local RTMP - Stand-ins for a live platform when testing streaming on one machine
+FFmpeg receivers for RTMP, SRT, UDP and local HLS, and a TCP proxy that throttles the upload
+"""
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from .ffmpeg_writer import HLS_PLAYLIST, LIVE_HLS, LIVE_SRT, LIVE_UDP, SRT_LATENCY_MS
+
+
+class RtmpListener:
+    """FFmpeg in RTMP listen mode on 127.0.0.1, relaunched after every publisher disconnects
+
+    input_args go before -i (demuxer/decoder flags), output_args decide what happens to the
+    received stream (discarded by default). With
+    stdout=True the process' stdout is piped and handed to on_process for each publisher.
+    """
+
+    def __init__(self, port: int = 1935, app: str = 'live', key: str = 'test', output_args: List[str] = None,
+                 stdout: bool = False, on_process=None, ffmpeg: str = 'ffmpeg', input_args: List[str] = None):
+        self.port = port
+        self.app = app
+        self.key = key
+        self.input_args = input_args or []
+        self.output_args = output_args or ['-f', 'null', '-']
+        self.stdout = stdout
+        self.on_process = on_process
+        self.ffmpeg = ffmpeg
+        self.running = False
+        self.thread = None
+        self.process = None
+        self.sessions = 0  # Publishers served so far
+
+    @property
+    def url(self) -> str:
+        """Publish URL for FFmpegWriter / EncoderOutput.rtmp"""
+        return f"rtmp://127.0.0.1:{self.port}/{self.app}/{self.key}"
+
+    def command(self) -> List[str]:
+        return ([self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-listen', '1'] + self.input_args +
+                ['-i', self.url] + self.output_args)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        time.sleep(0.5)  # Let FFmpeg bind the port before anyone publishes
+
+    def ready(self) -> bool:
+        """Whether there is anything to receive yet (listeners: always)"""
+        return True
+
+    def _serve(self):
+        while self.running:
+            if not self.ready():
+                time.sleep(0.05)
+                continue
+            self.process = subprocess.Popen(self.command(), stdin=subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE if self.stdout else subprocess.DEVNULL)
+            if self.on_process is not None:
+                self.on_process(self.process)
+            self.process.wait()
+            self.sessions += 1
+
+    def stop(self):
+        self.running = False
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+
+
+class SrtListener(RtmpListener):
+    """FFmpeg as an SRT listener; the publisher connects in caller mode (EncoderOutput.srt)"""
+
+    def __init__(self, port: int = 9000, latency_ms: int = SRT_LATENCY_MS, **kwargs):
+        super().__init__(port=port, **kwargs)
+        self.latency_ms = latency_ms
+
+    @property
+    def url(self) -> str:
+        return f"srt://127.0.0.1:{self.port}"
+
+    def command(self) -> List[str]:
+        listen = f"{self.url}?mode=listener&transtype=live&latency={self.latency_ms * 1000}"
+        return [self.ffmpeg, '-hide_banner', '-loglevel', 'error'] + self.input_args + ['-i', listen] + self.output_args
+
+
+class UdpListener(RtmpListener):
+    """FFmpeg reading MPEG-TS datagrams sent to 127.0.0.1:port (EncoderOutput.udp)
+
+    UDP has no end of stream: one process serves every publisher until stop().
+    """
+
+    def __init__(self, port: int = 1234, **kwargs):
+        super().__init__(port=port, **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"udp://127.0.0.1:{self.port}"
+
+    def command(self) -> List[str]:
+        # Large socket FIFO so a busy reader loses nothing; overruns are reported, not fatal
+        listen = f"{self.url}?fifo_size=1000000&overrun_nonfatal=1"
+        return [self.ffmpeg, '-hide_banner', '-loglevel', 'error'] + self.input_args + ['-i', listen] + self.output_args
+
+
+class HlsReader(RtmpListener):
+    """FFmpeg following a local HLS playlist (EncoderOutput.hls) like a player would
+
+    Starts once the playlist exists, at the newest segment, and polls for new ones; the
+    latency it sees is what a low-latency player on the same machine would get.
+    """
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+
+    @property
+    def url(self) -> str:
+        """Directory to pass to EncoderOutput.hls"""
+        return str(self.directory)
+
+    def ready(self) -> bool:
+        return (self.directory / HLS_PLAYLIST).exists()
+
+    def command(self) -> List[str]:
+        return ([self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-live_start_index', '-1'] + self.input_args +
+                ['-i', str(self.directory / HLS_PLAYLIST)] + self.output_args)
+
+
+def local_receiver(mode: str, port: int = None, directory=None, **kwargs) -> RtmpListener:
+    """Stand-in receiver for a LIVE_* mode; its url is the matching EncoderOutput.live target"""
+    if mode == LIVE_SRT:
+        return SrtListener(port=port or 9000, **kwargs)
+    if mode == LIVE_UDP:
+        return UdpListener(port=port or 1234, **kwargs)
+    if mode == LIVE_HLS:
+        return HlsReader(directory, **kwargs)
+    return RtmpListener(port=port or 1935, **kwargs)
+
+
+class ThrottledProxy:
+    """TCP proxy limiting client -> server throughput to kbps (the publisher's upload)
+
+    set_rate() changes the limit while connections are open, to simulate congestion.
+    """
+
+    def __init__(self, listen_port: int, target_port: int, kbps: float, host: str = '127.0.0.1'):
+        self.listen_port = listen_port
+        self.target_port = target_port
+        self.host = host
+        self.kbps = kbps
+        self.running = False
+        self.server = None
+        self.bytes_forwarded = 0
+
+    def set_rate(self, kbps: float):
+        self.kbps = kbps
+        print(f"🐢 [Throttled Proxy] Upload limited to {kbps:.0f} kbit/s")
+
+    def start(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((self.host, self.listen_port))
+        self.server.listen(4)
+        self.running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while self.running:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                break
+            upstream = socket.create_connection((self.host, self.target_port))
+            threading.Thread(target=self._pipe, args=(client, upstream, True), daemon=True).start()
+            threading.Thread(target=self._pipe, args=(upstream, client, False), daemon=True).start()
+
+    def _pipe(self, src: socket.socket, dst: socket.socket, throttled: bool):
+        # Token bucket: at most ~100 ms of burst at the current rate
+        allowance = 0.0
+        last = time.monotonic()
+        try:
+            while self.running:
+                data = src.recv(16384)
+                if not data:
+                    break
+                if throttled:
+                    while True:
+                        now = time.monotonic()
+                        rate = self.kbps * 1000 / 8
+                        allowance = min(allowance + (now - last) * rate, rate * 0.1 + len(data))
+                        last = now
+                        if allowance >= len(data):
+                            allowance -= len(data)
+                            break
+                        time.sleep((len(data) - allowance) / rate)
+                    self.bytes_forwarded += len(data)
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+
+    def stop(self):
+        self.running = False
+        if self.server is not None:
+            self.server.close()
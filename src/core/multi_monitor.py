@@ -0,0 +1,397 @@
+"""
+Multi Monitor - One capture-and-redaction process per monitor plus a shared-memory compositor
+Each monitor is grabbed, detected and blurred on its own core; the parent only lays out tiles
+"""
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from .capture import FrameRing
+from .capture_backend import create_backend
+from .frame_pacer import DeadlineClock
+from .frame_pipe import to_bgr
+from .resolution_space import ResolutionSpace, fit_size, DETECTION, FACE, OUTPUT
+
+# Buffers per monitor: one being written, one published, one possibly being read
+SLOTS_PER_MONITOR = 3
+# Shared header fields per monitor
+_LATEST, _READING, _SEQ = range(3)
+_HEADER_FIELDS = 3
+
+
+def compute_layout(monitors: List[dict], output_bound: Tuple[int, int]):
+    """Place monitors on one canvas keeping their desktop arrangement
+
+    Returns (canvas_size, rects) where rects[i] = (x, y, w, h) of monitor i on the canvas.
+    The whole arrangement is scaled down to fit output_bound (never up).
+    """
+    left = min(m['left'] for m in monitors)
+    top = min(m['top'] for m in monitors)
+    right = max(m['left'] + m['width'] for m in monitors)
+    bottom = max(m['top'] + m['height'] for m in monitors)
+
+    canvas_w, canvas_h = fit_size((right - left, bottom - top), output_bound)
+    scale = canvas_w / (right - left)
+
+    rects = []
+    for m in monitors:
+        x, y = int((m['left'] - left) * scale), int((m['top'] - top) * scale)
+        w = min(canvas_w - x, max(2, int(m['width'] * scale) & ~1))
+        h = min(canvas_h - y, max(2, int(m['height'] * scale) & ~1))
+        rects.append((x, y, w, h))
+    return (canvas_w, canvas_h), rects
+
+
+class MonitorPipeline:
+    """Face tracking, optional OCR and redaction for one monitor (runs inside its worker process)"""
+
+    def __init__(self, options: Dict):
+        from .blur_engine import BlurEngine
+        from .detector_router import DetectorRouter
+        from .face_tracker import FaceTracker
+        from .region_classifier import RegionClassifier, detect_faces_in_regions
+
+        self.options = options
+        self.face_scale = options.get('face_scale', 0.5)
+        self.blur_ksize = tuple(options.get('blur_ksize', (51, 51)))
+        self.blur_sigma = options.get('blur_sigma', 30)
+        self.blur_engine = BlurEngine(options.get('blur_mode', 'downscale'), options.get('blur_intensity', 3))
+
+        self.face_enabled = options.get('face_blur', False)
+        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        self.face_tracker = FaceTracker(detect_every=options.get('detect_every', 2))
+        self.classifier = RegionClassifier()
+        self.router = DetectorRouter(self.classifier, scale=self.face_scale)
+        self.detect_faces_in_regions = detect_faces_in_regions
+
+        # Haar runs on a thread of this process too, so a detection never stalls the grab loop;
+        # the tracker carries the boxes every frame and is re-seeded when a result comes in
+        self.face_lock = threading.Lock()
+        self.face_pending = None  # (small BGR, gray, motion history, tracked boxes)
+        self.face_result = None  # (gray the detector saw, boxes) not yet applied
+        if self.face_enabled and not self.face_cascade.empty():
+            threading.Thread(target=self._face_worker, daemon=True).start()
+
+        # OCR runs on a thread of this process, latest frame wins (same scheme as the main app)
+        self.detector = None
+        self.ocr_lock = threading.Lock()
+        self.ocr_pending = None
+        self.ocr_regions = []
+        self.ocr_interval = options.get('ocr_interval', 0.35)
+        self.last_ocr_submit = 0.0
+        if options.get('sensitive_blur', False):
+            try:
+                from .confidential_detector import ConfidentialDataDetector
+                self.detector = ConfidentialDataDetector(padding_px=20)
+                threading.Thread(target=self._ocr_worker, daemon=True).start()
+            except ImportError as e:
+                print(f"⚠️  [Monitor Worker] OCR not available: {e}")
+
+    def _face_worker(self):
+        while True:
+            with self.face_lock:
+                pending = self.face_pending
+                self.face_pending = None
+            if pending is None:
+                time.sleep(0.01)
+                continue
+            small, gray, motion_history, tracked = pending
+            try:
+                plan = self.router.plan(small, gray, motion_history, tracked)
+                detected = self.detect_faces_in_regions(self.face_cascade, gray, plan.face_regions)
+                with self.face_lock:
+                    self.face_result = (gray, detected)
+            except Exception as e:
+                print(f"❌ [Monitor Face Error] {e}")
+
+    def _ocr_worker(self):
+        while True:
+            with self.ocr_lock:
+                pending = self.ocr_pending
+                self.ocr_pending = None
+            if pending is None:
+                time.sleep(0.05)
+                continue
+            frame, motion_history = pending
+            try:
+                plan = self.router.plan_for_frame(frame, motion_history)
+                regions = self.detector.detect_confidential_data(frame, plan.frame_regions(plan.text_regions))
+                with self.ocr_lock:
+                    self.ocr_regions = regions
+            except Exception as e:
+                print(f"❌ [Monitor OCR Error] {e}")
+
+    def process(self, capture: np.ndarray, out: np.ndarray, detection_bound: Tuple[int, int]) -> None:
+        """Resize capture into out (tile size) and redact out in place"""
+        capture_size = (capture.shape[1], capture.shape[0])
+        tile_size = (out.shape[1], out.shape[0])
+        space = ResolutionSpace.for_pipeline(capture_size, tile_size, fit_size(capture_size, detection_bound),
+                                             face_scale=self.face_scale)
+        if capture_size == tile_size:
+            out[...] = capture
+        else:
+            cv2.resize(capture, tile_size, dst=out, interpolation=cv2.INTER_AREA)
+
+        regions = []
+        if self.face_enabled and not self.face_cascade.empty():
+            small = to_bgr(space.resize(capture, FACE, interpolation=cv2.INTER_LINEAR))
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            self.classifier.observe(gray)
+            with self.face_lock:
+                result = self.face_result
+                self.face_result = None
+            if result is not None:
+                # Seed tracks on the frame the detector saw, then flow them forward to this one
+                self.face_tracker.reset(*result)
+            self.face_tracker.update(gray)
+            if self.face_tracker.needs_detection():
+                with self.face_lock:
+                    self.face_pending = (small, gray, self.classifier.motion_history,
+                                         [t.box for t in self.face_tracker.tracks])
+            regions += space.map_boxes(self.face_tracker.get_boxes(), FACE, OUTPUT)
+
+        if self.detector is not None:
+            now = time.monotonic()
+            if now - self.last_ocr_submit >= self.ocr_interval:
+                with self.ocr_lock:
+                    if self.ocr_pending is None:
+                        frame = to_bgr(space.resize(capture, DETECTION))
+                        self.ocr_pending = (frame.copy() if frame is capture else frame,
+                                            self.classifier.motion_history)
+                        self.last_ocr_submit = now
+            with self.ocr_lock:
+                regions += space.map_boxes(self.ocr_regions, DETECTION, OUTPUT)
+
+        if regions:
+            self.blur_engine.redact(out, regions, self.blur_ksize, self.blur_sigma)
+
+
+def _monitor_worker(index: int, monitor: dict, fps: float, tile_shape: Tuple[int, int, int], shm_name: str,
+                    header, stop_event, options: Dict) -> None:
+    """Worker process: grab one monitor, redact it and publish tiles into shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((SLOTS_PER_MONITOR,) + tuple(tile_shape), dtype=np.uint8, buffer=shm.buf)
+    base = index * _HEADER_FIELDS
+    bgra = tile_shape[2] == 4
+    detection_bound = tuple(options.get('detection_size', (1920, 1080)))
+
+    try:
+        pipeline = MonitorPipeline(options)
+        backend = create_backend(options.get('capture_backend', 'mss'))
+        clock = DeadlineClock(fps)
+        print(f"✅ [Monitor {index + 1} Worker] Started ({monitor['width']}x{monitor['height']})")
+
+        consecutive_errors = 0
+        backend.open(monitor, fps)
+        try:
+            while not stop_event.is_set():
+                clock.wait()
+                try:
+                    capture = backend.grab(monitor)
+                    consecutive_errors = 0
+                except Exception as e:
+                    # A transient grab failure (display change, lock screen) shouldn't end the worker
+                    consecutive_errors += 1
+                    print(f"Monitor {index + 1} capture error {consecutive_errors}: {e}")
+                    if consecutive_errors > 10:
+                        raise
+                    time.sleep(0.1)
+                    continue
+                if not bgra:
+                    capture = cv2.cvtColor(capture, cv2.COLOR_BGRA2BGR)
+
+                with header.get_lock():
+                    busy = (header[base + _LATEST], header[base + _READING])
+                slot = next(s for s in range(SLOTS_PER_MONITOR) if s not in busy)
+
+                pipeline.process(capture, slots[slot], detection_bound)
+
+                with header.get_lock():
+                    header[base + _LATEST] = slot
+                    header[base + _SEQ] += 1
+        finally:
+            backend.close()
+    except Exception as e:
+        print(f"❌ [Monitor {index + 1} Worker Error] {e}")
+    finally:
+        del slots
+        shm.close()
+
+
+class MultiMonitorCapture:
+    """Capture source compositing per-monitor worker processes into a FrameRing
+
+    Drop-in for CaptureThread in the record/stream loops (ring, monitor, error, stop()).
+    Frames arrive already redacted, which the loops check through `redacts`.
+    """
+
+    redacts = True
+
+    def __init__(self, monitors: List[dict], fps: float, output_bound: Tuple[int, int], options: Dict,
+                 ring: FrameRing = None, pixel_format: str = 'bgr'):
+        self.monitors = [dict(m) for m in monitors]
+        self.fps = fps
+        self.options = options
+        self.ring = ring or FrameRing()
+        self.channels = 4 if pixel_format == 'bgra' else 3
+        self.error = None
+
+        canvas_size, self.rects = compute_layout(self.monitors, output_bound)
+        self.monitor = {'left': 0, 'top': 0, 'width': canvas_size[0], 'height': canvas_size[1]}
+
+        self.ctx = mp.get_context('spawn')  # Same behaviour on Windows, macOS and Linux
+        self.stop_event = self.ctx.Event()
+        self.header = self.ctx.Array('i', [-1, -1, 0] * len(self.monitors))
+        self.shms: List[shared_memory.SharedMemory] = []
+        self.tiles: List[np.ndarray] = []
+        self.processes = []
+        self.thread = None
+        self.running = False
+
+        self.composite_time_total = 0.0
+        self.composite_count = 0
+
+    @property
+    def avg_grab_ms(self) -> float:
+        """Average compositing time (the parent's share of capture work)"""
+        return self.composite_time_total * 1000 / max(self.composite_count, 1)
+
+    def start(self):
+        for index, (monitor, (_, _, w, h)) in enumerate(zip(self.monitors, self.rects)):
+            tile_shape = (h, w, self.channels)
+            shm = shared_memory.SharedMemory(create=True, size=SLOTS_PER_MONITOR * h * w * self.channels)
+            self.shms.append(shm)
+            self.tiles.append(np.ndarray((SLOTS_PER_MONITOR,) + tile_shape, dtype=np.uint8, buffer=shm.buf))
+
+            process = self.ctx.Process(
+                target=_monitor_worker,
+                args=(index, monitor, self.fps, tile_shape, shm.name, self.header, self.stop_event, self.options),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+        self.running = True
+        self.thread = threading.Thread(target=self._composite_loop, daemon=True)
+        self.thread.start()
+        print(f"✅ [Multi Monitor] {len(self.processes)} worker processes | canvas "
+              f"{self.monitor['width']}x{self.monitor['height']}")
+
+    def _composite_loop(self):
+        clock = DeadlineClock(self.fps)
+        shape = (self.monitor['height'], self.monitor['width'], self.channels)
+        cleared = set()  # Slots whose gaps between monitors are already black
+
+        while self.running:
+            start = clock.wait()
+            dead = [i + 1 for i, p in enumerate(self.processes) if not p.is_alive()]
+            if dead and self.running:
+                self.error = Exception(f"Monitor worker(s) {dead} exited")
+                self.ring.close()
+                return
+
+            index = self.ring.acquire_write(shape)
+            if index is None:
+                continue
+            canvas = self.ring.slot(index)
+            if index not in cleared:
+                canvas[...] = 0
+                cleared.add(index)
+
+            for i, (x, y, w, h) in enumerate(self.rects):
+                base = i * _HEADER_FIELDS
+                with self.header.get_lock():
+                    latest = self.header[base + _LATEST]
+                    self.header[base + _READING] = latest
+                if latest >= 0:
+                    canvas[y:y + h, x:x + w] = self.tiles[i][latest]
+                with self.header.get_lock():
+                    self.header[base + _READING] = -1
+
+            self.ring.commit(index, start)
+            self.composite_time_total += time.monotonic() - start
+            self.composite_count += 1
+
+    def stop(self, timeout: float = 2.0):
+        self.running = False
+        self.stop_event.set()
+        self.ring.close()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+        for process in self.processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+        self.tiles = []
+        for shm in self.shms:
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.shms = []
+        print("🛑 [Multi Monitor] Stopped")
+
+
+def _benchmark_worker(size: Tuple[int, int], fps: float, seconds: float, options: Dict, results) -> None:
+    """One monitor's pipeline on synthetic desktop frames, paced like the capture loop"""
+    from .encoder_profiles import synthetic_screen_frames
+
+    frames = synthetic_screen_frames(size, 30)
+    pipeline = MonitorPipeline(options)
+    out = np.empty_like(frames[0])
+    clock = DeadlineClock(fps)
+    times = []
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        clock.wait()
+        begin = time.perf_counter()
+        pipeline.process(frames[len(times) % len(frames)], out, size)
+        times.append((time.perf_counter() - begin) * 1000)
+    times.sort()
+    results.put((len(times) / (time.monotonic() - start), times[int(len(times) * 0.95) - 1]))
+
+
+def benchmark_monitors(counts=(1, 2, 3), size=(1920, 1080), fps: float = 30.0, seconds: float = 5.0,
+                       options: Dict = None) -> Dict[int, Dict[str, float]]:
+    """Per-monitor redaction throughput with 1, 2, 3... worker processes running at once
+
+    Synthetic frames stand in for the grab (no display needed), so this measures what the
+    workers add on top of capture. Returns {count: {'fps', 'min_fps', 'p95_ms'}} with fps
+    averaged over the monitors, min_fps the slowest one's.
+    """
+    options = dict(options or {'face_blur': True, 'detect_every': 2})
+    ctx = mp.get_context('spawn')
+    report = {}
+    for count in counts:
+        results = ctx.Queue()
+        processes = [ctx.Process(target=_benchmark_worker, args=(size, fps, seconds, options, results))
+                     for _ in range(count)]
+        for process in processes:
+            process.start()
+        runs = [results.get(timeout=seconds + 60) for _ in processes]
+        for process in processes:
+            process.join()
+        report[count] = {
+            'fps': sum(r[0] for r in runs) / count,
+            'min_fps': min(r[0] for r in runs),
+            'p95_ms': max(r[1] for r in runs),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    # python -m core.multi_monitor [WIDTHxHEIGHT]   (from src/)
+    import os
+    import sys
+    from core.multi_monitor import benchmark_monitors  # Spawned workers unpickle by module name, not __main__
+    size = tuple(int(v) for v in sys.argv[1].split('x')) if len(sys.argv) > 1 else (1920, 1080)
+    print(f"{os.cpu_count()} cores, {size[0]}x{size[1]} per monitor, face blur, target 30 fps")
+    for count, r in benchmark_monitors(size=size).items():
+        print(f"{count} monitor(s): {r['fps']:5.1f} fps per monitor (slowest {r['min_fps']:5.1f}) | "
+              f"process p95 {r['p95_ms']:6.1f} ms")
@@ -0,0 +1,108 @@
+"""
+Preview Tap - Feeds the live preview from the processing pipeline
+Takes already-redacted frames, downscales them at preview rate and converts them off the GUI thread
+"""
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class PreviewTap:
+    """Latest-frame-wins tap between the capture pipeline and the preview widgets
+
+    offer() is called by the pipeline for every encoded frame but only does work (one
+    downscale into a private buffer) at preview_fps. A worker thread draws debug overlays on
+    that small copy - never on the encoded frame - and passes it to on_frame, which runs on
+    the worker thread and may do the toolkit conversion (e.g. build a QImage).
+    """
+
+    def __init__(self, on_frame: Callable[[np.ndarray], None], preview_width: int = 960,
+                 preview_fps: float = 15.0):
+        self.on_frame = on_frame
+        self.preview_width = preview_width
+        self.interval = 1.0 / preview_fps
+
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.pending: Optional[Tuple[np.ndarray, float, List[Tuple[int, int, int, int]]]] = None
+        self.last_offer_time = 0.0
+        self.running = False
+        self.thread = None
+
+        self.frames_offered = 0
+        self.frames_shown = 0
+
+    def start(self):
+        """Start the conversion worker"""
+        if self.running:
+            return
+        self.running = True
+        self.last_offer_time = 0.0
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        print("✅ [Preview Tap] Started successfully")
+
+    def stop(self):
+        """Stop the worker and drop any pending frame"""
+        if not self.running:
+            return
+        self.running = False
+        self.event.set()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+        with self.lock:
+            self.pending = None
+        print("🛑 [Preview Tap] Stopped")
+
+    def offer(self, frame: np.ndarray, debug_boxes=None) -> bool:
+        """Hand a processed frame to the preview (cheap no-op between preview ticks)
+
+        debug_boxes are (x, y, w, h) in frame coordinates and are only drawn on the preview.
+        Returns True when the frame was taken.
+        """
+        if not self.running:
+            return False
+        now = time.monotonic()
+        if now - self.last_offer_time < self.interval:
+            return False
+        self.last_offer_time = now
+        self.frames_offered += 1
+
+        # The pipeline may reuse frame right after this call, so take a downscaled private copy
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.preview_width / w)
+        if scale < 1.0:
+            small = cv2.resize(frame, (self.preview_width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        else:
+            small = frame.copy()
+
+        with self.lock:
+            self.pending = (small, scale, list(debug_boxes or []))
+        self.event.set()
+        return True
+
+    def _worker(self):
+        while self.running:
+            self.event.wait(0.5)
+            self.event.clear()
+            with self.lock:
+                pending = self.pending
+                self.pending = None
+            if pending is None:
+                continue
+
+            small, scale, debug_boxes = pending
+            try:
+                for (x, y, w, h) in debug_boxes:
+                    x1, y1 = int(x * scale), int(y * scale)
+                    x2, y2 = int((x + w) * scale), int((y + h) * scale)
+                    cv2.rectangle(small, (x1, y1), (x2, y2), (0, 0, 255), 2)
+                    cv2.putText(small, "CONFIDENTIAL", (x1, max(12, y1 - 6)),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 255), 1)
+                self.on_frame(small)
+                self.frames_shown += 1
+            except Exception as e:
+                print(f"❌ [Preview Tap Error] {e}")
@@ -0,0 +1,163 @@
+"""
+Region Classifier - Tile-level motion history and texture heuristics
+Labels tiles of a downscaled frame as empty, text/UI or photographic/video
+"""
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+# Tile labels
+TILE_EMPTY = 0
+TILE_TEXT = 1
+TILE_PHOTO = 2
+
+
+class RegionClassifier:
+    """Classifies tiles of a downscaled frame as empty, text/UI or photographic
+
+    Screen faces come from video players, calls and images. Those tiles either change over
+    time (motion history) or have photographic texture: few perfectly flat pixels and a
+    wide spread of intensities/colours. Text and UI chrome is mostly flat background with
+    sharp edges, and empty tiles have almost no spread and no edges at all.
+
+    Only text detection relies on TILE_EMPTY, so it is kept strict: a tile with any edge
+    pixels beyond empty_flat_share (faint or thin text) is never empty.
+    """
+
+    def __init__(self, tile_size: int = 32, motion_decay: float = 0.9,
+                 motion_threshold: float = 3.0, flat_threshold: float = 0.45,
+                 std_threshold: float = 6.0, empty_flat_share: float = 0.995):
+        self.tile_size = tile_size
+        self.motion_decay = motion_decay  # Per-frame decay of the motion history
+        self.motion_threshold = motion_threshold  # Mean abs diff (0-255) for a tile to count as moving
+        self.flat_threshold = flat_threshold  # Max share of flat pixels in a photographic tile
+        self.std_threshold = std_threshold  # Min intensity/colour spread in a photographic tile
+        self.empty_flat_share = empty_flat_share  # Min share of flat pixels in an empty tile
+
+        self.prev_gray = None
+        self.motion_history = None
+
+    def reset(self):
+        """Forget motion history (e.g. when a new recording starts)"""
+        self.prev_gray = None
+        self.motion_history = None
+
+    def _grid_shape(self, gray: np.ndarray) -> Tuple[int, int]:
+        h, w = gray.shape[:2]
+        return max(1, -(-w // self.tile_size)), max(1, -(-h // self.tile_size))
+
+    def _tile_mean(self, values: np.ndarray, grid: Tuple[int, int]) -> np.ndarray:
+        """Mean of values over each tile (area resampling to the tile grid)"""
+        return cv2.resize(values, grid, interpolation=cv2.INTER_AREA)
+
+    def observe(self, gray: np.ndarray) -> None:
+        """Update the per-tile motion history - call once per captured frame"""
+        grid = self._grid_shape(gray)
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            self.prev_gray = gray
+            self.motion_history = np.zeros((grid[1], grid[0]), dtype=np.float32)
+            return
+
+        diff = cv2.absdiff(gray, self.prev_gray)
+        motion = self._tile_mean(diff, grid).astype(np.float32)
+        self.motion_history = np.maximum(self.motion_history * self.motion_decay, motion)
+        self.prev_gray = gray
+
+    def classify_tiles(self, small_bgr: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        """Label every tile TILE_EMPTY, TILE_TEXT or TILE_PHOTO from texture alone"""
+        grid = self._grid_shape(gray)
+
+        grad_x = cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3)
+        grad = cv2.addWeighted(cv2.convertScaleAbs(grad_x), 0.5, cv2.convertScaleAbs(grad_y), 0.5, 0)
+        flat = (grad < 4).astype(np.float32)
+        flat_share = self._tile_mean(flat, grid)
+
+        # Per-tile colour spread over all channels: sqrt(E[x^2] - E[x]^2), measured on an
+        # 8x8-samples-per-tile thumbnail which is plenty for a variance estimate
+        thumb = cv2.resize(small_bgr, (grid[0] * 8, grid[1] * 8), interpolation=cv2.INTER_AREA)
+        pixels = thumb.astype(np.float32)
+        mean = self._tile_mean(pixels, grid)
+        mean_sq = self._tile_mean(pixels * pixels, grid)
+        std = np.sqrt(np.maximum(mean_sq - mean * mean, 0)).mean(axis=2)
+
+        labels = np.full(flat_share.shape, TILE_TEXT, dtype=np.uint8)
+        labels[(flat_share < self.flat_threshold) & (std > self.std_threshold)] = TILE_PHOTO
+        labels[(std <= self.std_threshold) & (flat_share >= self.empty_flat_share)] = TILE_EMPTY
+        return labels
+
+    def moving_tiles(self, labels: np.ndarray, motion_history=None) -> np.ndarray:
+        """Boolean mask of non-empty tiles with recent motion"""
+        if motion_history is None:
+            motion_history = self.motion_history
+        if motion_history is None or motion_history.shape != labels.shape:
+            return np.zeros(labels.shape, dtype=bool)
+        return (motion_history > self.motion_threshold) & (labels != TILE_EMPTY)
+
+    def photographic_tiles(self, small_bgr: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        """Boolean tile mask of photographic texture (few flat pixels, wide value spread)"""
+        return self.classify_tiles(small_bgr, gray) == TILE_PHOTO
+
+    def face_tiles(self, small_bgr: np.ndarray, gray: np.ndarray, motion_history=None) -> np.ndarray:
+        """Boolean tile mask where face detection is worth running
+
+        motion_history defaults to the live history; worker threads pass the snapshot taken
+        when the frame was captured.
+        """
+        labels = self.classify_tiles(small_bgr, gray)
+        return (labels == TILE_PHOTO) | self.moving_tiles(labels, motion_history)
+
+    def tiles_to_regions(self, tiles: np.ndarray, frame_shape,
+                         extra_boxes=None) -> List[Tuple[int, int, int, int]]:
+        """Merge a tile mask into (x, y, w, h) regions in downscaled-frame coordinates
+
+        Tiles are dilated by one so faces straddling tile borders stay whole. extra_boxes
+        (e.g. currently tracked faces) are always included.
+        """
+        tile_mask = tiles.astype(np.uint8)
+        for (x, y, w, h) in extra_boxes or []:
+            tx1, ty1 = max(0, int(x) // self.tile_size), max(0, int(y) // self.tile_size)
+            tx2, ty2 = int(x + w) // self.tile_size + 1, int(y + h) // self.tile_size + 1
+            tile_mask[ty1:ty2, tx1:tx2] = 1
+
+        if not tile_mask.any():
+            return []
+
+        tile_mask = cv2.dilate(tile_mask, np.ones((3, 3), np.uint8))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(tile_mask, connectivity=8)
+
+        frame_h, frame_w = frame_shape[:2]
+        regions = []
+        for i in range(1, count):
+            tx, ty, tw, th = stats[i, :4]
+            x1, y1 = tx * self.tile_size, ty * self.tile_size
+            x2 = min(frame_w, (tx + tw) * self.tile_size)
+            y2 = min(frame_h, (ty + th) * self.tile_size)
+            regions.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return regions
+
+    def face_regions(self, small_bgr: np.ndarray, gray: np.ndarray, motion_history=None,
+                     extra_boxes=None) -> List[Tuple[int, int, int, int]]:
+        """Regions (downscaled-frame coordinates) where faces can plausibly appear"""
+        tiles = self.face_tiles(small_bgr, gray, motion_history)
+        return self.tiles_to_regions(tiles, gray.shape, extra_boxes)
+
+
+def detect_faces_in_regions(face_cascade, gray: np.ndarray, regions, min_size=(24, 24)):
+    """Run the Haar cascade only inside regions; returns boxes in gray-frame coordinates
+
+    regions=None means the whole frame.
+    """
+    if regions is None:
+        detected = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=min_size)
+        return [tuple(int(v) for v in d) for d in detected]
+
+    faces = []
+    for (x, y, w, h) in regions:
+        if w < min_size[0] or h < min_size[1]:
+            continue
+        detected = face_cascade.detectMultiScale(
+            gray[y:y + h, x:x + w], scaleFactor=1.1, minNeighbors=5, minSize=min_size
+        )
+        faces.extend((int(fx + x), int(fy + y), int(fw), int(fh)) for (fx, fy, fw, fh) in detected)
+    return faces
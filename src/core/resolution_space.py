@@ -0,0 +1,85 @@
+"""
+Resolution Space - Named frame resolutions and box transforms between them
+Lets capture, detection and redaction/encoding each run at the size they actually need
+"""
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Standard space names used by the live pipeline
+CAPTURE = 'capture'  # Native screen grab
+DETECTION = 'detection'  # OCR / pattern detection (needs enough pixels for text)
+FACE = 'face'  # Downscaled frame for face detection, tracking and tile routing
+OUTPUT = 'output'  # Redaction and encoder input
+
+
+def fit_size(size, bound) -> Tuple[int, int]:
+    """Largest even size with size's aspect ratio that fits inside bound (never upscales)"""
+    w, h = size
+    scale = min(1.0, bound[0] / w, bound[1] / h)
+    return max(2, int(w * scale) & ~1), max(2, int(h * scale) & ~1)
+
+
+class ResolutionSpace:
+    """A set of named (width, height) resolutions with box mapping and resizing between them
+
+    Boxes are always (x, y, w, h) in pixels of the named space. Mapping rounds outwards so a
+    redaction box never shrinks when it moves to a smaller space.
+    """
+
+    def __init__(self, **sizes: Tuple[int, int]):
+        self.sizes: Dict[str, Tuple[int, int]] = {}
+        for name, size in sizes.items():
+            self.set_size(name, size)
+
+    @classmethod
+    def for_pipeline(cls, capture_size, output_size, detection_size=None, face_scale: float = 0.5):
+        """Standard live-pipeline spaces; detection defaults to the output size"""
+        detection_size = tuple(detection_size or output_size)
+        face_size = (max(1, int(detection_size[0] * face_scale)), max(1, int(detection_size[1] * face_scale)))
+        return cls(capture=capture_size, detection=detection_size, face=face_size, output=output_size)
+
+    def set_size(self, name: str, size) -> None:
+        """Add or update a space"""
+        self.sizes[name] = (int(size[0]), int(size[1]))
+
+    def size(self, name: str) -> Tuple[int, int]:
+        return self.sizes[name]
+
+    def scale(self, src: str, dst: str) -> Tuple[float, float]:
+        """(sx, sy) factors taking src coordinates to dst coordinates"""
+        src_w, src_h = self.sizes[src]
+        dst_w, dst_h = self.sizes[dst]
+        return dst_w / src_w, dst_h / src_h
+
+    def map_boxes(self, boxes, src: str, dst: str) -> List[Tuple[int, int, int, int]]:
+        """Transform (x, y, w, h) boxes from src to dst space, rounding outwards"""
+        if src == dst:
+            return [tuple(int(v) for v in box) for box in boxes]
+
+        sx, sy = self.scale(src, dst)
+        mapped = []
+        for (x, y, w, h) in boxes:
+            x1, y1 = int(np.floor(x * sx)), int(np.floor(y * sy))
+            x2, y2 = int(np.ceil((x + w) * sx)), int(np.ceil((y + h) * sy))
+            mapped.append((x1, y1, x2 - x1, y2 - y1))
+        return mapped
+
+    def resize(self, frame: np.ndarray, dst: str, interpolation=cv2.INTER_AREA,
+               copy: bool = False, out: np.ndarray = None) -> np.ndarray:
+        """Resize frame to dst space
+
+        Returns frame itself when it already has the right size, unless copy=True. out is
+        an optional preallocated destination; OpenCV allocates a new one if it doesn't fit.
+        """
+        size = self.sizes[dst]
+        if (frame.shape[1], frame.shape[0]) == size:
+            return frame.copy() if copy else frame
+        return cv2.resize(frame, size, dst=out, interpolation=interpolation)
+
+    def needs_resize(self, src: str, dst: str) -> bool:
+        return self.sizes[src] != self.sizes[dst]
+
+    def describe(self) -> str:
+        """Short summary for logs, e.g. 'capture 2560x1440 | output 1280x720'"""
+        return " | ".join(f"{name} {w}x{h}" for name, (w, h) in self.sizes.items())
@@ -0,0 +1,224 @@
+"""
+Simulcast - One encode fanned out to several RTMP destinations
+The encoder writes MPEG-TS to a pipe; each destination gets its own FFmpeg forwarder (stream copy), queue and reconnect loop
+"""
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+RELAY_CHUNK = 188 * 64  # Whole TS packets per read
+RECONNECT_MIN = 1.0  # Seconds before the first reconnect attempt
+RECONNECT_MAX = 30.0  # Backoff ceiling
+HEALTHY_AFTER = 30.0  # A forwarder running this long resets the backoff
+
+# Destination states
+STATE_CONNECTING = 'connecting'
+STATE_LIVE = 'live'
+STATE_RECONNECTING = 'reconnecting'
+STATE_STOPPED = 'stopped'
+
+
+class Destination:
+    """One RTMP target: a stream-copy FFmpeg fed from its own bounded queue
+
+    The queue holds a few seconds of stream (buffer_bytes). A destination that can't keep up
+    (its upload is slower than the stream) overflows it and is reconnected instead of
+    slowing down the encoder or the other destinations. After a failure it retries with
+    exponential backoff; the data in between is not buffered - the stream is live.
+    """
+
+    def __init__(self, name: str, url: str, ffmpeg: str = 'ffmpeg', buffer_bytes: int = 4 * 1024 * 1024):
+        self.name = name
+        self.url = url
+        self.ffmpeg = ffmpeg
+        self.buffer_bytes = buffer_bytes
+
+        self.cond = threading.Condition()
+        self.chunks = deque()
+        self.queued_bytes = 0
+        self.running = False
+        self.thread = None
+        self.process = None
+
+        self.state = STATE_CONNECTING
+        self.backoff = RECONNECT_MIN
+        self.reconnects = 0
+        self.overflows = 0
+        self.bytes_sent = 0
+        self.last_error = None
+
+    def command(self):
+        return [
+            self.ffmpeg, '-hide_banner', '-loglevel', 'error',
+            '-f', 'mpegts', '-i', 'pipe:0',
+            '-c', 'copy', '-bsf:a', 'aac_adtstoasc',
+            '-f', 'flv', self.url,
+        ]
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def push(self, chunk: bytes):
+        """Queue a piece of the TS stream; never blocks"""
+        with self.cond:
+            if self.state != STATE_LIVE and self.state != STATE_CONNECTING:
+                return  # Down: live data is dropped until the forwarder is back
+            if self.queued_bytes + len(chunk) > self.buffer_bytes:
+                self.overflows += 1
+                self.chunks.clear()
+                self.queued_bytes = 0
+                self._kill("upload can't keep up with the stream")
+                return
+            self.chunks.append(chunk)
+            self.queued_bytes += len(chunk)
+            self.cond.notify()
+
+    def _kill(self, reason: str):
+        self.last_error = reason
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+
+    def _run(self):
+        while self.running:
+            started = time.monotonic()
+            try:
+                self.process = subprocess.Popen(self.command(), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                                stderr=subprocess.PIPE, bufsize=0)
+            except OSError as e:
+                self.last_error = str(e)
+                self.process = None
+            if self.process is not None:
+                self._forward()
+                self.process.wait()
+                error = self.process.stderr.read().decode('utf-8', errors='ignore').strip()
+                if error:
+                    self.last_error = error.splitlines()[-1]
+            if not self.running:
+                break
+
+            # Failed or dropped: back off, then try again from the live edge
+            if time.monotonic() - started >= HEALTHY_AFTER:
+                self.backoff = RECONNECT_MIN
+            with self.cond:
+                self.state = STATE_RECONNECTING
+                self.chunks.clear()
+                self.queued_bytes = 0
+            self.reconnects += 1
+            print(f"⚠️  [Simulcast] {self.name}: connection lost ({self.last_error}) - "
+                  f"retrying in {self.backoff:.0f} s")
+            deadline = time.monotonic() + self.backoff
+            while self.running and time.monotonic() < deadline:
+                time.sleep(0.1)
+            self.backoff = min(RECONNECT_MAX, self.backoff * 2)
+            with self.cond:
+                self.state = STATE_CONNECTING
+
+        with self.cond:
+            self.state = STATE_STOPPED
+
+    def _forward(self):
+        """Copy queued chunks into the forwarder until it dies or the relay stops"""
+        process = self.process
+        while True:
+            with self.cond:
+                while not self.chunks and self.running and process.poll() is None:
+                    self.cond.wait(0.5)
+                if not self.running or process.poll() is not None:
+                    break
+                chunk = self.chunks.popleft()
+                self.queued_bytes -= len(chunk)
+            try:
+                process.stdin.write(chunk)
+            except (BrokenPipeError, OSError):
+                break
+            if self.state != STATE_LIVE:
+                with self.cond:
+                    self.state = STATE_LIVE
+                print(f"📡 [Simulcast] {self.name}: {'reconnected' if self.reconnects else 'live'}")
+            self.bytes_sent += len(chunk)
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+    def stop(self, timeout: float = 5.0):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+
+    def describe(self) -> str:
+        text = f"{self.name} {self.state} | {self.bytes_sent / (1024 * 1024):.1f} MB"
+        if self.reconnects:
+            text += f" | {self.reconnects} reconnects"
+        if self.overflows:
+            text += f" | {self.overflows} overflows"
+        return text
+
+
+class SimulcastRelay:
+    """Reads the encoder's MPEG-TS output and hands every chunk to all destinations
+
+    MPEG-TS resynchronises on its own and x264 repeats SPS/PPS at each keyframe, so a
+    forwarder started mid-stream picks up at the next keyframe without any handshake.
+    """
+
+    def __init__(self, destinations: Dict[str, str], ffmpeg: str = 'ffmpeg', buffer_seconds: float = 4.0,
+                 kbps: int = 6000):
+        buffer_bytes = int(buffer_seconds * kbps * 1000 / 8) + RELAY_CHUNK * 4
+        self.destinations = [Destination(name, url, ffmpeg, buffer_bytes) for name, url in destinations.items()]
+        self.thread = None
+        self.source = None
+        self.bytes_in = 0
+
+    def start(self, source=None):
+        """Start the forwarders and, if given, pump source (the encoder's stdout) into them"""
+        for destination in self.destinations:
+            destination.start()
+        if source is not None:
+            self.attach(source)
+
+    def attach(self, source):
+        """Read from a new encoder process (after a restart); forwarders keep running"""
+        self.source = source
+        self.thread = threading.Thread(target=self._pump, args=(source,), daemon=True)
+        self.thread.start()
+
+    def _pump(self, source):
+        while True:
+            try:
+                chunk = source.read(RELAY_CHUNK)
+            except (OSError, ValueError):
+                break
+            if not chunk:
+                break
+            self.bytes_in += len(chunk)
+            for destination in self.destinations:
+                destination.push(chunk)
+
+    @property
+    def live_count(self) -> int:
+        return sum(1 for d in self.destinations if d.state == STATE_LIVE)
+
+    def stop(self, timeout: float = 5.0):
+        if self.thread:
+            self.thread.join(timeout=timeout)
+        for destination in self.destinations:
+            destination.stop(timeout)
+
+    def stats(self) -> str:
+        """One line per destination for logs"""
+        return " || ".join(d.describe() for d in self.destinations)
+
+    def destination(self, name: str) -> Optional[Destination]:
+        for destination in self.destinations:
+            if destination.name == name:
+                return destination
+        return None
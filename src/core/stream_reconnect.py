@@ -0,0 +1,308 @@
+"""
+Stream Reconnect - Restarts a live stream's encoder and output without stopping the pipeline
+Capture, detection and redaction keep running while FFmpeg reconnects; the last moment of video is buffered and sent first
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+from .ffmpeg_writer import EncoderError, FFmpegWriter, OVERFLOW_BLOCK
+
+RECONNECT_MIN = 0.5  # Seconds before the first reconnect attempt
+RECONNECT_MAX = 30.0  # Backoff ceiling
+HEALTHY_AFTER = 30.0  # A writer running this long resets the backoff
+MAX_DOWNTIME = 300.0  # Give up (and end the stream) after this long without an output
+
+BUFFER_SECONDS = 1.0  # Video kept while the output is down
+BUFFER_BYTES = 256 * 1024 * 1024  # ... but never more than this (1080p BGRA is 8 MB a frame)
+
+# Output states
+STATE_LIVE = 'live'
+STATE_RECONNECTING = 'reconnecting'
+STATE_FAILED = 'failed'
+STATE_CLOSED = 'closed'
+
+
+class ReconnectingWriter:
+    """Live-stream front end to FFmpegWriter that survives a dropped connection
+
+    write() normally goes straight to the current writer. When that writer fails (a broken
+    pipe, FFmpeg exiting on a network error) the caller isn't told: frames go into a short
+    buffer holding the latest buffer_seconds while a background thread opens a new writer
+    with exponential backoff. Once one is up, the buffered frames are written first and
+    writes go live again. The stream loop, and with it capture, OCR and the detector
+    caches, never stops; only after max_downtime without an output does write() raise.
+
+    open_writer() returns a started FFmpegWriter for the current settings. It is called
+    for the first encode, for every reconnect and by restart(), so it can pick up a new
+    ladder rung, a new file name or reattach a relay.
+    """
+
+    def __init__(self, open_writer: Callable[[], FFmpegWriter], fps: float,
+                 buffer_seconds: float = BUFFER_SECONDS, buffer_bytes: int = BUFFER_BYTES,
+                 max_downtime: float = MAX_DOWNTIME):
+        self.open_writer = open_writer
+        self.max_frames = max(1, int(fps * buffer_seconds))
+        self.buffer_bytes = buffer_bytes
+        self.max_downtime = max_downtime
+
+        self.lock = threading.Lock()
+        self.writer = None
+        self.state = STATE_CLOSED
+        self.thread = None
+        self.buffer = deque()  # (frame, copies), oldest first; frames are owned copies
+        self.buffered_bytes = 0
+
+        self.backoff = RECONNECT_MIN
+        self.live_since = 0.0
+        self.down_since = None
+        self.last_error = None
+        self.planned = False  # The current outage is a restart(), not a lost output
+
+        # Telemetry
+        self.restarts = 0
+        self.reconnects = 0
+        self.attempts = 0
+        self.downtime = 0.0
+        self.frames_buffered = 0
+        self.frames_lost = 0  # Copies that didn't fit the buffer or were left when closing
+
+    def start(self):
+        """Open the first writer; failing here (e.g. no FFmpeg) is an error, not a reconnect"""
+        self.writer = self.open_writer()
+        self.state = STATE_LIVE
+        self.live_since = time.monotonic()
+
+    @property
+    def connected(self) -> bool:
+        return self.state == STATE_LIVE
+
+    def skip(self, copies: int = 1) -> bool:
+        """FFmpegWriter.skip() while live; every frame is kept while reconnecting"""
+        return self.connected and self.writer.skip(copies)
+
+    def frame_buffer(self) -> Optional[np.ndarray]:
+        """The live writer's frame_buffer(), None while reconnecting (the frame gets buffered)"""
+        writer = self.writer if self.connected else None
+        return writer.frame_buffer() if writer is not None else None
+
+    def write(self, frame: np.ndarray, copies: int = 1, owned: bool = False) -> None:
+        """Queue a frame for the encoder, or buffer it while the output is down"""
+        with self.lock:
+            if self.state == STATE_FAILED:
+                raise EncoderError(f"Stream output down for {self.max_downtime:.0f} s: {self.last_error}")
+            writer = self.writer if self.state == STATE_LIVE else None
+            if writer is None:
+                self._buffer(frame if owned else frame.copy(), copies)
+                return
+        try:
+            writer.write(frame, copies, owned)
+        except EncoderError as e:
+            # write() raises before taking the frame, so it is still ours to buffer
+            self._lost(writer, e)
+            with self.lock:
+                self._buffer(frame if owned else frame.copy(), copies)
+
+    def _buffer(self, frame: np.ndarray, copies: int):
+        """Append under the lock; the oldest frames make room"""
+        while self.buffer and (len(self.buffer) >= self.max_frames
+                               or self.buffered_bytes + frame.nbytes > self.buffer_bytes):
+            old, old_copies = self.buffer.popleft()
+            self.buffered_bytes -= old.nbytes
+            self.frames_lost += old_copies
+        self.buffer.append((frame, copies))
+        self.buffered_bytes += frame.nbytes
+        self.frames_buffered += copies
+
+    def _lost(self, writer: FFmpegWriter, error: Exception):
+        """The live writer failed: switch to buffering and start reconnecting"""
+        now = time.monotonic()
+        with self.lock:
+            if self.writer is not writer or self.state != STATE_LIVE:
+                return  # Already handled
+            self.state = STATE_RECONNECTING
+            self.planned = False
+            self.down_since = now
+            self.last_error = error
+            if now - self.live_since >= HEALTHY_AFTER:
+                self.backoff = RECONNECT_MIN
+        print(f"⚠️  [Stream] Output lost ({error}) - capture and detection keep running, "
+              f"reconnecting in {self.backoff:.1f} s")
+        self.thread = threading.Thread(target=self._reconnect, args=(writer,), daemon=True)
+        self.thread.start()
+
+    def _discard(self, writer: Optional[FFmpegWriter]):
+        # FFmpeg may still be running (a dropped tee slave): give it time to finish a local copy
+        if writer is None:
+            return
+        try:
+            writer.close(timeout=5.0)
+        except Exception as e:
+            print(f"⚠️  [Stream] Closing failed writer: {e}")
+
+    def _reconnect(self, old: FFmpegWriter):
+        self._discard(old)
+        while self.state == STATE_RECONNECTING:
+            deadline = time.monotonic() + self.backoff
+            while self.state == STATE_RECONNECTING and time.monotonic() < deadline:
+                time.sleep(0.05)
+            if self.state != STATE_RECONNECTING:
+                return
+            self.backoff = min(RECONNECT_MAX, self.backoff * 2)
+            self.attempts += 1
+
+            try:
+                writer = self.open_writer()
+            except Exception as e:
+                writer = None
+                self.last_error = e
+            if writer is not None:
+                if self._flush(writer):
+                    return
+                self._discard(writer)
+
+            if time.monotonic() - self.down_since >= self.max_downtime:
+                with self.lock:
+                    if self.state == STATE_RECONNECTING:
+                        self.state = STATE_FAILED
+                print(f"❌ [Stream] Giving up after {self.max_downtime:.0f} s without an output ({self.last_error})")
+                return
+            print(f"⚠️  [Stream] Reconnect attempt {self.attempts} failed ({self.last_error}) - "
+                  f"retrying in {self.backoff:.1f} s")
+
+    def _flush(self, writer: FFmpegWriter) -> bool:
+        """Send the buffer through a fresh writer, then make it the live one
+
+        The stream loop keeps buffering meanwhile. Buffered frames wait for the encoder
+        instead of being dropped; if it can't drain the buffer within a few buffer lengths
+        (encoding barely at real time) the rest is dropped to get back to the live edge.
+        """
+        policy = writer.overflow_policy
+        writer.overflow_policy = OVERFLOW_BLOCK
+        give_up_at = time.monotonic() + max(2.0, 3 * self.max_frames / writer.fps)
+        sent = 0
+        try:
+            while True:
+                with self.lock:
+                    if self.state != STATE_RECONNECTING:
+                        return False  # Closed meanwhile
+                    if self.buffer and time.monotonic() > give_up_at:
+                        self.frames_lost += sum(copies for _, copies in self.buffer)
+                        self.buffer.clear()
+                        self.buffered_bytes = 0
+                    if not self.buffer:
+                        writer.overflow_policy = policy
+                        now = time.monotonic()
+                        self.writer = writer
+                        self.state = STATE_LIVE
+                        self.live_since = now
+                        if self.planned:
+                            self.restarts += 1
+                            print(f"✅ [Stream] Restarted in {now - self.down_since:.1f} s, "
+                                  f"{sent} buffered frames sent")
+                        else:
+                            self.reconnects += 1
+                            self.downtime += now - self.down_since
+                            print(f"✅ [Stream] Reconnected after {now - self.down_since:.1f} s, "
+                                  f"{sent} buffered frames sent")
+                        self.planned = False
+                        self.down_since = None
+                        return True
+                    frame, copies = self.buffer.popleft()
+                    self.buffered_bytes -= frame.nbytes
+                writer.write(frame, copies, owned=True)
+                sent += 1
+        except EncoderError as e:
+            self.last_error = e
+            return False
+
+    def restart(self):
+        """Planned restart with open_writer()'s current settings (e.g. a new ladder rung)
+
+        Returns at once: the old encode is flushed and the new one opened on a background
+        thread while write() buffers, exactly as during a reconnect, so capture and
+        redaction don't wait for FFmpeg or the RTMP handshake. If the new writer can't be
+        opened this turns into a normal reconnect. While reconnecting there is nothing to
+        restart: the next attempt uses the new settings anyway.
+        """
+        with self.lock:
+            if self.state != STATE_LIVE:
+                return
+            writer = self.writer
+            self.state = STATE_RECONNECTING
+            self.planned = True
+            self.down_since = time.monotonic()
+        self.thread = threading.Thread(target=self._restart, args=(writer,), daemon=True)
+        self.thread.start()
+
+    def _restart(self, old: FFmpegWriter):
+        self._discard(old)
+        try:
+            writer = self.open_writer()
+        except Exception as e:
+            writer = None
+            self.last_error = e
+        if writer is not None:
+            if self._flush(writer):
+                return
+            self._discard(writer)
+        if self.state != STATE_RECONNECTING:
+            return  # Closed meanwhile
+        self.planned = False
+        print(f"⚠️  [Stream] Restart failed ({self.last_error}) - reconnecting in {self.backoff:.1f} s")
+        self._reconnect(None)
+
+    def close(self, timeout: float = 30.0) -> Optional[int]:
+        """Stop reconnecting, flush the live writer and return FFmpeg's exit code"""
+        with self.lock:
+            live = self.state == STATE_LIVE
+            self.state = STATE_CLOSED
+            if self.buffer:
+                self.frames_lost += sum(copies for _, copies in self.buffer)
+                self.buffer.clear()
+                self.buffered_bytes = 0
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+        if not live or self.writer is None:
+            return None
+        return self.writer.close(timeout=timeout)
+
+    def telemetry(self) -> dict:
+        """Current writer's telemetry plus reconnect counters"""
+        telemetry = self.writer.telemetry() if self.writer is not None else {}
+        telemetry.update({
+            'connected': self.connected,
+            'reconnects': self.reconnects,
+            'restarts': self.restarts,
+            'downtime_s': self.downtime,
+            'frames_lost': self.frames_lost,
+        })
+        return telemetry
+
+    @property
+    def queue_size(self) -> int:
+        return self.writer.queue_size
+
+    @property
+    def output_size(self) -> int:
+        return self.writer.output_size if self.writer is not None else 0
+
+    def stats(self) -> str:
+        """Writer stats, or the reconnect state while the output is down"""
+        with self.lock:
+            state, down_since, buffered = self.state, self.down_since, len(self.buffer)
+        if state == STATE_RECONNECTING and down_since is not None and self.planned:
+            text = f"restarting for {time.monotonic() - down_since:.1f} s | {buffered} frames buffered"
+        elif state == STATE_RECONNECTING and down_since is not None:
+            text = (f"reconnecting for {time.monotonic() - down_since:.1f} s (attempt {self.attempts + 1}) | "
+                    f"{buffered} frames buffered")
+        else:
+            text = self.writer.stats() if self.writer is not None else state
+        if self.reconnects:
+            text += f" | {self.reconnects} reconnects, down {self.downtime:.1f} s"
+        if self.frames_lost:
+            text += f" | {self.frames_lost} frames lost"
+        return text
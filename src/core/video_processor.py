@@ -8,6 +8,12 @@ import time
 import re
 from pathlib import Path
 from datetime import datetime
+from .face_tracker import FaceTracker
+from .region_classifier import RegionClassifier, detect_faces_in_regions
+from .detector_router import DetectorRouter, crop_to_regions
+from .blur_engine import BlurEngine
+from .encoder_profiles import DEFAULT_PROFILES, PROFILE_QUALITY
+from .ffmpeg_writer import DEFAULT_CRF, open_file_writer
 try:
     import pytesseract
     from presidio_analyzer import AnalyzerEngine
@@ -22,7 +28,14 @@ except ImportError:
 class VideoProcessor:
     """Process videos with face blur and sensitive data blur"""
     
-    def __init__(self):
+    def __init__(self, blur_mode='gaussian', encoder_profile=None, crf=DEFAULT_CRF):
+        # Shared blur engine (offline processing defaults to the best-looking mode)
+        self.blur_engine = BlurEngine(mode=blur_mode)
+        
+        # Output encoder: not real time, so the quality profile unless told otherwise
+        self.encoder_profile = encoder_profile or DEFAULT_PROFILES[PROFILE_QUALITY]
+        self.crf = crf
+        
         # Face detection
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
@@ -83,6 +96,15 @@ class VideoProcessor:
         self.api_label_re = re.compile(r'(api[_\-\s]?key|[a-z0-9\-_]*secret\b)', re.I)
         self.key_candidate_re = re.compile(r'^[A-Za-z0-9_\-]{16,}$')
         
+        # Tracker moves face boxes between the FACE_DETECT_EVERY detections
+        self.face_tracker = FaceTracker(detect_every=self.FACE_DETECT_EVERY)
+        self.region_classifier = RegionClassifier()
+        # Content-aware routing: OCR to text tiles, faces to photographic tiles
+        self.detector_router = DetectorRouter(self.region_classifier, scale=self.SCALE)
+        self.small_frame = None
+        self.gray_small = None
+        self.routing_plan = None
+        
         # Cache
         self.faces_cache = []
         self.sensitive_boxes = []
@@ -109,25 +131,40 @@ class VideoProcessor:
         if self.status_callback:
             self.status_callback(status_text)
     
+    def prepare_frame(self, frame):
+        """Build the shared downscaled frame and update motion history (once per frame)"""
+        self.small_frame = cv2.resize(frame, None, fx=self.SCALE, fy=self.SCALE)
+        self.gray_small = cv2.cvtColor(self.small_frame, cv2.COLOR_BGR2GRAY)
+        self.region_classifier.observe(self.gray_small)
+        self.routing_plan = None
+    
+    def get_routing_plan(self):
+        """Classify tiles of the current frame (lazily, at most once per frame)"""
+        if self.routing_plan is None:
+            tracked_boxes = [t.box for t in self.face_tracker.tracks]
+            self.routing_plan = self.detector_router.plan(
+                self.small_frame, self.gray_small, tracked_boxes=tracked_boxes
+            )
+        return self.routing_plan
+    
     def detect_faces(self, frame, frame_idx):
-        """Detect faces in frame and update cache"""
-        if frame_idx % self.FACE_DETECT_EVERY == 0:
-            small = cv2.resize(frame, None, fx=self.SCALE, fy=self.SCALE)
-            gray_small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
-            det = self.face_cascade.detectMultiScale(gray_small, 1.1, 5, minSize=(24, 24))
-            self.faces_cache = [
-                (int(x / self.SCALE), int(y / self.SCALE), 
-                 int(w / self.SCALE), int(h / self.SCALE))
-                for (x, y, w, h) in det
-            ]
+        """Track faces on every frame and re-detect on schedule or when tracking degrades"""
+        if self.gray_small is None:
+            self.prepare_frame(frame)
+        gray_small = self.gray_small
+        self.face_tracker.update(gray_small)
+        
+        if self.face_tracker.needs_detection():
+            # Skip static UI: only scan photographic / moving regions and current tracks
+            plan = self.get_routing_plan()
+            det = detect_faces_in_regions(self.face_cascade, gray_small, plan.face_regions)
+            self.face_tracker.reset(gray_small, det)
+        
+        self.faces_cache = self.face_tracker.get_boxes(self.SCALE)
     
     def apply_face_blur(self, frame):
         """Apply blur to detected faces"""
-        for (x, y, w, h) in self.faces_cache:
-            roi = frame[y:y + h, x:x + w]
-            if roi.size:
-                frame[y:y + h, x:x + w] = cv2.GaussianBlur(roi, self.BLUR_KSIZE, self.BLUR_SIGMA)
-        return frame
+        return self.blur_engine.redact(frame, self.faces_cache, self.BLUR_KSIZE, self.BLUR_SIGMA)
     
     def detect_sensitive_data(self, frame, frame_idx):
         """Detect sensitive data using OCR and Presidio"""
@@ -139,14 +176,23 @@ class VideoProcessor:
             self.sensitive_boxes.clear()
             
             try:
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                # Route: OCR every non-empty tile; a blank plan falls back to the full frame
+                if self.gray_small is None:
+                    self.prepare_frame(frame)
+                plan = self.get_routing_plan()
+                text_regions = plan.frame_regions(plan.text_regions)
+                if text_regions:
+                    text_frame, (ox, oy) = crop_to_regions(frame, text_regions)
+                else:
+                    text_frame, (ox, oy) = frame, (0, 0)
+                gray = cv2.cvtColor(text_frame, cv2.COLOR_BGR2GRAY)
                 data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
                 n = len(data["text"])
                 
-                # Extract words with bounding boxes
+                # Extract words with bounding boxes (back in full-frame coordinates)
                 words = [
                     (data["text"][i].strip(),
-                     (data["left"][i], data["top"][i], data["width"][i], data["height"][i]))
+                     (data["left"][i] + ox, data["top"][i] + oy, data["width"][i], data["height"][i]))
                     for i in range(n) if data["text"][i].strip()
                 ]
                 
@@ -192,11 +238,18 @@ class VideoProcessor:
     
     def apply_sensitive_blur(self, frame):
         """Apply blur to sensitive data regions"""
-        for (x, y, w, h) in self.api_blur_boxes + self.sensitive_boxes:
-            roi = frame[y:y + h, x:x + w]
-            if roi.size:
-                frame[y:y + h, x:x + w] = cv2.GaussianBlur(roi, self.BLUR_KSIZE, self.BLUR_SIGMA)
-        return frame
+        return self.blur_engine.redact(
+            frame, self.api_blur_boxes + self.sensitive_boxes, self.BLUR_KSIZE, self.BLUR_SIGMA
+        )
+    
+    def redact_frame(self, frame, enable_face_blur=True, enable_sensitive_blur=True):
+        """Blur faces and sensitive data together in a single mask pass"""
+        regions = []
+        if enable_face_blur:
+            regions += self.faces_cache
+        if enable_sensitive_blur:
+            regions += self.api_blur_boxes + self.sensitive_boxes
+        return self.blur_engine.redact(frame, regions, self.BLUR_KSIZE, self.BLUR_SIGMA)
     
     def process_video(self, input_video_path, output_dir, 
                      enable_face_blur=True, enable_sensitive_blur=True):
@@ -213,6 +266,11 @@ class VideoProcessor:
             Path to processed video file or None if failed
         """
         self.is_processing = True
+        self.face_tracker.clear()
+        self.region_classifier.reset()
+        self.small_frame = None
+        self.gray_small = None
+        self.routing_plan = None
         self.faces_cache = []
         self.sensitive_boxes = []
         self.api_blur_boxes = []
@@ -247,12 +305,10 @@ class VideoProcessor:
             print(f"📹 Resolution: {width}x{height} @ {fps:.1f}fps")
             print(f"📹 Total frames: {total_frames}")
             
-            # Create video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(str(output_file), fourcc, fps, (width, height))
-            
-            if not out.isOpened():
-                raise Exception("Failed to create output video file")
+            # H.264 through FFmpeg (the encoder thread overlaps with detection and blurring);
+            # OpenCV's mp4v writer when FFmpeg isn't installed
+            out = open_file_writer(output_file, (width, height), fps, crf=self.crf, profile=self.encoder_profile)
+            out.start()
             
             # Process frames
             frame_idx = 0
@@ -269,18 +325,24 @@ class VideoProcessor:
                 frame_idx += 1
                 frame_start = time.time()
                 
+                # Shared downscaled frame for tracking, motion history and detector routing
+                if enable_face_blur or enable_sensitive_blur:
+                    self.prepare_frame(frame)
+                
                 # Face detection
                 if enable_face_blur:
                     self.detect_faces(frame, frame_idx)
-                    frame = self.apply_face_blur(frame)
                 
                 # Sensitive data detection
                 if enable_sensitive_blur:
                     self.detect_sensitive_data(frame, frame_idx)
-                    frame = self.apply_sensitive_blur(frame)
                 
-                # Write processed frame
-                out.write(frame)
+                # Blur all detected regions in one pass
+                if enable_face_blur or enable_sensitive_blur:
+                    frame = self.redact_frame(frame, enable_face_blur, enable_sensitive_blur)
+                
+                # Write processed frame (each decoded frame is a new array, handed over as is)
+                out.write(frame, owned=True)
                 
                 # Update progress
                 self._update_progress(frame_idx, total_frames)
@@ -305,7 +367,7 @@ class VideoProcessor:
             
             # Release resources
             cap.release()
-            out.release()
+            out.close()
             
             # Final statistics
             total_time = time.time() - t_start
@@ -349,7 +411,7 @@ class VideoProcessor:
             if cap is not None:
                 cap.release()
             if out is not None:
-                out.release()
+                out.close()
             
             self.is_processing = False
     
@@ -0,0 +1,160 @@
+"""
+Latency Harness - Glass-to-glass latency of the live stream pipeline
+Paints timestamp barcodes on an Xvfb screen, runs ScreenRecorder.stream_screen against a local
+viewer for each output mode (RTMP, SRT, UDP, HLS) and reports the end-to-end latency
+distribution with a per-stage breakdown.
+
+Run from src/ (needs Xvfb and FFmpeg):
+    python latency_harness.py [--seconds 30] [--warmup 5] [--size 1280x720] [--backend mss] [--redact]
+                              [--modes rtmp,srt,udp,hls]
+
+Without a display, python -m core.latency_probe measures the same path from the encoder queue on.
+"""
+import argparse
+import sys
+import tempfile
+import threading
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from core.capture_backend import BACKEND_MSS, CAPTURE_BACKENDS, _start_xvfb
+from core.capture_target import CaptureTarget
+from core.ffmpeg_writer import LIVE_OUTPUT_LABELS, LIVE_RTMP
+from core.latency_probe import BarcodeViewer, LatencyProbe, barcode_bits, barcode_cells, now_ms
+
+
+class BarcodePainter(QWidget):
+    """Full-screen window repainting the current barcode-clock time as fast as it can"""
+
+    def __init__(self, size):
+        super().__init__(None, Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setGeometry(0, 0, size[0], size[1])
+        self.label_font = QFont("Monospace", 28)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update)
+        self.timer.start(1)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(40, 40, 48))
+        value = now_ms()
+        for (x, y, w, h), bit in zip(barcode_cells(self.width()), barcode_bits(value)):
+            painter.fillRect(x, y, w, h, Qt.white if bit else Qt.black)
+        # Human-readable copy of the timestamp, and some text for the OCR path when redacting
+        painter.setPen(Qt.white)
+        painter.setFont(self.label_font)
+        painter.drawText(40, self.height() // 2, f"t = {value} ms")
+        painter.drawText(40, self.height() // 2 + 60, "Card 4111 1111 1111 1111 | alice@example.com")
+        painter.end()
+
+
+def parse_size(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def parse_modes(text):
+    modes = [mode.strip() for mode in text.split(',') if mode.strip()]
+    for mode in modes:
+        if mode not in LIVE_OUTPUT_LABELS:
+            raise argparse.ArgumentTypeError(f"unknown mode {mode!r} (choose from {', '.join(LIVE_OUTPUT_LABELS)})")
+    return modes
+
+
+def measure(app, recorder, mode, args):
+    """Stream through one output mode to its stand-in receiver; returns (probe, frames viewed)"""
+    probe = LatencyProbe()
+    viewer = BarcodeViewer(probe, args.size, port=args.port, mode=mode, directory=tempfile.mkdtemp(prefix='hls_'))
+    viewer.start()
+
+    recorder.latency_probe = probe
+    recorder.live_output_mode = mode
+    if mode == LIVE_RTMP:
+        recorder.rtmp_urls['youtube'] = viewer.url.rsplit('/', 1)[0] + '/'
+        recorder.stream_key = viewer.url.rsplit('/', 1)[1]
+    else:
+        recorder.live_output_target = viewer.url
+
+    # What start_streaming() does after its stream key dialog
+    recorder.streaming = True
+    if recorder.sensitive_blur_enabled:
+        recorder.start_ocr_worker()
+    if recorder.blur_enabled:
+        recorder.start_face_worker()
+    stream_thread = threading.Thread(target=recorder.stream_screen, daemon=True)
+    stream_thread.start()
+
+    print(f"⏱️  [Latency Harness] {LIVE_OUTPUT_LABELS[mode]}: warming up {args.warmup:.0f} s, "
+          f"then measuring {args.seconds:.0f} s")
+    QTimer.singleShot(int(args.warmup * 1000), probe.reset)
+    QTimer.singleShot(int((args.warmup + args.seconds) * 1000), app.quit)
+    app.exec_()
+
+    recorder.streaming = False
+    stream_thread.join(timeout=10.0)
+    app.processEvents()  # Deliver streaming_stopped now, not in the next mode's event loop
+    recorder.stop_ocr_worker()
+    recorder.stop_face_worker()
+    viewer.stop()
+    return probe, viewer.frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Glass-to-glass latency of the live stream pipeline")
+    parser.add_argument('--seconds', type=float, default=30.0, help="measured streaming time")
+    parser.add_argument('--warmup', type=float, default=5.0, help="streaming time discarded before measuring")
+    parser.add_argument('--size', type=parse_size, default=(1280, 720), help="Xvfb screen and stream size")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--backend', choices=list(CAPTURE_BACKENDS), default=BACKEND_MSS)
+    parser.add_argument('--redact', action='store_true', help="run with face and confidential-data blur on")
+    parser.add_argument('--modes', type=parse_modes, default=[LIVE_RTMP],
+                        help="comma-separated output modes to measure one after another (rtmp, srt, udp, hls)")
+    parser.add_argument('--port', type=int, default=19360, help="local receiver port (RTMP, SRT, UDP)")
+    parser.add_argument('--no-xvfb', action='store_true', help="use the current display instead of Xvfb")
+    args = parser.parse_args()
+
+    xvfb = None if args.no_xvfb else _start_xvfb(args.size)
+
+    app = QApplication(sys.argv)
+    painter = BarcodePainter(args.size)
+    painter.show()
+
+    # Imported after QApplication: the recorder builds widgets on construction
+    from main import ScreenRecorder
+    recorder = ScreenRecorder()
+    recorder.capture_target = CaptureTarget.monitor(1)
+    recorder.capture_backend = args.backend
+    recorder.current_fps = args.fps
+    recorder.stream_resolution = args.size
+    recorder.webcam_enabled = False
+    recorder.adaptive_bitrate = False  # A ladder switch would show up as an outlier, not pipeline latency
+    recorder.stream_record_local = False
+    recorder.blur_enabled = args.redact
+    recorder.sensitive_blur_enabled = args.redact
+    recorder.streaming_platform = 'youtube'
+
+    results = [(mode, *measure(app, recorder, mode, args)) for mode in args.modes]
+    if xvfb is not None:
+        xvfb.terminate()
+
+    for mode, probe, frames in results:
+        print(f"\n📊 Glass-to-glass latency (ms), {LIVE_OUTPUT_LABELS[mode]}, {args.size[0]}x{args.size[1]} @ "
+              f"{args.fps} fps, {args.backend} capture{', redaction on' if args.redact else ''}, {frames} frames viewed")
+        print(probe.summary())
+
+    if len(results) > 1:
+        print(f"\n📊 Glass to glass by output mode (ms)")
+        print(f"{'mode':>30} | {'n':>5} | {'p50':>5} | {'p95':>5} | {'p99':>5}")
+        for mode, probe, _ in results:
+            end_to_end = probe.report().get('end_to_end')
+            if end_to_end is None:
+                print(f"{LIVE_OUTPUT_LABELS[mode]:>30} | no readable frames")
+                continue
+            print(f"{LIVE_OUTPUT_LABELS[mode]:>30} | {end_to_end['count']:>5} | {end_to_end['p50']:>5} | "
+                  f"{end_to_end['p95']:>5} | {end_to_end['p99']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,13 @@ Clean, professional design with proper spacing and separation of concerns
 import sys
 import threading
 import time
-import subprocess
 from datetime import datetime
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QScrollArea, QFrame, QPushButton, QLabel, QInputDialog, QDialog, QLineEdit
+    QScrollArea, QFrame, QPushButton, QLabel, QInputDialog, QDialog, QLineEdit, QCheckBox, QComboBox
 )
-from PyQt5.QtGui import QFont, QPalette, QColor
+from PyQt5.QtGui import QFont, QPalette, QColor, QImage, QPixmap
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
 import numpy as np
 import cv2
@@ -26,71 +25,102 @@ from components.settings_window import SettingsWindow
 from components.video_gallery import VideoGallery
 from styles.modern_styles import get_main_window_style, COLORS, SPACING, FONTS
 from core.confidential_detector import ConfidentialDataDetector
+from core.face_tracker import FaceTracker
+from core.region_classifier import RegionClassifier, detect_faces_in_regions
+from core.detector_router import DetectorRouter
+from core.blur_engine import BlurEngine
+from core.resolution_space import ResolutionSpace, fit_size, CAPTURE, DETECTION, FACE, OUTPUT
+from core.capture_target import CaptureTarget, TARGET_MONITOR, TARGET_ALL_MONITORS
+from core.multi_monitor import MultiMonitorCapture
+from core.capture_backend import BACKEND_MSS, create_backend
+from core.frame_pacer import FramePacer
+from core.adaptive_bitrate import AdaptiveBitrateController, build_ladder
+from core.ffmpeg_writer import (
+    FFmpegWriter, EncoderOutput, EncoderError, DEFAULT_CRF, OVERFLOW_DROP, ffmpeg_available, open_file_writer,
+    LIVE_RTMP, LIVE_SRT, LIVE_UDP, LIVE_HLS, LIVE_OUTPUT_LABELS
+)
+from core.encoder_profiles import (
+    DEFAULT_PROFILES, PROFILE_LOW_LATENCY, PROFILE_BALANCED, PROFILE_QUALITY,
+    best_hardware_encoder, probe_hardware_encoders, profiles_from_benchmark
+)
+from core.simulcast import SimulcastRelay
+from core.stream_reconnect import ReconnectingWriter
+from core.roi_encoding import RoiStabilizer, snap_to_macroblocks
+from core.capture import CaptureThread, FrameRing, DROP_OLDEST
+from core.frame_pipe import to_bgr
+from core.preview_tap import PreviewTap
+
+
+def stream_dialog_style():
+    """Dark theme shared by the stream dialogs"""
+    return f"""
+        QDialog {{
+            background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                stop:0 {COLORS['bg_primary']}, 
+                stop:1 #0f1419);
+            border-radius: 12px;
+        }}
+        QLabel {{
+            color: white;
+            font-size: 14px;
+            padding: 5px;
+        }}
+        QLineEdit {{
+            background-color: #1a2332;
+            color: white;
+            border: 2px solid {COLORS['border_primary']};
+            border-radius: 8px;
+            padding: 12px 16px;
+            font-size: 14px;
+            font-family: 'Segoe UI', Arial;
+            selection-background-color: {COLORS['primary']};
+        }}
+        QLineEdit:focus {{
+            border: 2px solid {COLORS['primary']};
+            background-color: #1f2937;
+        }}
+        QPushButton {{
+            background-color: {COLORS['primary']};
+            color: white;
+            border: none;
+            border-radius: 10px;
+            padding: 14px 36px;
+            font-size: 15px;
+            font-weight: bold;
+            min-width: 140px;
+        }}
+        QPushButton:hover {{
+            background-color: {COLORS['primary_dark']};
+            transform: scale(1.02);
+        }}
+        QPushButton:pressed {{
+            background-color: #4338ca;
+        }}
+        QPushButton#cancelButton {{
+            background-color: #374151;
+        }}
+        QPushButton#cancelButton:hover {{
+            background-color: #4b5563;
+        }}
+        QPushButton#cancelButton:pressed {{
+            background-color: #1f2937;
+        }}
+    """
 
 
 class StyledStreamKeyDialog(QDialog):
     """Custom styled dialog for stream key input"""
-    def __init__(self, parent, title, platform_icon, platform_name):
+    def __init__(self, parent, title, platform_icon, platform_name, other_platforms=None):
         super().__init__(parent)
         self.stream_key = None
+        self.other_platforms = other_platforms or {}  # platform -> (icon, name) offered for simulcast
+        self.extra_keys = {}
         self.setWindowTitle(title)
-        self.setFixedSize(600, 350)
+        self.setFixedSize(600, 400 + 100 * len(self.other_platforms))
         self.setModal(True)
         
         # Set dark theme with better styling
-        self.setStyleSheet(f"""
-            QDialog {{
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 {COLORS['bg_primary']}, 
-                    stop:1 #0f1419);
-                border-radius: 12px;
-            }}
-            QLabel {{
-                color: white;
-                font-size: 14px;
-                padding: 5px;
-            }}
-            QLineEdit {{
-                background-color: #1a2332;
-                color: white;
-                border: 2px solid {COLORS['border_primary']};
-                border-radius: 8px;
-                padding: 12px 16px;
-                font-size: 14px;
-                font-family: 'Segoe UI', Arial;
-                selection-background-color: {COLORS['primary']};
-            }}
-            QLineEdit:focus {{
-                border: 2px solid {COLORS['primary']};
-                background-color: #1f2937;
-            }}
-            QPushButton {{
-                background-color: {COLORS['primary']};
-                color: white;
-                border: none;
-                border-radius: 10px;
-                padding: 14px 36px;
-                font-size: 15px;
-                font-weight: bold;
-                min-width: 140px;
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['primary_dark']};
-                transform: scale(1.02);
-            }}
-            QPushButton:pressed {{
-                background-color: #4338ca;
-            }}
-            QPushButton#cancelButton {{
-                background-color: #374151;
-            }}
-            QPushButton#cancelButton:hover {{
-                background-color: #4b5563;
-            }}
-            QPushButton#cancelButton:pressed {{
-                background-color: #1f2937;
-            }}
-        """)
+        self.setStyleSheet(stream_dialog_style())
         
         # Main layout
         layout = QVBoxLayout()
@@ -126,6 +156,28 @@ class StyledStreamKeyDialog(QDialog):
         show_key_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(show_key_label)
         
+        # Local copy from the same encode (tee muxer), no second pipeline
+        self.record_checkbox = QCheckBox("💾 Also save a local recording")
+        self.record_checkbox.setFont(QFont(FONTS['family_primary'], 13))
+        self.record_checkbox.setStyleSheet("color: white; font-size: 14px;")
+        layout.addWidget(self.record_checkbox, alignment=Qt.AlignCenter)
+        
+        # Simulcast: same encode, one extra forwarder per platform
+        self.simulcast_rows = {}
+        for platform, (icon, name) in self.other_platforms.items():
+            checkbox = QCheckBox(f"{icon} Also stream to {name}")
+            checkbox.setFont(QFont(FONTS['family_primary'], 13))
+            checkbox.setStyleSheet("color: white; font-size: 14px;")
+            key_input = QLineEdit()
+            key_input.setPlaceholderText(f"{name} stream key...")
+            key_input.setFont(QFont(FONTS['family_primary'], 13))
+            key_input.setEchoMode(QLineEdit.Password)
+            key_input.setEnabled(False)
+            checkbox.toggled.connect(key_input.setEnabled)
+            layout.addWidget(checkbox)
+            layout.addWidget(key_input)
+            self.simulcast_rows[platform] = (checkbox, key_input)
+        
         layout.addSpacing(10)
         
         # Buttons
@@ -162,8 +214,18 @@ class StyledStreamKeyDialog(QDialog):
     def accept_key(self):
         """Accept the stream key if not empty"""
         key = self.key_input.text().strip()
+        extra_keys = {}
+        for platform, (checkbox, key_input) in self.simulcast_rows.items():
+            if checkbox.isChecked():
+                extra_key = key_input.text().strip()
+                if not extra_key:
+                    key_input.setPlaceholderText("⚠️ Stream key is required!")
+                    key_input.setStyleSheet("border: 2px solid #ef4444;")
+                    return
+                extra_keys[platform] = extra_key
         if key:
             self.stream_key = key
+            self.extra_keys = extra_keys
             self.accept()
         else:
             self.key_input.setStyleSheet("""
@@ -181,6 +243,99 @@ class StyledStreamKeyDialog(QDialog):
     def get_key(self):
         """Return the entered stream key"""
         return self.stream_key
+    
+    def record_locally(self):
+        """Whether the stream should also be saved to a local file"""
+        return self.record_checkbox.isChecked()
+    
+    def extra_destinations(self):
+        """Other platforms to simulcast to: {platform: stream key}"""
+        return dict(self.extra_keys)
+
+
+class LowLatencyOutputDialog(QDialog):
+    """Transport and target for a direct low-latency stream (SRT, UDP or local HLS)"""
+    def __init__(self, parent, targets, mode=LIVE_SRT):
+        super().__init__(parent)
+        self.targets = dict(targets)  # mode -> last used URL / directory
+        self.setWindowTitle("Low-Latency Output")
+        self.setFixedSize(600, 380)
+        self.setModal(True)
+        self.setStyleSheet(stream_dialog_style())
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(20)
+        
+        title_label = QLabel("⚡  Low-Latency Output")
+        title_label.setFont(QFont(FONTS['family_primary'], 24, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        title_label.setStyleSheet("color: white; font-size: 26px; padding: 15px;")
+        layout.addWidget(title_label)
+        
+        self.mode_combo = QComboBox()
+        self.mode_combo.setFont(QFont(FONTS['family_primary'], 13))
+        self.mode_combo.setMinimumHeight(44)
+        for live_mode in (LIVE_SRT, LIVE_UDP, LIVE_HLS):
+            self.mode_combo.addItem(LIVE_OUTPUT_LABELS[live_mode], live_mode)
+        layout.addWidget(self.mode_combo)
+        
+        self.target_input = QLineEdit()
+        self.target_input.setFont(QFont(FONTS['family_primary'], 13))
+        self.target_input.setMinimumHeight(50)
+        layout.addWidget(self.target_input)
+        
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        self.mode_combo.setCurrentIndex(max(0, self.mode_combo.findData(mode)))
+        self.on_mode_changed()
+        
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setObjectName("cancelButton")
+        cancel_btn.setFont(QFont(FONTS['family_primary'], 13, QFont.Bold))
+        cancel_btn.setMinimumHeight(50)
+        cancel_btn.clicked.connect(self.reject)
+        cancel_btn.setCursor(Qt.PointingHandCursor)
+        
+        ok_btn = QPushButton("🚀 Start Stream")
+        ok_btn.setFont(QFont(FONTS['family_primary'], 13, QFont.Bold))
+        ok_btn.setMinimumHeight(50)
+        ok_btn.clicked.connect(self.accept_target)
+        ok_btn.setCursor(Qt.PointingHandCursor)
+        ok_btn.setDefault(True)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(cancel_btn)
+        button_layout.addWidget(ok_btn)
+        button_layout.addStretch()
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def on_mode_changed(self):
+        """Show the last target used with the selected transport"""
+        live_mode = self.mode_combo.currentData()
+        self.target_input.setText(str(self.targets.get(live_mode, '')))
+        self.target_input.setPlaceholderText(
+            "Output folder for the playlist..." if live_mode == LIVE_HLS else "srt:// or udp:// host:port...")
+    
+    def accept_target(self):
+        """Accept if a target was entered"""
+        target = self.target_input.text().strip()
+        if not target:
+            self.target_input.setPlaceholderText("⚠️ Target is required!")
+            self.target_input.setStyleSheet("border: 2px solid #ef4444;")
+            return
+        self.targets[self.mode_combo.currentData()] = target
+        self.accept()
+    
+    def get_mode(self):
+        return self.mode_combo.currentData()
+    
+    def get_target(self):
+        return self.targets[self.get_mode()]
 
 
 class RecorderSignals(QObject):
@@ -191,6 +346,7 @@ class RecorderSignals(QObject):
     streaming_started = pyqtSignal()
     streaming_stopped = pyqtSignal()
     streaming_error = pyqtSignal(str)
+    preview_frame_ready = pyqtSignal(QImage, QImage)  # (preview window image, panel image)
 
 
 class LivePreviewWindow(QMainWindow):
@@ -234,6 +390,13 @@ class LivePreviewWindow(QMainWindow):
             self.preview_label.setPixmap(scaled_pixmap)
         except Exception as e:
             pass
+    
+    def set_image(self, image):
+        """Show a QImage prepared off the GUI thread"""
+        try:
+            self.preview_label.setPixmap(QPixmap.fromImage(image))
+        except Exception as e:
+            pass
 
 
 class ScreenRecorder(QMainWindow):
@@ -245,16 +408,34 @@ class ScreenRecorder(QMainWindow):
         # Recording state
         self.recording = False
         self.recording_thread = None
-        self.out = None
+        self.out = None  # FFmpegWriter (OpenCVFileWriter without FFmpeg) while recording
+        self.recording_crf = DEFAULT_CRF
+        
+        # Encoder profiles (x264 settings, re-tuned by the settings benchmark) and GPU encoding
+        self.encoder_profiles = dict(DEFAULT_PROFILES)
+        self.recording_profile = PROFILE_BALANCED
+        self.stream_profile = PROFILE_LOW_LATENCY
+        self.stream_intra_refresh = False
+        self.hardware_encoding = False  # Opt-in: GPU encoders are probed, not benchmarked
         self.frame_count = 0
         self.start_time = None
         
         # Streaming state
         self.streaming = False
         self.streaming_thread = None
-        self.ffmpeg_process = None
+        self.stream_writer = None  # ReconnectingWriter feeding RTMP (and the local copy in combined mode)
+        self.stream_record_local = False
+        self.stream_overflow_policy = OVERFLOW_DROP  # Encoder falling behind: drop frames or encode fewer
+        self.adaptive_bitrate = True  # Step down/up a resolution/bitrate ladder on congestion
         self.stream_key = None
         self.streaming_platform = None
+        self.simulcast_keys = {}  # Extra platforms fed from the same encode: {platform: stream key}
+        self.live_output_mode = LIVE_RTMP  # Platforms over RTMP, or a direct SRT/UDP/HLS output
+        self.live_output_target = None  # URL, or playlist directory for HLS
+        self.simulcast_relay = None
+        self.stream_error = None  # Last streaming error, shown when the loop has stopped
+        self.recording_error = None  # Last recording error, shown when the loop has stopped
+        self.latency_probe = None  # LatencyProbe set by the latency harness; stamps frames per stage
         
         # Platform RTMP URLs
         self.rtmp_urls = {
@@ -262,10 +443,23 @@ class ScreenRecorder(QMainWindow):
             'facebook': 'rtmps://live-api-s.facebook.com:443/rtmp/',
             'twitch': 'rtmp://live.twitch.tv/app/'
         }
+        # Video bitrate per platform (top of the adaptive ladder); a simulcast uses the lowest
+        self.platform_kbps = {
+            'youtube': 4500,
+            'facebook': 4500,  # Facebook Live requires specific settings
+            'twitch': 6000,  # Twitch optimized settings
+            'local': 6000,  # SRT/UDP/HLS output on the LAN, no platform limit
+        }
         
         # Setup recordings directory
         self.recordings_dir = Path(__file__).parent.parent / "recordings"
         self.recordings_dir.mkdir(exist_ok=True)
+        # Last target per low-latency output mode
+        self.live_output_targets = {
+            LIVE_SRT: 'srt://127.0.0.1:9000',
+            LIVE_UDP: 'udp://127.0.0.1:1234',
+            LIVE_HLS: str(self.recordings_dir / 'live'),
+        }
         
         # Webcam setup
         self.webcam = None
@@ -283,13 +477,32 @@ class ScreenRecorder(QMainWindow):
         # Blur configuration
         self.BLUR_KSIZE = (51, 51)
         self.BLUR_SIGMA = 30
-        self.DETECT_EVERY = 2
+        self.DETECT_EVERY = 2  # Full Haar detection cadence (as before tracking); the tracker moves boxes in between
+        self.FACE_SCALE = 0.5
+        self.face_tracker = FaceTracker(detect_every=self.DETECT_EVERY)
+        # Routes detectors per tile: OCR to text/UI, faces to photographic/moving, nothing to empty
+        self.region_classifier = RegionClassifier()
+        self.detector_router = DetectorRouter(self.region_classifier, scale=self.FACE_SCALE)
+        
+        # Face detection background thread (latest-frame-wins, like the OCR worker)
+        self.face_lock = threading.Lock()
+        self.face_thread_running = False
+        self.face_worker_thread = None
+        self.pending_face_frame = None  # (capture timestamp, small BGR, small gray, motion history, tracked boxes)
+        self.face_detection_result = None  # (capture timestamp, gray frame, boxes) not yet applied
+        
+        # One blur engine shared by every redaction call site (mode/intensity from settings)
+        self.blur_engine = BlurEngine(mode='downscale')
         
         # Confidential data detection setup
         self.confidential_detector = ConfidentialDataDetector(padding_px=20)
+        self.confidential_detector.blur_engine = self.blur_engine
         self.sensitive_blur_enabled = False
         self.confidential_blur_regions = []
-        self.debug_show_boxes = True  # Show red rectangles around detected regions for debugging
+        self.debug_show_boxes = True  # Show red rectangles around detected regions in the preview only
+        self.last_confidential_regions = []
+        self.last_redaction_regions = []  # Boxes redacted in the last frame (output coordinates)
+        self.roi_encoding = True  # Macroblock-aligned redaction and addroi hints for stable redacted areas
         
         # OCR Background Thread Setup (continuous worker)
         self.ocr_lock = threading.Lock()
@@ -299,10 +512,17 @@ class ScreenRecorder(QMainWindow):
         self.ocr_process_interval = 0.35  # Process OCR every 0.35 seconds (faster refresh, lower latency)
         self.last_ocr_submit_time = 0
         
-        # Live preview window
+        # Capture thread writes into a small preallocated ring; processing reads frames by reference
+        self.capture_ring_size = 3
+        self.capture_drop_policy = DROP_OLDEST
+        self.capture_thread = None
+        self.capture_target = CaptureTarget.monitor(1)  # Monitor, screen region or window
+        self.capture_backend = BACKEND_MSS  # Screen grabber (mss or FFmpeg x11grab)
+        
+        # Live preview window, fed with processed frames by the preview tap
         self.preview_window = LivePreviewWindow()
-        self.latest_frame = None
-        self.frame_lock = threading.Lock()
+        self.preview_panel_height = 350
+        self.preview_tap = PreviewTap(self._publish_preview_frame, preview_width=960)
         
         # Signals
         self.recorder_signals = RecorderSignals()
@@ -312,19 +532,20 @@ class ScreenRecorder(QMainWindow):
         self.settings_window = None
         self.current_resolution = (1920, 1080)
         self.current_fps = 30
+        self.stream_resolution = (1280, 720)  # Encoder size for live streams
+        # Capture / detection / output sizes of the running pipeline (set by the capture loop)
+        self.resolution_space = None
         
         # Initialize UI
         self.init_ui()
+        self.video_processing_panel.encoder_profile = lambda: self.encoder_profile(PROFILE_QUALITY)
+        
+        # Find out which GPU encoders work before the first recording needs to know
+        threading.Thread(target=probe_hardware_encoders, daemon=True).start()
         
         # Setup timers
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_timer)
-        
-        self.preview_timer = QTimer()
-        self.preview_timer.timeout.connect(self.update_preview)
-        
-        self.preview_signal_timer = QTimer()
-        self.preview_signal_timer.timeout.connect(self.signal_preview_update)
     
     def init_ui(self):
         """Initialize the modern UI with components"""
@@ -483,6 +704,9 @@ class ScreenRecorder(QMainWindow):
         self.recorder_signals.recording_started.connect(self.on_recording_started)
         self.recorder_signals.recording_stopped.connect(self.on_recording_stopped)
         self.recorder_signals.recording_error.connect(self.on_recording_error)
+        self.recorder_signals.streaming_error.connect(self.on_streaming_error)
+        self.recorder_signals.streaming_stopped.connect(self.on_streaming_stopped)
+        self.recorder_signals.preview_frame_ready.connect(self.on_preview_frame)
     
     def on_blur_toggled(self, enabled):
         """Handle blur checkbox toggle"""
@@ -500,6 +724,18 @@ class ScreenRecorder(QMainWindow):
             self.settings_window.fps_spinbox.setValue(self.current_fps)
             self.settings_window.blur_checkbox.setChecked(self.blur_enabled)
             self.settings_window.sensitive_blur_checkbox.setChecked(self.sensitive_blur_enabled)
+            self.settings_window.set_blur_mode(self.blur_engine.mode)
+            self.settings_window.set_capture_target(self.capture_target)
+            self.settings_window.set_capture_backend(self.capture_backend)
+            self.settings_window.set_stream_profile(self.stream_profile)
+            self.settings_window.set_recording_profile(self.recording_profile)
+            self.settings_window.intra_refresh_checkbox.setChecked(self.stream_intra_refresh)
+            self.settings_window.hardware_checkbox.setChecked(self.hardware_encoding)
+            self.settings_window.set_overflow_policy(self.stream_overflow_policy)
+            self.settings_window.adaptive_bitrate_checkbox.setChecked(self.adaptive_bitrate)
+            self.settings_window.roi_encoding_checkbox.setChecked(self.roi_encoding)
+            self.settings_window.crf_spinbox.setValue(self.recording_crf)
+            self.settings_window.blur_slider.setValue(self.blur_engine.intensity)
         
         self.settings_window.exec_()
     
@@ -510,31 +746,97 @@ class ScreenRecorder(QMainWindow):
             self.current_fps = self.settings_window.get_fps()
             self.blur_enabled = self.settings_window.is_blur_enabled()
             self.sensitive_blur_enabled = self.settings_window.is_sensitive_content_blur_enabled()
+            self.blur_engine.set_mode(self.settings_window.get_blur_mode())
+            self.blur_engine.set_intensity(self.settings_window.get_blur_intensity())
+            self.capture_target = self.settings_window.get_capture_target()
+            self.capture_backend = self.settings_window.get_capture_backend()
+            self.stream_profile = self.settings_window.get_stream_profile()
+            self.recording_profile = self.settings_window.get_recording_profile()
+            self.stream_intra_refresh = self.settings_window.intra_refresh_checkbox.isChecked()
+            self.hardware_encoding = self.settings_window.hardware_checkbox.isChecked()
+            if self.settings_window.benchmark_results:
+                self.encoder_profiles = profiles_from_benchmark(self.settings_window.benchmark_results)
+            self.recording_crf = self.settings_window.get_crf()
+            self.adaptive_bitrate = self.settings_window.adaptive_bitrate_checkbox.isChecked()
+            self.roi_encoding = self.settings_window.roi_encoding_checkbox.isChecked()
+            self.stream_overflow_policy = self.settings_window.get_overflow_policy()
             
             status_msg = "✅ Settings saved successfully!"
             if self.sensitive_blur_enabled:
                 status_msg += " | 🔒 Sensitive data blur enabled"
             self.statusBar().showMessage(status_msg)
     
-    def apply_face_blur(self, frame, webcam_rect=None):
-        """Detect faces and blur them (excluding webcam area)"""
+    def encoder_profile(self, name):
+        """Encoder profile by name, on the GPU encoder when hardware encoding is on and one works"""
+        profile = self.encoder_profiles.get(name, self.encoder_profiles[PROFILE_BALANCED])
+        if self.hardware_encoding:
+            hardware = best_hardware_encoder()
+            if hardware:
+                profile = profile.replace(hardware=hardware)
+        return profile
+    
+    def build_resolution_space(self, capture_size, output_size):
+        """Set up capture/detection/output sizes for a capture loop
+        
+        Detection runs at the selected recording resolution (faces at FACE_SCALE of it);
+        redaction and encoding run at output_size.
+        """
+        if self.capture_target.kind == TARGET_MONITOR:
+            detection_size = self.current_resolution
+        else:
+            detection_size = fit_size(capture_size, self.current_resolution)
+        self.resolution_space = ResolutionSpace.for_pipeline(
+            capture_size, output_size,
+            detection_size=detection_size,
+            face_scale=self.FACE_SCALE
+        )
+        print(f"📐 [Resolution] {self.resolution_space.describe()}")
+        return self.resolution_space
+    
+    def _space_for(self, frame):
+        """Resolution space whose output matches frame (a trivial one if no pipeline is running)"""
+        space = self.resolution_space
+        size = (frame.shape[1], frame.shape[0])
+        if space is None or space.size(OUTPUT) != size:
+            space = ResolutionSpace.for_pipeline(size, size, face_scale=self.FACE_SCALE)
+        return space
+    
+    def get_face_blur_regions(self, frame, webcam_rect=None, source=None):
+        """Return tracked face boxes to redact, in frame coordinates (excluding webcam area)
+        
+        Haar detection runs on the background face worker; this only moves the cached
+        boxes with the tracker. source is the capture-resolution frame when frame is a
+        downscaled output frame.
+        """
         if not self.blur_enabled or self.face_cascade.empty():
-            return frame
+            return []
         
         self.detect_frame_idx += 1
         
-        if self.detect_frame_idx % self.DETECT_EVERY == 0:
-            scale = 0.5
-            small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
-            gray_small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
-            detected = self.face_cascade.detectMultiScale(
-                gray_small, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24)
-            )
-            self.faces_cache = [
-                (int(x/scale), int(y/scale), int(w/scale), int(h/scale))
-                for (x, y, w, h) in detected
-            ]
+        space = self._space_for(frame)
+        small = space.resize(source if source is not None else frame, FACE, interpolation=cv2.INTER_LINEAR)
+        small = to_bgr(small)  # Streaming frames are BGRA; detectors expect BGR
+        gray_small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        self.region_classifier.observe(gray_small)
         
+        with self.face_lock:
+            result = self.face_detection_result
+            self.face_detection_result = None
+            if result is not None:
+                self.pending_face_frame = None  # Superseded by the result we are about to apply
+        
+        if result is not None:
+            # Seed tracks on the frame the detector saw, then flow them forward to now
+            _, detected_gray, detected = result
+            self.face_tracker.reset(detected_gray, detected)
+        self.face_tracker.update(gray_small)
+        
+        if self.face_tracker.needs_detection():
+            self.submit_frame_for_face_detection(small, gray_small)
+        
+        self.faces_cache = space.map_boxes(self.face_tracker.get_boxes(), FACE, OUTPUT)
+        
+        faces_to_blur = []
         for (x, y, w, h) in self.faces_cache:
             # Skip blurring if face is in webcam area
             if webcam_rect:
@@ -542,14 +844,76 @@ class ScreenRecorder(QMainWindow):
                 # Check if face overlaps with webcam area
                 if not (x + w < wx or x > wx + ww or y + h < wy or y > wy + wh):
                     continue  # Skip this face as it's in the webcam area
-            
-            x1, y1 = max(0, x), max(0, y)
-            x2, y2 = min(frame.shape[1], x + w), min(frame.shape[0], y + h)
-            roi = frame[y1:y2, x1:x2]
-            if roi.size > 0:
-                frame[y1:y2, x1:x2] = cv2.GaussianBlur(roi, self.BLUR_KSIZE, self.BLUR_SIGMA)
+            faces_to_blur.append((x, y, w, h))
         
-        return frame
+        return faces_to_blur
+    
+    def apply_face_blur(self, frame, webcam_rect=None):
+        """Blur tracked faces (excluding webcam area)"""
+        faces = self.get_face_blur_regions(frame, webcam_rect)
+        return self.blur_engine.redact(frame, faces, self.BLUR_KSIZE, self.BLUR_SIGMA)
+    
+    def _face_continuous_worker(self):
+        """Continuous background face detection worker - keeps Haar off the capture thread"""
+        print("🔄 [Face Worker] Background thread started")
+        
+        while self.face_thread_running:
+            try:
+                with self.face_lock:
+                    pending = self.pending_face_frame
+                    self.pending_face_frame = None
+                
+                if pending is None:
+                    time.sleep(0.01)
+                    continue
+                
+                capture_time, small, gray_small, motion_history, tracked_boxes = pending
+                detect_start = time.time()
+                # Only photographic / moving regions (plus current tracks) are worth scanning
+                plan = self.detector_router.plan(small, gray_small, motion_history, tracked_boxes)
+                detected = detect_faces_in_regions(self.face_cascade, gray_small, plan.face_regions)
+                detect_time = time.time() - detect_start
+                
+                with self.face_lock:
+                    self.face_detection_result = (capture_time, gray_small, detected)
+                
+                if detect_time > 0.1:
+                    age = time.time() - capture_time
+                    print(f"🙂 [Face] Slow detection: {detect_time:.3f}s (frame age {age:.3f}s) | Found {len(detected)} faces")
+                
+            except Exception as e:
+                print(f"❌ [Face Worker Error] {e}")
+                time.sleep(0.1)
+        
+        print("🛑 [Face Worker] Background thread stopped")
+    
+    def start_face_worker(self):
+        """Start the continuous face detection background worker thread"""
+        if not self.face_thread_running:
+            with self.face_lock:
+                self.pending_face_frame = None
+                self.face_detection_result = None
+            self.face_thread_running = True
+            self.face_worker_thread = threading.Thread(target=self._face_continuous_worker, daemon=True)
+            self.face_worker_thread.start()
+            print("✅ [Face Thread] Started successfully")
+    
+    def stop_face_worker(self):
+        """Stop the face detection background worker thread"""
+        if self.face_thread_running:
+            self.face_thread_running = False
+            if self.face_worker_thread:
+                self.face_worker_thread.join(timeout=2.0)
+            print("🛑 [Face Thread] Stopped")
+    
+    def submit_frame_for_face_detection(self, small, gray_small):
+        """Hand the newest downscaled frame to the face worker (non-blocking, latest frame wins)"""
+        tracked_boxes = [t.box for t in self.face_tracker.tracks]
+        with self.face_lock:
+            self.pending_face_frame = (
+                time.time(), small, gray_small,
+                self.region_classifier.motion_history, tracked_boxes
+            )
     
     def _ocr_continuous_worker(self):
         """Continuous background OCR worker thread - runs independently"""
@@ -557,29 +921,31 @@ class ScreenRecorder(QMainWindow):
         
         while self.ocr_thread_running:
             try:
-                # Check if there's a pending frame to process
+                # Check if there's a pending frame to process (already a private copy)
                 with self.ocr_lock:
-                    if self.pending_ocr_frame is not None:
-                        frame_to_process = self.pending_ocr_frame.copy()
-                        self.pending_ocr_frame = None
-                    else:
-                        frame_to_process = None
+                    pending = self.pending_ocr_frame
+                    self.pending_ocr_frame = None
                 
                 # If no frame, wait and continue
-                if frame_to_process is None:
+                if pending is None:
                     time.sleep(0.05)
                     continue
                 
-                # Run OCR detection (this is slow but runs in background)
+                frame_to_process, motion_history = pending
+                
+                # Run OCR detection on non-empty tiles only (this is slow but runs in background)
                 ocr_start = time.time()
-                detected_regions = self.confidential_detector.detect_confidential_data(frame_to_process)
+                plan = self.detector_router.plan_for_frame(frame_to_process, motion_history)
+                detected_regions = self.confidential_detector.detect_confidential_data(
+                    frame_to_process, plan.frame_regions(plan.text_regions)
+                )
                 ocr_time = time.time() - ocr_start
                 
                 # Update cached regions (thread-safe)
                 with self.ocr_lock:
                     self.confidential_blur_regions = detected_regions
                 
-                print(f"🔍 [OCR] Processed in {ocr_time:.3f}s | Found {len(detected_regions)} sensitive regions")
+                print(f"🔍 [OCR] Processed in {ocr_time:.3f}s | Found {len(detected_regions)} sensitive regions | {plan.summary()}")
                 
             except Exception as e:
                 print(f"❌ [OCR Worker Error] {e}")
@@ -603,8 +969,11 @@ class ScreenRecorder(QMainWindow):
                 self.ocr_worker_thread.join(timeout=2.0)
             print("🛑 [OCR Thread] Stopped")
     
-    def submit_frame_for_ocr(self, frame):
-        """Submit a frame to the background OCR thread for processing (non-blocking)"""
+    def submit_frame_for_ocr(self, frame, space=None):
+        """Submit a frame to the background OCR thread for processing (non-blocking)
+        
+        With a resolution space, frame is resized to the detection resolution on submit.
+        """
         current_time = time.time()
         
         # Only submit every 0.5 seconds to avoid overloading
@@ -612,56 +981,92 @@ class ScreenRecorder(QMainWindow):
             with self.ocr_lock:
                 # Only update if background thread has finished processing previous frame
                 if self.pending_ocr_frame is None:
-                    self.pending_ocr_frame = frame.copy()
+                    if space is not None:
+                        frame = space.resize(frame, DETECTION)
+                    ocr_frame = to_bgr(frame)
+                    frame = ocr_frame.copy() if ocr_frame is frame else ocr_frame
+                    self.pending_ocr_frame = (frame, self.region_classifier.motion_history)
                     self.last_ocr_submit_time = current_time
     
-    def apply_confidential_data_blur(self, frame):
-        """Apply blur to confidential data using cached regions from background OCR thread
+    def get_confidential_blur_regions(self, frame, source=None):
+        """Return confidential regions cached by the background OCR thread, in frame coordinates
         
-        This method is INSTANT - it only applies blur to pre-detected regions.
-        The actual OCR runs continuously in a background thread.
+        This method is INSTANT - it only submits the frame and reads pre-detected regions.
+        The actual OCR runs continuously in a background thread at detection resolution.
         """
         if not self.sensitive_blur_enabled:
-            return frame
+            return []
         
         # Submit frame for background OCR processing (non-blocking, very fast)
-        self.submit_frame_for_ocr(frame)
+        space = self._space_for(frame)
+        self.submit_frame_for_ocr(source if source is not None else frame, space)
         
-        # Apply blur to cached regions from background thread (INSTANT - no OCR here!)
         with self.ocr_lock:
-            current_regions = self.confidential_blur_regions.copy() if self.confidential_blur_regions else []
-        
-        # Apply blur if we have regions (fast Gaussian blur only)
-        if current_regions:
-            # Debug: Draw rectangles around detected regions (RED BOXES)
-            if self.debug_show_boxes:
-                for (x, y, w, h) in current_regions:
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 3)
-                    # Add label
-                    cv2.putText(frame, "CONFIDENTIAL", (x, y - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-            
-            # Apply blur
-            frame = self.confidential_detector.apply_blur_to_frame(
-                frame, 
-                current_regions,
-                blur_ksize=(35, 35),
-                blur_sigma=25
-            )
+            regions = list(self.confidential_blur_regions) if self.confidential_blur_regions else []
+        return space.map_boxes(regions, DETECTION, OUTPUT)
+    
+    def redact_frame(self, frame, webcam_rect=None, source=None):
+        """Redact faces and confidential data in one pass
         
+        frame is redacted in place at output resolution; detection reads source (the
+        capture-resolution frame) when given. All boxes go into a single mask so overlapping
+        regions are blurred once and the cost depends on the redacted area, not on how many
+        boxes were found.
+        """
+        face_regions = self.get_face_blur_regions(frame, webcam_rect, source)
+        confidential_regions = self.get_confidential_blur_regions(frame, source)
+        
+        regions = face_regions + confidential_regions
+        if regions and self.roi_encoding:
+            # Whole macroblocks: no half-blurred blocks, boxes move in block steps
+            regions = snap_to_macroblocks(regions, (frame.shape[1], frame.shape[0]))
+        if regions:
+            self.blur_engine.redact(frame, regions, self.BLUR_KSIZE, self.BLUR_SIGMA)
+        self.last_redaction_regions = regions
+        
+        # Debug boxes are drawn by the preview tap, never into the encoded frame
+        self.last_confidential_regions = confidential_regions
         return frame
     
+    def offer_preview(self, frame):
+        """Pass a processed frame (and debug boxes) to the preview tap"""
+        debug_boxes = self.last_confidential_regions if self.debug_show_boxes else None
+        self.preview_tap.offer(frame, debug_boxes)
+    
+    def _publish_preview_frame(self, small):
+        """Preview tap callback (worker thread): build QImages and hand them to the GUI"""
+        h, w = small.shape[:2]
+        # BGRA from the streaming path maps to RGB32 on little-endian; no channel swap needed
+        fmt = QImage.Format_RGB32 if small.shape[2] == 4 else QImage.Format_BGR888
+        image = QImage(small.data, w, h, small.strides[0], fmt).copy()
+        panel_image = image.scaledToHeight(self.preview_panel_height, Qt.SmoothTransformation)
+        self.recorder_signals.preview_frame_ready.emit(image, panel_image)
+    
+    def on_preview_frame(self, image, panel_image):
+        """Show preview images (GUI thread - only pixmap upload left to do)"""
+        if not (self.recording or self.streaming):
+            return
+        self.preview_window.set_image(image)
+        self.preview_panel.set_image(panel_image)
+    
     def start_recording(self):
         """Start screen recording"""
         self.recording = True
         self.frame_count = 0
+        self.out = None
         self.detect_frame_idx = 0
+        self.face_tracker.clear()
+        self.region_classifier.reset()
         self.start_time = datetime.now()
         
         # Start OCR worker thread if sensitive blur is enabled
         if self.sensitive_blur_enabled:
             self.start_ocr_worker()
         
+        # Start face detection worker thread if face blur is enabled
+        if self.blur_enabled:
+            self.start_face_worker()
+        
         # Initialize webcam (optional - continue if it fails)
         if self.webcam_enabled:
             try:
@@ -699,10 +1104,9 @@ class ScreenRecorder(QMainWindow):
         # Show preview window
         self.preview_window.show()
         
-        # Start timers
+        # Start timers and the preview tap
         self.timer.start(100)
-        self.preview_timer.start(100)
-        self.preview_signal_timer.start(50)
+        self.preview_tap.start()
         
         # Start recording thread
         self.recording_thread = threading.Thread(target=self.record_screen, daemon=True)
@@ -757,6 +1161,10 @@ class ScreenRecorder(QMainWindow):
             if (actual_width, actual_height) != self.webcam_size:
                 webcam_frame = cv2.resize(webcam_frame, (actual_width, actual_height))
             
+            # Match the pipeline's pixel format (streaming runs in BGRA)
+            if frame.shape[2] == 4:
+                webcam_frame = cv2.cvtColor(webcam_frame, cv2.COLOR_BGR2BGRA)
+            
             # Add border (red rectangle)
             border_thickness = 3
             border_color = (0, 0, 255)  # Red in BGR
@@ -799,59 +1207,140 @@ class ScreenRecorder(QMainWindow):
             print(f"Webcam overlay error: {e}")
             return frame, None
     
+    def multi_monitor_options(self):
+        """Redaction settings handed to the per-monitor worker processes"""
+        return {
+            'face_blur': self.blur_enabled,
+            'sensitive_blur': self.sensitive_blur_enabled,
+            'blur_mode': self.blur_engine.mode,
+            'blur_intensity': self.blur_engine.intensity,
+            'blur_ksize': self.BLUR_KSIZE,
+            'blur_sigma': self.BLUR_SIGMA,
+            'face_scale': self.FACE_SCALE,
+            'detect_every': self.DETECT_EVERY,
+            'detection_size': self.current_resolution,
+            'ocr_interval': self.ocr_process_interval,
+            'capture_backend': self.capture_backend,
+        }
+    
+    def start_capture_thread(self, fps, pixel_format='bgr', output_bound=None):
+        """Start the dedicated capture thread on the selected capture target and return it
+        
+        pixel_format 'bgra' hands mss buffers through untouched (zero-copy streaming path).
+        The all-monitors target starts one capture/redaction process per monitor instead,
+        composited to fit output_bound.
+        """
+        import mss
+        with mss.mss() as sct:
+            monitors = [dict(m) for m in sct.monitors]
+        
+        ring = FrameRing(self.capture_ring_size, self.capture_drop_policy)
+        if self.capture_target.kind == TARGET_ALL_MONITORS:
+            self.capture_thread = MultiMonitorCapture(
+                monitors[1:], fps, output_bound or self.current_resolution,
+                self.multi_monitor_options(), ring, pixel_format
+            )
+            self.capture_thread.start()
+            return self.capture_thread
+        
+        monitor = self.capture_target.resolve(monitors)
+        if monitor is None:
+            raise Exception(f"Capture target not available: {self.capture_target.describe()}")
+        
+        self.capture_thread = CaptureThread(monitor, fps, ring, pixel_format, target=self.capture_target,
+                                            backend=create_backend(self.capture_backend))
+        self.capture_thread.start()
+        print(f"📷 [Capture] {self.capture_target.describe()} -> {monitor['width']}x{monitor['height']}")
+        return self.capture_thread
+    
+    def output_size_for(self, capture_size, bound):
+        """Encoder size: bound for full monitors, the region scaled to fit bound otherwise
+        
+        Region and window captures keep their aspect ratio and are never upscaled, so only
+        the captured pixels are processed and encoded.
+        """
+        if self.capture_target.kind == TARGET_MONITOR:
+            return tuple(bound)
+        return fit_size(capture_size, bound)
+    
+    def stop_capture_thread(self):
+        """Stop the capture thread and log its ring counters"""
+        if self.capture_thread is not None:
+            self.capture_thread.stop()
+            print(f"📷 [Capture] {self.capture_thread.ring.stats()} | avg grab {self.capture_thread.avg_grab_ms:.1f} ms")
+            self.capture_thread = None
+    
+    def next_captured_frame(self, capture_thread):
+        """Wait for the next ring frame; raises if the capture thread died"""
+        slot = capture_thread.ring.get(timeout=0.5)
+        if slot is None and capture_thread.error is not None:
+            raise Exception(f"Screen capture failed: {capture_thread.error}")
+        return slot
+    
     def record_screen(self):
         """Record the screen in a separate thread"""
         try:
-            width, height = self.current_resolution
             fps = self.current_fps
-            frame_duration = 1.0 / fps
             
-            # Setup video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            # Screen capture runs on its own thread at the target fps
+            capture_thread = self.start_capture_thread(fps, output_bound=self.current_resolution)
+            monitor = capture_thread.monitor
+            capture_size = (monitor['width'], monitor['height'])
+            width, height = self.output_size_for(capture_size, self.current_resolution)
+            space = self.build_resolution_space(capture_size, (width, height))
+            
+            # H.264 writer: FFmpeg encodes on its own thread, fed through a bounded queue
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = self.recordings_dir / f"recording_{timestamp}.mp4"
             
-            self.out = cv2.VideoWriter(str(output_file), fourcc, fps, (width, height))
-            
-            if not self.out.isOpened():
-                raise Exception("Failed to initialize video writer")
+            self.out = open_file_writer(output_file, (width, height), fps, crf=self.recording_crf,
+                                        profile=self.encoder_profile(self.recording_profile))
+            self.out.start()
             
-            # Screen capture
-            import mss
-            sct = mss.mss()
-            monitor = sct.monitors[1]
-            
-            frame_time = time.time()
             consecutive_errors = 0
             
+            # The writer is fixed-rate, so frames are placed on its grid by capture timestamp
+            pacer = FramePacer(fps)
+            
             # FPS tracking
             fps_counter = 0
             fps_start_time = time.time()
             last_fps_log = time.time()
+            actual_fps = 0.0
             
             while self.recording:
+                slot = self.next_captured_frame(capture_thread)
+                if slot is None:
+                    continue
+                
                 try:
-                    screenshot = sct.grab(monitor)
-                    frame = np.array(screenshot)
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+                    # Skip frames whose slot on the output timeline is already filled
+                    copies = pacer.place(slot.timestamp)
+                    if copies == 0:
+                        continue
                     
-                    if (frame.shape[1], frame.shape[0]) != (width, height):
-                        frame = cv2.resize(frame, (width, height))
+                    capture = slot.frame  # Ring slot, used in place until released
+                    
+                    if space.size(CAPTURE) != (capture.shape[1], capture.shape[0]):
+                        space = self.build_resolution_space((capture.shape[1], capture.shape[0]), (width, height))
+                    # Downscaled straight into a writer pool buffer (no per-frame allocation)
+                    buffer = self.out.frame_buffer() if space.needs_resize(CAPTURE, OUTPUT) else None
+                    frame = space.resize(capture, OUTPUT, out=buffer)
                     
                     # Overlay webcam first (safe - returns original frame if webcam fails)
                     frame, webcam_rect = self.overlay_webcam(frame)
                     
-                    # Apply face blur (excluding webcam area)
-                    frame = self.apply_face_blur(frame, webcam_rect)
-                    
-                    # Apply confidential data blur if enabled
-                    frame = self.apply_confidential_data_blur(frame)
+                    # Redact faces (excluding webcam area) and confidential data in one pass
+                    # (multi-monitor tiles arrive already redacted by their worker processes)
+                    if not capture_thread.redacts:
+                        frame = self.redact_frame(frame, webcam_rect, source=capture)
                     
-                    with self.frame_lock:
-                        self.latest_frame = frame.copy()
+                    self.offer_preview(frame)
                     
-                    self.out.write(frame)
-                    self.frame_count += 1
+                    # Queued for the writer thread (repeated over grid slots a slow iteration skipped);
+                    # a resized frame is ours to hand over, a ring slot has to be copied
+                    self.out.write(frame, copies, owned=frame is not capture)
+                    self.frame_count += copies
                     fps_counter += 1
                     consecutive_errors = 0
                     
@@ -860,28 +1349,27 @@ class ScreenRecorder(QMainWindow):
                     if current_time - last_fps_log >= 2.0:
                         elapsed_fps = current_time - fps_start_time
                         actual_fps = fps_counter / elapsed_fps if elapsed_fps > 0 else 0
-                        print(f"📹 [Recording] FPS: {actual_fps:.2f} | Frames: {self.frame_count} | Target: {fps} FPS")
+                        print(f"📹 [Recording] FPS: {actual_fps:.2f} | Frames: {self.frame_count} | Target: {fps} FPS | Dropped: {capture_thread.ring.dropped}")
+                        print(f"⏱️  [Pacer] {pacer.summary()}")
+                        print(f"🎞️  [Writer] {self.out.stats()}")
                         # Reset counters
                         fps_counter = 0
                         fps_start_time = current_time
                         last_fps_log = current_time
-                    
-                    # Control frame rate
-                    elapsed = time.time() - frame_time
-                    sleep_time = frame_duration - elapsed
-                    if sleep_time > 0:
-                        time.sleep(sleep_time)
-                    frame_time = time.time()
                 
                 except Exception as frame_error:
                     consecutive_errors += 1
-                    print(f"Frame capture error {consecutive_errors}: {frame_error}")
+                    print(f"Frame processing error {consecutive_errors}: {frame_error}")
                     if consecutive_errors > 10:
                         raise Exception(f"Too many consecutive frame errors: {frame_error}")
                     time.sleep(0.1)
+                finally:
+                    capture_thread.ring.release(slot)
             
-            self.out.release()
-            sct.close()
+            self.stop_capture_thread()
+            if self.out.close() not in (0, None):
+                raise Exception("FFmpeg failed to finish the recording")
+            self.resolution_space = None
             
             # Final FPS statistics
             if self.frame_count > 0:
@@ -894,23 +1382,48 @@ class ScreenRecorder(QMainWindow):
                     print(f"   • Average FPS: {avg_fps:.2f}")
                     print(f"   • Target FPS: {fps}")
                     print(f"   • Performance: {(avg_fps/fps*100):.1f}% of target")
+                    print(f"   • Timeline: {pacer.summary()}")
                     print(f"📊 ═══════════════════════════════════════\n")
             
             print("✅ Recording completed successfully")
             
         except Exception as e:
+            self.stop_capture_thread()
+            if self.out is not None:
+                self.out.close()  # Finish whatever was encoded so the file stays playable
             print(f"❌ Recording error: {str(e)}")
             self.recorder_signals.recording_error.emit(f"Recording error: {str(e)}")
+        finally:
+            # Rest of the shutdown on the GUI thread (on_recording_stopped), once the file is closed
+            self.recorder_signals.recording_stopped.emit()
     
     def stop_recording(self):
-        """Stop screen recording"""
+        """Stop screen recording
+        
+        Only asks the recording loop to finish: the writer still has to drain its queue and
+        let FFmpeg write the MP4 index, so the gallery refresh and the rest of the shutdown
+        run in on_recording_stopped once the loop has closed the file.
+        """
+        self.recording = False
+        self.timer.stop()
+        self.preview_tap.stop()
+        self.control_buttons.stop_button.setEnabled(False)
+        self.status_panel.update_status("⏳ Stopping...", 'stopped')
+        self.statusBar().showMessage("📹 Finishing recording...")
+        
+        if self.recording_thread is None or not self.recording_thread.is_alive():
+            self.on_recording_stopped()
+    
+    def on_recording_stopped(self):
+        """Finish shutdown on the GUI thread after the recording loop has closed the file"""
         self.recording = False
+        self.recording_thread = None
         self.timer.stop()
-        self.preview_timer.stop()
-        self.preview_signal_timer.stop()
+        self.preview_tap.stop()
         
-        # Stop OCR worker thread
+        # Stop OCR and face detection worker threads
         self.stop_ocr_worker()
+        self.stop_face_worker()
         
         # Release webcam
         if self.webcam is not None:
@@ -922,19 +1435,24 @@ class ScreenRecorder(QMainWindow):
         
         # Update UI
         self.control_buttons.set_recording_state(False)
-        self.status_panel.update_status("✅ Stopped", 'stopped')
         self.preview_panel.clear_preview()
         self.settings_button.setEnabled(True)
         
-        # Refresh video gallery and processing panel
+        # Refresh video gallery and processing panel (the writer has finished the file)
         self.video_gallery.load_videos()
         self.video_processing_panel.load_videos()
         
-        self.recorder_signals.recording_stopped.emit()
+        if self.recording_error:
+            self.status_panel.update_status(f"❌ Error", 'error')
+            self.statusBar().showMessage(f"Error: {self.recording_error}")
+            self.recording_error = None
+        else:
+            self.status_panel.update_status("✅ Stopped", 'stopped')
+            self.statusBar().showMessage(f"✅ Recording completed. {self.frame_count:,} frames saved.")
     
     def update_timer(self):
         """Update timer and statistics"""
-        if self.recording and self.start_time:
+        if (self.recording or self.streaming) and self.start_time:
             elapsed = datetime.now() - self.start_time
             hours = int(elapsed.total_seconds() // 3600)
             minutes = int((elapsed.total_seconds() % 3600) // 60)
@@ -944,64 +1462,26 @@ class ScreenRecorder(QMainWindow):
             self.status_panel.update_time(time_str)
             self.status_panel.update_frames(self.frame_count)
             
-            # Estimate file size
-            try:
-                width, height = self.current_resolution
-                estimated_size = (self.frame_count * width * height * 3) / (1024 * 1024)
-                self.status_panel.update_size(estimated_size)
-            except:
-                pass
-    
-    def update_preview(self):
-        """Update preview panel"""
-        try:
-            import mss
-            sct = mss.mss()
-            monitor = sct.monitors[1]
-            
-            screenshot = sct.grab(monitor)
-            frame = np.array(screenshot)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-            
-            # Overlay webcam if recording or streaming
-            if self.recording or self.streaming:
-                frame, webcam_rect = self.overlay_webcam(frame)
-                frame = self.apply_face_blur(frame, webcam_rect)
-            else:
-                frame = self.apply_face_blur(frame)
-            
-            self.preview_panel.update_preview(frame)
-            
-            sct.close()
-        except Exception as e:
-            pass
-    
-    def signal_preview_update(self):
-        """Update live preview window"""
-        try:
-            with self.frame_lock:
-                if self.latest_frame is not None:
-                    frame = self.latest_frame.copy()
-                    self.preview_window.update_frame(frame)
-        except Exception as e:
-            pass
+            # Size of the encoded file so far
+            if self.out is not None:
+                self.status_panel.update_size(self.out.output_size / (1024 * 1024))
     
     def on_recording_started(self):
         """Handle recording started"""
         self.statusBar().showMessage("📹 Recording started...")
     
-    def on_recording_stopped(self):
-        """Handle recording stopped"""
-        self.statusBar().showMessage(f"✅ Recording completed. {self.frame_count:,} frames saved.")
-    
     def on_recording_error(self, error_msg):
-        """Handle recording error"""
-        self.status_panel.update_status(f"❌ Error", 'error')
-        self.stop_recording()
-        self.statusBar().showMessage(f"Error: {error_msg}")
+        """Handle a recording error (the loop ends and emits recording_stopped next)"""
+        self.recording_error = error_msg
     
     def start_streaming(self, platform='youtube'):
         """Start live streaming to RTMP server"""
+        # Live outputs have no OpenCV fallback (recording does)
+        if not ffmpeg_available():
+            self.status_panel.update_status(f"❌ Error", 'error')
+            self.statusBar().showMessage("❌ Live streaming needs FFmpeg - install it and make sure it is on PATH")
+            return
+        
         # Store the platform
         self.streaming_platform = platform
         
@@ -1024,35 +1504,61 @@ class ScreenRecorder(QMainWindow):
             }
         }
         
-        info = platform_info.get(platform, platform_info['youtube'])
-        
-        # Show custom styled dialog
-        dialog = StyledStreamKeyDialog(
-            self, 
-            info['title'],
-            info['icon'],
-            info['name']
-        )
-        
-        result = dialog.exec_()
-        
-        if result == QDialog.Accepted:
-            stream_key = dialog.get_key()
-            if stream_key:
-                self.stream_key = stream_key
-            else:
-                self.statusBar().showMessage(f"❌ {platform.capitalize()} stream key not provided")
+        if platform == 'local':
+            # Direct SRT/UDP/HLS output: a target instead of a platform stream key
+            last_mode = self.live_output_mode if self.live_output_mode != LIVE_RTMP else LIVE_SRT
+            dialog = LowLatencyOutputDialog(self, self.live_output_targets, last_mode)
+            if dialog.exec_() != QDialog.Accepted:
+                self.statusBar().showMessage(f"❌ Streaming cancelled")
                 return
+            self.live_output_mode = dialog.get_mode()
+            self.live_output_target = dialog.get_target()
+            self.live_output_targets = dict(dialog.targets)
+            self.stream_record_local = False
+            self.simulcast_keys = {}
         else:
-            self.statusBar().showMessage(f"❌ Streaming cancelled")
-            return
+            info = platform_info.get(platform, platform_info['youtube'])
+            
+            # Show custom styled dialog
+            others = {p: (i['icon'], i['name']) for p, i in platform_info.items() if p != platform}
+            dialog = StyledStreamKeyDialog(
+                self, 
+                info['title'],
+                info['icon'],
+                info['name'],
+                others
+            )
+            
+            result = dialog.exec_()
+            
+            if result == QDialog.Accepted:
+                stream_key = dialog.get_key()
+                self.live_output_mode = LIVE_RTMP
+                self.stream_record_local = dialog.record_locally()
+                self.simulcast_keys = dialog.extra_destinations()
+                if stream_key:
+                    self.stream_key = stream_key
+                else:
+                    self.statusBar().showMessage(f"❌ {platform.capitalize()} stream key not provided")
+                    return
+            else:
+                self.statusBar().showMessage(f"❌ Streaming cancelled")
+                return
         self.streaming = True
         self.frame_count = 0
+        self.start_time = datetime.now()
+        self.out = None
+        self.face_tracker.clear()
+        self.region_classifier.reset()
         
         # Start OCR worker thread if sensitive blur is enabled
         if self.sensitive_blur_enabled:
             self.start_ocr_worker()
         
+        # Start face detection worker thread if face blur is enabled
+        if self.blur_enabled:
+            self.start_face_worker()
+        
         # Initialize webcam (optional - continue if it fails)
         if self.webcam_enabled:
             try:
@@ -1089,18 +1595,20 @@ class ScreenRecorder(QMainWindow):
             'twitch': '🎮'
         }
         icon = platform_icons.get(platform, '📡')
+        target_name = platform.capitalize()
+        if platform == 'local':
+            icon, target_name = '⚡', LIVE_OUTPUT_LABELS[self.live_output_mode]
         
         self.control_buttons.set_streaming_state(True)
-        self.status_panel.update_status(f"{icon} Streaming to {platform.capitalize()}", 'recording')
+        self.status_panel.update_status(f"{icon} Streaming to {target_name}", 'recording')
         self.settings_button.setEnabled(False)
         
         # Show preview window
         self.preview_window.show()
         
-        # Start timers
+        # Start timers and the preview tap
         self.timer.start(100)
-        self.preview_timer.start(100)
-        self.preview_signal_timer.start(50)
+        self.preview_tap.start()
         
         # Start streaming thread
         self.streaming_thread = threading.Thread(target=self.stream_screen, daemon=True)
@@ -1112,112 +1620,124 @@ class ScreenRecorder(QMainWindow):
             'facebook': '📘',
             'twitch': '🎮'
         }
-        icon = platform_icons.get(platform, '📡')
+        icon = platform_icons.get(platform, icon)
         
         self.recorder_signals.streaming_started.emit()
-        self.statusBar().showMessage(f"{icon} Streaming to {platform.capitalize()}!")
+        self.statusBar().showMessage(f"{icon} Streaming to {target_name}!")
     
     def stream_screen(self):
         """Stream the screen to RTMP server"""
         try:
-            width, height = self.current_resolution
             fps = self.current_fps
+            # BGRA end to end: mss buffer -> in-place redaction -> memoryview write to FFmpeg
+            pixel_format = 'bgra'
             
-            # Get RTMP URL for the selected platform
+            # Screen capture for streaming runs on its own thread at the target fps
+            capture_thread = self.start_capture_thread(fps, pixel_format, output_bound=self.stream_resolution)
+            monitor = capture_thread.monitor
+            capture_size = (monitor['width'], monitor['height'])
+            
+            # Redact and encode at the stream resolution; detection keeps the selected resolution
+            width, height = self.output_size_for(capture_size, self.stream_resolution)
+            space = self.build_resolution_space(capture_size, (width, height))
+            
+            # Get RTMP URL for the selected platform (and any simulcast platforms);
+            # a direct SRT/UDP/HLS output has no platform
             rtmp_url = self.rtmp_urls.get(self.streaming_platform, self.rtmp_urls['youtube'])
+            destinations = {}
+            if self.live_output_mode == LIVE_RTMP:
+                destinations[self.streaming_platform] = f"{rtmp_url}{self.stream_key}"
+                for platform, key in self.simulcast_keys.items():
+                    destinations[platform] = f"{self.rtmp_urls[platform]}{key}"
             
-            # Use full path to FFmpeg
-            ffmpeg_path = r"C:\ProgramData\chocolatey\lib\ffmpeg\tools\ffmpeg\bin\ffmpeg.exe"
+            # Platform-specific bitrate; one encode must suit every destination
+            video_kbps = min(self.platform_kbps.get(p, 4500) for p in destinations or ['local'])
+            profile = self.encoder_profile(self.stream_profile)
+            # Keyframe every 2 s as platforms ask; direct outputs join (and HLS segments) every second
+            gop = fps * 2 if destinations else fps
             
-            # Platform-specific encoding settings
-            if self.streaming_platform == 'facebook':
-                # Facebook Live requires specific settings
-                output_format = "flv"
-                video_bitrate = "4500k"
-                preset = "veryfast"
-            elif self.streaming_platform == 'twitch':
-                # Twitch optimized settings
-                output_format = "flv"
-                video_bitrate = "6000k"
-                preset = "veryfast"
-            else:  # YouTube
-                output_format = "flv"
-                video_bitrate = "4500k"
-                preset = "veryfast"
+            # One encode. Several platforms, or a local copy next to RTMP: MPEG-TS to a relay
+            # that runs one reconnecting forwarder per platform, so a network drop is retried
+            # there while the tee muxer keeps writing the MP4 (as a tee slave with
+            # onfail=ignore, RTMP would just stop silently and never come back).
+            if not destinations:
+                self.simulcast_relay = None
+                outputs = [EncoderOutput.live(self.live_output_mode, self.live_output_target)]
+            elif len(destinations) > 1 or self.stream_record_local:
+                self.simulcast_relay = SimulcastRelay(destinations, kbps=video_kbps)
+                outputs = [EncoderOutput.relay()]
+            else:
+                self.simulcast_relay = None
+                outputs = [EncoderOutput.rtmp(destinations[self.streaming_platform])]
+            crf = None  # Bitrate-driven, as live platforms expect
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if self.stream_record_local:
+                outputs.append(EncoderOutput.file(self.recordings_dir / f"stream_{timestamp}.mp4"))
+                crf = self.recording_crf  # Recording quality, capped at the stream bitrate
+            elif self.stream_intra_refresh and not profile.hardware and self.live_output_mode != LIVE_HLS:
+                # Live-only: no keyframe bursts; a file (or HLS segment) would lose its seek points
+                profile = profile.replace(intra_refresh=True)
             
-            # FFmpeg command for streaming
-            ffmpeg_cmd = [
-                "ffmpeg",
-                "-loglevel", "error",
-                "-y",
-                
-                # Input 0: raw video from stdin
-                "-thread_queue_size", "512",
-                "-f", "rawvideo",
-                "-pix_fmt", "bgr24",
-                "-s", f"{width}x{height}",
-                "-r", str(fps),
-                "-i", "-",  # stdin video stream
-                
-                # Input 1: silent audio
-                "-thread_queue_size", "512",
-                "-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
-                
-                # Output encoding
-                "-vf", "scale=1280:720",  # downscale to 720p
-                "-c:v", "libx264",
-                "-pix_fmt", "yuv420p",
-                "-preset", preset,
-                "-b:v", video_bitrate,
-                "-maxrate", video_bitrate,
-                "-bufsize", "9000k",
-                "-g", str(fps * 2),
-                "-keyint_min", str(fps),
-                "-c:a", "aac",
-                "-ar", "44100",
-                "-b:a", "128k",
-                "-f", output_format,
-                f"{rtmp_url}{self.stream_key}"
-            ]
+            if destinations:
+                print(f"🚀 Starting stream to {self.streaming_platform}...")
+                print(f"📡 RTMP URL: {rtmp_url}")
+            else:
+                print(f"🚀 Starting {LIVE_OUTPUT_LABELS[self.live_output_mode]} stream to {self.live_output_target}...")
             
-            # Start FFmpeg process
-            print(f"🚀 Starting stream to {self.streaming_platform}...")
-            print(f"📡 RTMP URL: {rtmp_url}")
+            # Redacted areas that stay put are coded coarsely from the next encoder restart on
+            # (addroi is fixed per FFmpeg run; moving boxes only get the macroblock snapping).
+            # Only restarts that happen anyway pick them up: ladder switches and reconnects
+            roi = RoiStabilizer((width, height)) if self.roi_encoding else None
+            kbps, regions = video_kbps, None
+            encodes = 0
             
-            self.ffmpeg_process = subprocess.Popen(
-                ffmpeg_cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=10**8
-            )
+            # Every encode (first, after a reconnect, on a ladder switch) reads the current
+            # size, bitrate and ROI; only this stage restarts, capture and detection don't
+            def open_writer():
+                nonlocal encodes, regions
+                if roi is not None and roi.warmed_up:
+                    regions = roi.regions()
+                if encodes and self.stream_record_local:
+                    # A restarted encode continues in a new file instead of overwriting the last one
+                    outputs[-1] = EncoderOutput.file(self.recordings_dir / f"stream_{timestamp}_part{encodes + 1}.mp4")
+                writer = FFmpegWriter(
+                    outputs, (width, height), fps, pixel_format,
+                    crf=crf, profile=profile, bitrate=kbps, gop=gop, audio=True,
+                    overflow_policy=self.stream_overflow_policy, roi=regions
+                )
+                if self.latency_probe is not None:
+                    writer.on_frame_written = self.latency_probe.frame_written
+                writer.start()
+                if self.simulcast_relay is not None:
+                    self.simulcast_relay.attach(writer.process.stdout)
+                encodes += 1
+                return writer
             
-            # Start a thread to monitor FFmpeg errors
-            def monitor_ffmpeg_errors():
-                while self.streaming and self.ffmpeg_process:
-                    try:
-                        line = self.ffmpeg_process.stderr.readline()
-                        if line:
-                            error_msg = line.decode('utf-8', errors='ignore').strip()
-                            if error_msg:
-                                print(f"[FFmpeg] {error_msg}")
-                    except:
-                        break
+            if self.simulcast_relay is not None:
+                self.simulcast_relay.start()
+                print(f"📡 Relaying to {', '.join(destinations)} from one encode")
+            self.stream_writer = ReconnectingWriter(open_writer, fps)
+            self.stream_writer.start()
+            # Recording stats and the status panel follow the local copy
+            self.out = self.stream_writer if self.stream_record_local else None
             
-            error_thread = threading.Thread(target=monitor_ffmpeg_errors, daemon=True)
-            error_thread.start()
+            # Adaptive ladder; switching restarts the encode, so not while a local copy is written.
+            # Not when simulcasting either: congestion is per destination there, and a restart
+            # would reset every forwarder's timestamps.
+            abr = None
+            if self.adaptive_bitrate and not self.stream_record_local and self.simulcast_relay is None:
+                abr = AdaptiveBitrateController(build_ladder((width, height), video_kbps), fps,
+                                                self.stream_writer.queue_size)
+            last_abr_check = time.monotonic()
+            reconnects_seen = 0
             
             print("🚀 Streaming started...")
             
-            # Screen capture for streaming
-            import mss
-            sct = mss.mss()
-            monitor = sct.monitors[1]
-            
-            frame_duration = 1.0 / fps
-            frame_time = time.time()
             consecutive_errors = 0
             
+            # FFmpeg reads the pipe at a fixed -r, so frames are placed on that grid by capture timestamp
+            pacer = FramePacer(fps)
+            
             # FPS tracking
             fps_counter = 0
             fps_start_time = time.time()
@@ -1225,32 +1745,67 @@ class ScreenRecorder(QMainWindow):
             actual_fps = 0.0
             
             while self.streaming:
+                slot = self.next_captured_frame(capture_thread)
+                if slot is None:
+                    continue
+                
                 try:
-                    # Capture screen
-                    screenshot = sct.grab(monitor)
-                    frame = np.array(screenshot)
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+                    # Skip frames whose slot on the output timeline is already filled
+                    copies = pacer.place(slot.timestamp)
+                    if copies == 0:
+                        continue
+                    # When decimating, only every n-th frame is processed and encoded
+                    if self.stream_writer.skip(copies):
+                        continue
+                    
+                    capture = slot.frame  # Ring slot, used in place until released
                     
-                    if (frame.shape[1], frame.shape[0]) != (width, height):
-                        frame = cv2.resize(frame, (width, height))
+                    if space.size(CAPTURE) != (capture.shape[1], capture.shape[0]):
+                        space = self.build_resolution_space((capture.shape[1], capture.shape[0]), (width, height))
+                    # Downscaled straight into a writer pool buffer (no per-frame allocation)
+                    buffer = self.stream_writer.frame_buffer() if space.needs_resize(CAPTURE, OUTPUT) else None
+                    frame = space.resize(capture, OUTPUT, out=buffer)
                     
                     # Overlay webcam
                     frame, webcam_rect = self.overlay_webcam(frame)
                     
-                    # Apply face blur (excluding webcam area)
-                    frame = self.apply_face_blur(frame, webcam_rect)
+                    # Redact faces (excluding webcam area) and confidential data in one pass
+                    # (multi-monitor tiles arrive already redacted by their worker processes)
+                    if not capture_thread.redacts:
+                        frame = self.redact_frame(frame, webcam_rect, source=capture)
+                        if roi is not None:
+                            roi.update(self.last_redaction_regions)
                     
-                    # Apply confidential data blur if enabled
-                    frame = self.apply_confidential_data_blur(frame)
+                    self.offer_preview(frame)
                     
-                    with self.frame_lock:
-                        self.latest_frame = frame.copy()
+                    if self.latency_probe is not None:
+                        self.latency_probe.frame_queued(frame, slot.timestamp)
                     
-                    # Send to FFmpeg
-                    self.ffmpeg_process.stdin.write(frame.tobytes())
-                    self.ffmpeg_process.stdin.flush()
+                    # Queued for the encoder thread (repeated over grid slots a slow iteration skipped);
+                    # a resized frame is handed over, a ring slot is copied
+                    self.stream_writer.write(frame, copies, owned=frame is not capture)
                     
-                    self.frame_count += 1
+                    # Move along the ladder on sustained congestion/recovery. The old encode is
+                    # flushed and the new one opens with a keyframe at the new size and bitrate.
+                    # A reconnect is not congestion: the ladder starts counting afresh
+                    if abr is not None and self.stream_writer.reconnects != reconnects_seen:
+                        reconnects_seen = self.stream_writer.reconnects
+                        abr.reset_counters()
+                    if (abr is not None and self.stream_writer.connected
+                            and time.monotonic() - last_abr_check >= 1.0):
+                        last_abr_check = time.monotonic()
+                        rung = abr.update(self.stream_writer.telemetry())
+                        if rung is not None:
+                            regions = None
+                            if roi is not None:
+                                regions = roi.regions_for(rung.size)
+                                roi = RoiStabilizer(rung.size)
+                            width, height = rung.size
+                            kbps = rung.kbps
+                            space = self.build_resolution_space((capture.shape[1], capture.shape[0]), (width, height))
+                            self.stream_writer.restart()
+                    
+                    self.frame_count += copies
                     fps_counter += 1
                     consecutive_errors = 0
                     
@@ -1259,21 +1814,19 @@ class ScreenRecorder(QMainWindow):
                     if current_time - last_fps_log >= 2.0:
                         elapsed_fps = current_time - fps_start_time
                         actual_fps = fps_counter / elapsed_fps if elapsed_fps > 0 else 0
-                        print(f"📺 [Streaming] FPS: {actual_fps:.2f} | Frames sent: {self.frame_count} | Target: {fps} FPS")
+                        print(f"📺 [Streaming] FPS: {actual_fps:.2f} | Frames sent: {self.frame_count} | Target: {fps} FPS | Dropped: {capture_thread.ring.dropped}")
+                        print(f"⏱️  [Pacer] {pacer.summary()}")
+                        print(f"🎞️  [Writer] {self.stream_writer.stats()}")
+                        if self.simulcast_relay is not None:
+                            print(f"📡 [Simulcast] {self.simulcast_relay.stats()}")
                         # Reset counters
                         fps_counter = 0
                         fps_start_time = current_time
                         last_fps_log = current_time
-                    
-                    # Control frame rate
-                    elapsed = time.time() - frame_time
-                    sleep_time = frame_duration - elapsed
-                    if sleep_time > 0:
-                        time.sleep(sleep_time)
-                    frame_time = time.time()
                 
-                except BrokenPipeError:
-                    print("❌ FFmpeg pipe broken - connection lost")
+                except EncoderError as e:
+                    # Only after reconnecting failed for ReconnectingWriter's max downtime
+                    print(f"❌ FFmpeg pipe broken - connection lost ({e})")
                     raise Exception("Stream connection lost")
                 except Exception as frame_error:
                     consecutive_errors += 1
@@ -1281,8 +1834,11 @@ class ScreenRecorder(QMainWindow):
                     if consecutive_errors > 10:
                         raise Exception(f"Too many consecutive streaming errors: {frame_error}")
                     time.sleep(0.1)
+                finally:
+                    capture_thread.ring.release(slot)
             
-            sct.close()
+            self.stop_capture_thread()
+            self.resolution_space = None
             
             # Final FPS statistics
             if self.frame_count > 0:
@@ -1296,71 +1852,97 @@ class ScreenRecorder(QMainWindow):
                     print(f"   • Target FPS: {fps}")
                     print(f"   • Duration: {total_time:.1f} seconds")
                     print(f"   • Performance: {(avg_fps/fps*100):.1f}% of target")
+                    print(f"   • Timeline: {pacer.summary()}")
                     print(f"📊 ═══════════════════════════════════════\n")
             
-            if self.ffmpeg_process and self.ffmpeg_process.stdin:
-                self.ffmpeg_process.stdin.close()
-                self.ffmpeg_process.wait()
+            self.stream_writer.close(timeout=5.0)
+            if self.simulcast_relay is not None:
+                self.simulcast_relay.stop()
             
             print("✅ Streaming completed successfully")
             
         except Exception as e:
+            self.stop_capture_thread()
+            if self.stream_writer is not None:
+                self.stream_writer.close(timeout=5.0)
+            if self.simulcast_relay is not None:
+                self.simulcast_relay.stop()
             print(f"❌ Streaming error: {str(e)}")
             self.recorder_signals.streaming_error.emit(f"Streaming error: {str(e)}")
+        finally:
+            # Rest of the shutdown on the GUI thread (on_streaming_stopped)
+            self.recorder_signals.streaming_stopped.emit()
     
     def stop_streaming(self):
-        """Stop live streaming"""
+        """Stop live streaming
+        
+        Only asks the streaming loop to finish: flushing the encoder (so a local copy gets
+        its MP4 index) and any reconnect in progress can take several seconds, so the rest
+        of the shutdown runs in on_streaming_stopped once the loop has ended.
+        """
         self.streaming = False
         self.timer.stop()
-        self.preview_timer.stop()
-        self.preview_signal_timer.stop()
+        self.preview_tap.stop()
+        self.control_buttons.stop_stream_button.setEnabled(False)
+        self.status_panel.update_status("⏳ Stopping...", 'stopped')
+        self.statusBar().showMessage("📡 Finishing live stream...")
+        
+        if self.streaming_thread is None or not self.streaming_thread.is_alive():
+            self.on_streaming_stopped()
+    
+    def on_streaming_error(self, error_msg):
+        """Handle a streaming error (the loop ends and emits streaming_stopped next)"""
+        self.stream_error = error_msg
+    
+    def on_streaming_stopped(self):
+        """Finish shutdown on the GUI thread after the streaming loop has ended"""
+        self.streaming = False
+        self.streaming_thread = None
+        self.timer.stop()
+        self.preview_tap.stop()
         
-        # Stop OCR worker thread
+        # Stop OCR and face detection worker threads
         self.stop_ocr_worker()
+        self.stop_face_worker()
         
-        # Release webcam
+        # Release webcam (the loop no longer reads it)
         if self.webcam is not None:
             self.webcam.release()
             self.webcam = None
         
-        # Stop FFmpeg process
-        if self.ffmpeg_process:
-            try:
-                if self.ffmpeg_process.stdin:
-                    self.ffmpeg_process.stdin.close()
-                self.ffmpeg_process.terminate()
-                self.ffmpeg_process.wait(timeout=5)
-            except:
-                try:
-                    self.ffmpeg_process.kill()
-                except:
-                    pass
-            self.ffmpeg_process = None
-        
         # Hide preview window
         self.preview_window.hide()
         
         # Update UI
         self.control_buttons.set_streaming_state(False)
-        self.status_panel.update_status("✅ Stopped", 'stopped')
         self.preview_panel.clear_preview()
         self.settings_button.setEnabled(True)
         
-        self.recorder_signals.streaming_stopped.emit()
-        self.statusBar().showMessage("📡 Live streaming stopped")
+        if self.stream_error:
+            self.status_panel.update_status(f"❌ Error", 'error')
+            self.statusBar().showMessage(f"Error: {self.stream_error}")
+            self.stream_error = None
+        else:
+            self.status_panel.update_status("✅ Stopped", 'stopped')
+            self.statusBar().showMessage("📡 Live streaming stopped")
     
     def closeEvent(self, event):
         """Handle window close"""
-        # Stop recording if active
+        # Stop recording if active; on exit, wait for the loop so the MP4 is finished
         if self.recording:
             self.stop_recording()
+        if self.recording_thread is not None:
+            self.recording_thread.join(timeout=15.0)
         
-        # Stop streaming if active
+        # Stop streaming if active; on exit, wait for the loop so a local copy is finished
         if self.streaming:
             self.stop_streaming()
+        if self.streaming_thread is not None:
+            self.streaming_thread.join(timeout=15.0)
         
-        # Stop OCR worker thread if still running
+        # Stop OCR and face detection worker threads if still running
         self.stop_ocr_worker()
+        self.stop_face_worker()
         
         # Release webcam if still active
         if self.webcam is not None:
@@ -1368,8 +1950,7 @@ class ScreenRecorder(QMainWindow):
             self.webcam = None
         
         self.timer.stop()
-        self.preview_timer.stop()
-        self.preview_signal_timer.stop()
+        self.preview_tap.stop()
         self.preview_window.close()
         event.accept()
 